@@ -0,0 +1,40 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .tokens import CALLER_ID_CLAIM, CallerAccessToken
+
+
+class TokenCaller:
+    """
+    The caller a validated access token was issued to, without loading the
+    Caller row; views that need more than the id fetch it themselves.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        self.caller_id = token[CALLER_ID_CLAIM]
+        self.pk = self.caller_id
+
+    def __str__(self):
+        return f"Caller {self.caller_id}"
+
+
+class CallerJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates caller API requests by their "Authorization: Bearer" access
+    token: signature and expiry only, no database query.
+    """
+
+    def get_validated_token(self, raw_token):
+        try:
+            return CallerAccessToken(raw_token)
+        except TokenError as e:
+            raise InvalidToken({"detail": _("Given token not valid"), "messages": [str(e)]})
+
+    def get_user(self, validated_token):
+        if CALLER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable caller identification"))
+        return TokenCaller(validated_token)
@@ -0,0 +1,64 @@
+import base64
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from callers.authentication import CallerJWTAuthentication
+from callers.models import Caller
+from callers.tokens import CallerRefreshToken
+
+BENCH_PHONE = "09000000003"
+BENCH_EMAIL = "bench-caller@example.com"
+BENCH_PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the CPU cost of authenticating one caller request: password vs access token"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--password-requests", type=int, default=20)
+        parser.add_argument("--token-requests", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        # The caller is created inside a transaction that is rolled back.
+        with transaction.atomic():
+            caller = Caller(full_name="Benchmark Caller", phone_number=BENCH_PHONE, email=BENCH_EMAIL)
+            caller.set_password(BENCH_PASSWORD)
+            caller.save()
+            factory = RequestFactory()
+            access = str(CallerRefreshToken.for_caller(caller).access_token)
+            credentials = base64.b64encode(f"{BENCH_EMAIL}:{BENCH_PASSWORD}".encode()).decode()
+            authentication = CallerJWTAuthentication()
+
+            def password_request():
+                # What an endpoint re-checking the password on every call does
+                request = factory.get("/api/me/", HTTP_AUTHORIZATION=f"Basic {credentials}")
+                email, password = base64.b64decode(
+                    request.headers["Authorization"].split()[1]
+                ).decode().split(":", 1)
+                assert Caller.objects.get(email=email).check_password(password)
+
+            def token_request():
+                request = Request(factory.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {access}"))
+                user, token = authentication.authenticate(request)
+                assert user.caller_id == caller.caller_id
+
+            self.stdout.write(f"Password hasher: {caller.password.split('$', 2)[:2]}")
+            self.measure("password (PBKDF2)", password_request, options["password_requests"])
+            self.measure("access token (JWT)", token_request, options["token_requests"])
+            transaction.set_rollback(True)
+
+    def measure(self, label, run, count):
+        run()  # warm up
+        with CaptureQueriesContext(connection) as queries:
+            cpu, wall = time.process_time(), time.perf_counter()
+            for _ in range(count):
+                run()
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        self.stdout.write(
+            f"{label:<20} requests={count:<6} cpu/request={cpu / count * 1000:.3f}ms "
+            f"wall/request={wall / count * 1000:.3f}ms queries/request={len(queries) / count:g}"
+        )
@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from .models import Caller
+from .tokens import CALLER_ID_CLAIM, CallerRefreshToken
 
 class CallerRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -36,3 +39,14 @@ class CallerRegistrationSerializer(serializers.ModelSerializer):
 class CallerLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
+
+
+class CallerTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CallerRefreshToken
+
+    def validate(self, attrs):
+        # The one token check that reads the database: deleted callers get no new access tokens
+        refresh = self.token_class(attrs['refresh'])
+        if not Caller.objects.filter(caller_id=refresh.get(CALLER_ID_CLAIM)).exists():
+            raise AuthenticationFailed("No caller found for the given token.", "no_caller")
+        return super().validate(attrs)
@@ -1,3 +1,55 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Caller
+
+
+class CallerTokenTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller(full_name="Juan Dela Cruz", phone_number="09123456789", email="juan@example.com")
+        cls.caller.set_password("correct horse")
+        cls.caller.save()
+
+    def login(self, password="correct horse"):
+        return self.client.post(
+            reverse("caller-login"), {"email": "juan@example.com", "password": password}, content_type="application/json"
+        )
+
+    def me(self, token):
+        return self.client.get(reverse("caller-profile"), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def refresh(self, token):
+        return self.client.post(reverse("caller-token-refresh"), {"refresh": token}, content_type="application/json")
+
+    def test_login_returns_tokens(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()
+        self.assertEqual(tokens["token"], tokens["access"])
+        self.assertTrue(tokens["refresh"])
+        self.assertEqual(self.login("wrong").status_code, 401)
+
+    def test_access_token_is_checked_without_a_query(self):
+        access = self.login().json()["access"]
+        # The one query is the view loading the caller's profile
+        with self.assertNumQueries(1):
+            response = self.me(access)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["caller_id"], self.caller.caller_id)
+        self.assertEqual(self.client.get(reverse("caller-profile")).status_code, 401)
+
+    def test_refresh_returns_a_working_access_token(self):
+        response = self.refresh(self.login().json()["refresh"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.me(response.json()["access"]).status_code, 200)
+
+    def test_tokens_are_not_interchangeable(self):
+        tokens = self.login().json()
+        self.assertEqual(self.me(tokens["refresh"]).status_code, 401)
+        self.assertEqual(self.refresh(tokens["access"]).status_code, 401)
+
+    def test_deleted_caller_cannot_refresh(self):
+        refresh = self.login().json()["refresh"]
+        Caller.objects.filter(pk=self.caller.pk).delete()
+        self.assertEqual(self.refresh(refresh).status_code, 401)
@@ -0,0 +1,25 @@
+# Signed tokens for the caller mobile API (djangorestframework_simplejwt).
+#
+# Callers are not Django users, so these carry a "caller_id" claim instead of
+# simplejwt's user_id, and token types of their own: an officer token can't
+# be used as a caller's, or the other way round. Access tokens are checked
+# by signature and expiry alone (see callers.authentication), so they are
+# short-lived; the app gets a new one from its refresh token.
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+CALLER_ID_CLAIM = "caller_id"
+
+
+class CallerAccessToken(AccessToken):
+    token_type = "caller_access"
+
+
+class CallerRefreshToken(RefreshToken):
+    token_type = "caller_refresh"
+    access_token_class = CallerAccessToken
+
+    @classmethod
+    def for_caller(cls, caller):
+        token = cls()
+        token[CALLER_ID_CLAIM] = caller.caller_id
+        return token
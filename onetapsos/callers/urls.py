@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import CallerRegisterView, CallerLoginView
+from .views import CallerRegisterView, CallerLoginView, CallerTokenRefreshView, CallerProfileView
 
 urlpatterns = [
     path('register/', CallerRegisterView.as_view(), name='caller-register'),
     path('login/', CallerLoginView.as_view(), name='caller-login'),
-]
\ No newline at end of file
+    path('token/refresh/', CallerTokenRefreshView.as_view(), name='caller-token-refresh'),
+    path('me/', CallerProfileView.as_view(), name='caller-profile'),
+]
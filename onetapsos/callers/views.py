@@ -1,8 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import CallerRegistrationSerializer, CallerLoginSerializer
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.views import TokenRefreshView
+from .authentication import CallerJWTAuthentication
+from .serializers import CallerRegistrationSerializer, CallerLoginSerializer, CallerTokenRefreshSerializer
 from .models import Caller
+from .tokens import CallerRefreshToken
 
 
 class CallerRegisterView(APIView):
@@ -33,14 +37,40 @@ class CallerLoginView(APIView):
                 return Response({'error': 'Invalid email or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
             if caller.check_password(password):
+                refresh = CallerRefreshToken.for_caller(caller)
+                access = str(refresh.access_token)
                 return Response({
                     "caller_id": caller.caller_id,
                     "full_name": caller.full_name,
                     "phone_number": caller.phone_number,
                     "email": caller.email,
-                    "token": "sampletoken123"  # 🔑 replace with JWT later
+                    "token": access,  # same as "access", for app versions that read "token"
+                    "access": access,
+                    "refresh": str(refresh),
                 }, status=status.HTTP_200_OK)
             else:
                 return Response({'error': 'Invalid email or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CallerTokenRefreshView(TokenRefreshView):
+    """Trades a caller refresh token for a new access token."""
+    serializer_class = CallerTokenRefreshSerializer
+
+
+class CallerProfileView(APIView):
+    authentication_classes = [CallerJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            caller = Caller.objects.get(caller_id=request.user.caller_id)
+        except Caller.DoesNotExist:
+            return Response({'error': 'Caller not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "caller_id": caller.caller_id,
+            "full_name": caller.full_name,
+            "phone_number": caller.phone_number,
+            "email": caller.email,
+        }, status=status.HTTP_200_OK)
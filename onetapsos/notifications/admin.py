@@ -1,7 +1,12 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, NotificationReceipt
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("recipient", "message", "is_read", "created_at")
     list_filter = ("is_read", "created_at")
+
+
+@admin.register(NotificationReceipt)
+class NotificationReceiptAdmin(admin.ModelAdmin):
+    list_display = ("notification", "user", "read_at")
@@ -1,14 +1,10 @@
-from .models import Notification
+from .models import Notification, NotificationCounter
 
 def notifications_context(request):
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).count()
+        unread_count = NotificationCounter.unread_count(request.user)
 
-        latest_notifications = Notification.objects.filter(
-            recipient=request.user
-        ).order_by("-created_at")[:10]
+        latest_notifications = Notification.objects.for_user(request.user).order_by("-created_at")[:10]
     else:
         unread_count = 0
         latest_notifications = []
@@ -0,0 +1,27 @@
+# Wakes long-polling notification requests (see views.notifications_json).
+#
+# Events go through the report event broker on its own "notifications"
+# channel, so they reach waiting requests in every worker on the host.
+import logging
+import sqlite3
+
+from reports.events import broker
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications"
+
+
+def publish_notification_event(recipient_id):
+    """Tells waiting requests that recipient_id's notifications changed (None: every staff user's)."""
+    event = {"recipient": recipient_id}
+    try:
+        broker.publish(event, channel=CHANNEL)
+    except sqlite3.Error:
+        # Best effort; waiting requests still time out and re-check
+        logger.exception("Could not publish notification event %s", event)
+
+
+def concerns(event, user):
+    recipient = event.get("recipient")
+    return recipient == user.pk or (recipient is None and user.is_staff)
@@ -1,16 +1,27 @@
+import time
+
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import timedelta
 from notifications.models import Notification
 
 class Command(BaseCommand):
-    help = "Delete notifications older than 7 days"
+    help = "Delete notifications past their retention period (NOTIFICATION_RETENTION_DAYS), in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Rows per batch (default NOTIFICATION_CLEANUP_BATCH_SIZE)")
+        parser.add_argument("--pause", type=float, help="Seconds between batches (default NOTIFICATION_CLEANUP_PAUSE)")
 
-    def handle(self, *args, **kwargs):
-        cutoff_date = timezone.now() - timedelta(days=7)
-        deleted_count, _ = Notification.objects.filter(
-            created_at__lt=cutoff_date
-        ).delete()
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        deleted_count, batches = 0, 0
+        for kind, deleted, seconds in Notification.purge_batches(
+            batch_size=options["batch_size"], pause=options["pause"]
+        ):
+            batches += 1
+            deleted_count += deleted
+            self.stdout.write(f"  {kind}: batch {batches} deleted {deleted} row(s) in {seconds * 1000:.0f} ms")
         self.stdout.write(
-            self.style.SUCCESS(f"Deleted {deleted_count} old notification(s).")
+            self.style.SUCCESS(
+                f"Deleted {deleted_count} old notification(s) in {batches} batch(es), "
+                f"{time.perf_counter() - start:.2f}s."
+            )
         )
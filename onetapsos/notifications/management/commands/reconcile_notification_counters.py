@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from notifications.models import NotificationCounter
+
+
+class Command(BaseCommand):
+    help = "Recount every user's unread notification counters from the notification rows"
+
+    def handle(self, *args, **kwargs):
+        corrected = 0
+        for user_id in get_user_model().objects.values_list('pk', flat=True):
+            before = NotificationCounter.objects.filter(user_id=user_id).values_list(
+                'unread', 'broadcasts_read'
+            ).first()
+            counter = NotificationCounter.reconcile(user_id)
+            if before != (counter.unread, counter.broadcasts_read):
+                corrected += 1
+        NotificationCounter.broadcasts_changed()
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled notification counters; corrected {corrected} user(s).")
+        )
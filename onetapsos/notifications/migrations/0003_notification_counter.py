@@ -0,0 +1,24 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userprofile_area_vicinity_userprofile_designation'),
+        ('notifications', '0002_broadcast_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+                ('broadcasts_read', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:33
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+REPORT_ID = re.compile(r'RPT-\d{4}-\w+')
+
+
+def link_existing_notifications(apps, schema_editor):
+    # Tag the assignment and new-report notifications sent so far, so the
+    # unique constraint keeps deduplicating against them. Repeats of the same
+    # (recipient, kind, report) stay unlinked.
+    Notification = apps.get_model('notifications', 'Notification')
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    report_pks = dict(EmergencyReport.objects.values_list('report_id', 'pk'))
+    seen = set()
+    for note in Notification.objects.order_by('pk'):
+        if 'assigned to Report' in note.message:
+            kind = 'assignment'
+        elif 'New report filed' in note.message:
+            kind = 'new_report'
+        else:
+            continue
+        match = REPORT_ID.search(note.message)
+        report_pk = report_pks.get(match.group()) if match else None
+        key = (note.recipient_id, kind, report_pk)
+        if report_pk is None or key in seen:
+            report_pk = None
+        seen.add(key)
+        Notification.objects.filter(pk=note.pk).update(kind=kind, report_id=report_pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0018_report_facets'),
+        ('notifications', '0003_notification_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('general', 'General'), ('new_report', 'New report'), ('assignment', 'Report assignment')], default='general', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='report',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='reports.emergencyreport'),
+        ),
+        migrations.RunPython(link_existing_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('report__isnull', False)), fields=('recipient', 'kind', 'report'), name='unique_report_notification'),
+        ),
+    ]
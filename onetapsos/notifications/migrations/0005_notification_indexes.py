@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_kind_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at'], name='notification_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-created_at'], name='notification_inbox_idx'),
+        ),
+    ]
@@ -1,30 +1,375 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, When
 from django.conf import settings
+from django.core.cache import caches
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+import time
+import uuid
+
+from .events import publish_notification_event
+
+
+class NotificationQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """The user's direct notifications plus, for staff, the broadcasts."""
+        visible = Q(recipient=user)
+        if user.is_staff:
+            visible |= Q(recipient__isnull=True)
+        return self.filter(visible)
+
+    def for_user(self, user):
+        """
+        visible_to(user), each annotated with `read` (is_read for direct
+        notifications, the user's receipt for broadcasts).
+        """
+        receipt = NotificationReceipt.objects.filter(notification=OuterRef('pk'), user=user)
+        return self.visible_to(user).annotate(read=Case(
+            When(recipient__isnull=True, then=Exists(receipt)),
+            default='is_read',
+            output_field=models.BooleanField(),
+        ))
+
 
 class Notification(models.Model):
+    # No recipient means a broadcast: one row shown to every staff user,
+    # who each mark it read with a NotificationReceipt.
+    KIND_CHOICES = [
+        ('general', 'General'),
+        ('new_report', 'New report'),
+        ('assignment', 'Report assignment'),
+    ]
+
     recipient = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="notifications"
+        related_name="notifications",
+        null=True,
+        blank=True,
     )
     message = models.TextField()
     url = models.CharField(max_length=255, blank=True, null=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='general')
+    report = models.ForeignKey(
+        "reports.EmergencyReport",
+        on_delete=models.SET_NULL,
+        related_name="notifications",
+        null=True,
+        blank=True,
+    )
+
+    objects = NotificationQuerySet.as_manager()
+
+    # Days kept when NOTIFICATION_RETENTION_DAYS doesn't name the kind
+    DEFAULT_RETENTION_DAYS = 7
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+            # A user's inbox: unread first lookups, newest first
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notification_inbox_idx'),
+        ]
+        constraints = [
+            # One notification of each kind per report and recipient
+            models.UniqueConstraint(
+                fields=['recipient', 'kind', 'report'],
+                condition=Q(report__isnull=False),
+                name='unique_report_notification',
+            ),
+        ]
 
     def __str__(self):
+        if self.is_broadcast:
+            return f"Broadcast: {self.message[:50]}"
         return f"Notification for {self.recipient.police_id}: {self.message[:50]}"
 
+    @property
+    def is_broadcast(self):
+        return self.recipient_id is None
+
+    def mark_read(self, user):
+        if self.is_broadcast:
+            _, created = NotificationReceipt.objects.get_or_create(notification=self, user=user)
+            if created:
+                NotificationCounter.adjust(user.pk, broadcasts_read=1)
+        elif Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True):
+            # Only the request that flipped the flag decrements the counter
+            self.is_read = True
+            NotificationCounter.adjust(self.recipient_id, unread=-1)
+
+    @classmethod
+    def mark_read_for(cls, user, queryset):
+        """
+        Marks every notification in `queryset` that `user` can see as read:
+        one UPDATE for direct notifications and one receipt INSERT for
+        broadcasts. Returns how many were marked.
+        """
+        visible = queryset.visible_to(user)
+        with transaction.atomic():
+            direct = visible.filter(recipient=user, is_read=False).update(is_read=True)
+            broadcasts = 0
+            if user.is_staff:
+                unread = list(
+                    visible.filter(recipient__isnull=True).exclude(receipts__user=user).values_list('pk', flat=True)
+                )
+                if unread:
+                    # A concurrent request may have written some of these
+                    # receipts since; ignore_conflicts skips those, so count
+                    # the ones this INSERT added.
+                    receipts = NotificationReceipt.objects.filter(user=user, notification_id__in=unread)
+                    existing = receipts.count()
+                    NotificationReceipt.objects.bulk_create(
+                        [NotificationReceipt(notification_id=pk, user=user) for pk in unread],
+                        ignore_conflicts=True,
+                    )
+                    broadcasts = receipts.count() - existing
+            if direct or broadcasts:
+                NotificationCounter.adjust(user.pk, unread=-direct, broadcasts_read=broadcasts)
+        return direct + broadcasts
+
+    @classmethod
+    def notify_assignment(cls, report, officer_ids):
+        """Tells each officer they were assigned to `report`, once, in one INSERT."""
+        url = reverse("report_view", kwargs={"report_id": report.report_id})
+        cls.objects.bulk_create([
+            cls(
+                recipient_id=officer_id,
+                kind='assignment',
+                report=report,
+                message=f"✅ You’ve been assigned to Report {report.report_id} ({report.location})",
+                url=url,
+            )
+            for officer_id in officer_ids
+        ], ignore_conflicts=True)
+        # bulk_create skips post_save, and the insert doesn't say which rows
+        # were new, so recount these officers.
+        NotificationCounter.recount(officer_ids)
+
+    @classmethod
+    def delete_notifications(cls, queryset):
+        """Deletes `queryset`, keeping the unread counters in step. Returns the count."""
+        with transaction.atomic():
+            unread = list(
+                queryset.filter(recipient__isnull=False, is_read=False)
+                .values_list('recipient').annotate(total=Count('id')).order_by()
+            )
+            receipts = list(
+                NotificationReceipt.objects.filter(notification__in=queryset.filter(recipient__isnull=True))
+                .values_list('user').annotate(total=Count('id')).order_by()
+            )
+            has_broadcasts = queryset.filter(recipient__isnull=True).exists()
+            _, deleted = queryset.delete()
+            # Adjust after deleting: a user without a counter row yet gets
+            # one counted from the remaining rows.
+            changes = {}
+            for user_id, total in unread:
+                changes.setdefault(user_id, {})['unread'] = -total
+            for user_id, total in receipts:
+                changes.setdefault(user_id, {})['broadcasts_read'] = -total
+            for user_id, deltas in changes.items():
+                NotificationCounter.adjust(user_id, **deltas)
+            if has_broadcasts:
+                NotificationCounter.broadcasts_changed()
+        return deleted.get(cls._meta.label, 0)
+
+    @classmethod
+    def retention_days(cls):
+        """{kind: days kept}, from NOTIFICATION_RETENTION_DAYS."""
+        configured = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {})
+        return {kind: configured.get(kind, cls.DEFAULT_RETENTION_DAYS) for kind, _ in cls.KIND_CHOICES}
+
+    @classmethod
+    def purge_batches(cls, retention=None, batch_size=None, pause=None):
+        """
+        Deletes notifications past their kind's retention, oldest first, at
+        most `batch_size` per transaction and sleeping `pause` seconds between
+        batches so report inserts aren't held up behind one long write.
+        Yields (kind, rows deleted, seconds taken) for each batch.
+        """
+        retention = retention or cls.retention_days()
+        batch_size = batch_size or getattr(settings, 'NOTIFICATION_CLEANUP_BATCH_SIZE', 500)
+        pause = getattr(settings, 'NOTIFICATION_CLEANUP_PAUSE', 0.1) if pause is None else pause
+        for kind, days in retention.items():
+            expired = cls.objects.filter(kind=kind, created_at__lt=timezone.now() - timedelta(days=days))
+            while True:
+                start = time.perf_counter()
+                batch = list(expired.order_by('created_at').values_list('pk', flat=True)[:batch_size])
+                if not batch:
+                    break
+                deleted = cls.delete_notifications(cls.objects.filter(pk__in=batch))
+                yield kind, deleted, time.perf_counter() - start
+                if len(batch) < batch_size:
+                    break
+                time.sleep(pause)
+
     @classmethod
     def delete_old_notifications(cls, days=7):
         """
-        Deletes all notifications older than `days`.
+        Deletes all notifications older than `days`, in batches.
         Default is 7 days.
         """
-        cutoff = timezone.now() - timedelta(days=days)
-        old_qs = cls.objects.filter(created_at__lt=cutoff)
-        count = old_qs.count()
-        old_qs.delete()
-        return count
+        retention = {kind: days for kind, _ in cls.KIND_CHOICES}
+        return sum(deleted for _, deleted, _ in cls.purge_batches(retention))
+
+
+class NotificationReceipt(models.Model):
+    """Marks a broadcast notification as read by one user."""
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name="receipts")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notification_receipts")
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'user'], name='unique_notification_receipt'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} read {self.notification_id}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Per-user notification counts, so the navbar badge needn't COUNT(*) the
+    notification table on every page. `unread` counts the user's unread
+    direct notifications and `broadcasts_read` their broadcast receipts;
+    a staff user's unread broadcasts are the broadcast total minus the latter.
+
+    Counts are changed with F() updates by whatever changes the underlying
+    rows, read through the NOTIFICATION_CACHE cache, and can be recomputed
+    with `manage.py reconcile_notification_counters`.
+
+    Cached counts are stored under a version that every change replaces, so
+    a reader that loaded the counter before a change committed caches its
+    value under the old version, where nobody looks, rather than over the
+    invalidation.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread = models.IntegerField(default=0)
+    broadcasts_read = models.IntegerField(default=0)
+
+    BROADCASTS_KEY = "notifications:broadcasts"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+    @staticmethod
+    def cache():
+        return caches[getattr(settings, 'NOTIFICATION_CACHE', 'default')]
+
+    @staticmethod
+    def user_key(user_id):
+        return f"notifications:counter:{user_id}"
+
+    @classmethod
+    def adjust(cls, user_id, unread=0, broadcasts_read=0):
+        updated = cls.objects.filter(user_id=user_id).update(
+            unread=F('unread') + unread,
+            broadcasts_read=F('broadcasts_read') + broadcasts_read,
+        )
+        if not updated:
+            # First change for this user: count from the rows, which
+            # already include this change.
+            cls.reconcile(user_id)
+        cls._changed(cls.user_key(user_id), user_id)
+
+    @classmethod
+    def broadcasts_changed(cls):
+        cls._changed(cls.BROADCASTS_KEY, None)
+
+    @classmethod
+    def _changed(cls, key, recipient_id):
+        # After commit, or another worker could cache the old value again
+        def after_commit():
+            cls.cache().set(f"{key}:version", uuid.uuid4().hex, None)
+            publish_notification_event(recipient_id)
+        transaction.on_commit(after_commit)
+
+    @classmethod
+    def _versioned_keys(cls, cache, keys):
+        """{key: the cache key its current value is stored under}, read before the database."""
+        version_keys = {key: f"{key}:version" for key in keys}
+        versions = cache.get_many(version_keys.values())
+        versioned = {}
+        for key, version_key in version_keys.items():
+            version = versions.get(version_key)
+            if version is None:
+                cache.add(version_key, uuid.uuid4().hex, None)
+                version = cache.get(version_key)
+            versioned[key] = f"{key}:{version}"
+        return versioned
+
+    @classmethod
+    def counts_from_rows(cls, user_id):
+        return {
+            'unread': Notification.objects.filter(recipient_id=user_id, is_read=False).count(),
+            'broadcasts_read': NotificationReceipt.objects.filter(user_id=user_id).count(),
+        }
+
+    @classmethod
+    def reconcile(cls, user_id):
+        """Recounts one user's counters from the notification rows. Returns the row."""
+        counts = cls.counts_from_rows(user_id)
+        try:
+            with transaction.atomic():
+                counter, _ = cls.objects.update_or_create(user_id=user_id, defaults=counts)
+        except IntegrityError:
+            counter = cls.objects.get(user_id=user_id)
+        cls._changed(cls.user_key(user_id), user_id)
+        return counter
+
+    @classmethod
+    def recount(cls, user_ids):
+        """Recounts several users' counters in a fixed number of queries."""
+        user_ids = list(user_ids)
+        unread = dict(
+            Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+            .values_list('recipient').annotate(total=Count('id')).order_by()
+        )
+        broadcasts_read = dict(
+            NotificationReceipt.objects.filter(user_id__in=user_ids)
+            .values_list('user').annotate(total=Count('id')).order_by()
+        )
+        cls.objects.bulk_create(
+            [
+                cls(user_id=user_id, unread=unread.get(user_id, 0), broadcasts_read=broadcasts_read.get(user_id, 0))
+                for user_id in user_ids
+            ],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['unread', 'broadcasts_read'],
+        )
+        for user_id in user_ids:
+            cls._changed(cls.user_key(user_id), user_id)
+
+    @classmethod
+    def unread_count(cls, user):
+        """The user's unread notifications, from the cache when possible."""
+        cache = cls.cache()
+        keys = cls._versioned_keys(
+            cache, [cls.user_key(user.pk)] + ([cls.BROADCASTS_KEY] if user.is_staff else [])
+        )
+        cached = cache.get_many(keys.values())
+
+        user_key = keys[cls.user_key(user.pk)]
+        counts = cached.get(user_key)
+        if counts is None:
+            counter = cls.objects.filter(user_id=user.pk).first() or cls.reconcile(user.pk)
+            counts = (counter.unread, counter.broadcasts_read)
+            cache.set(user_key, counts)
+        unread, broadcasts_read = counts
+
+        if not user.is_staff:
+            return unread
+        broadcasts = cached.get(keys[cls.BROADCASTS_KEY])
+        if broadcasts is None:
+            broadcasts = Notification.objects.filter(recipient__isnull=True).count()
+            cache.set(keys[cls.BROADCASTS_KEY], broadcasts)
+        return unread + max(broadcasts - broadcasts_read, 0)
@@ -1,34 +1,28 @@
 from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from django.urls import reverse
+from onetapsos import outbox
 from reports.models import EmergencyReport
-from .models import Notification
-
-User = get_user_model()
+from .models import Notification, NotificationCounter
+from . import tasks  # noqa: registers the outbox handlers
 
+# The notifications themselves are written by the outbox workers (tasks.py)
 @receiver(post_save, sender=EmergencyReport)
 def notify_admins_on_new_report(sender, instance, created, **kwargs):
     if created:
-        staff_users = User.objects.filter(is_staff=True)
-        for staff in staff_users:
-            Notification.objects.create(
-                recipient=staff,
-                message=f"🚨 New report filed: {instance.report_id} at {instance.location}",
-                url=reverse("admin:reports_emergencyreport_change", args=[instance.id])  # ✅ Django admin URL
-            )
+        outbox.enqueue("notifications.new_report", {"report_pk": instance.pk}, key=f"new_report:{instance.pk}")
 
 @receiver(m2m_changed, sender=EmergencyReport.officers_responded.through)
-def notify_officers_on_assignment(sender, instance, action, pk_set, **kwargs):
-    if action == "post_add":
-        for officer_id in pk_set:
-            officer = User.objects.get(pk=officer_id)
-            if not Notification.objects.filter(
-                recipient=officer,
-                message__icontains=f"Report {instance.report_id}"
-            ).exists():
-                Notification.objects.create(
-                    recipient=officer,
-                    message=f"✅ You’ve been assigned to Report {instance.report_id} ({instance.location})",
-                    url=reverse("report_view", kwargs={"report_id": instance.report_id})  # ✅ Officer link
-                )
+def notify_officers_on_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add" and not reverse and pk_set:
+        outbox.enqueue("notifications.assignment", {"report_pk": instance.pk, "officer_ids": sorted(pk_set)})
+
+
+# Keep the unread counters in step with new notifications
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if not created:
+        return
+    if instance.is_broadcast:
+        NotificationCounter.broadcasts_changed()
+    elif not instance.is_read:
+        NotificationCounter.adjust(instance.recipient_id, unread=1)
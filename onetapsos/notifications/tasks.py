@@ -0,0 +1,32 @@
+# Outbox handlers (onetapsos/outbox.py) for notification fan-out.
+# Queued by notifications/signals.py; each must be safe to run more than once.
+from django.urls import reverse
+from onetapsos.outbox import task
+from reports.models import EmergencyReport
+from .models import Notification
+
+
+@task("notifications.new_report")
+def notify_new_report(report_pk):
+    report = EmergencyReport.objects.filter(pk=report_pk).first()
+    if report is None or Notification.objects.filter(recipient=None, kind="new_report", report=report).exists():
+        return
+    # One broadcast row for all staff, however many there are
+    Notification.objects.create(
+        recipient=None,
+        kind="new_report",
+        report=report,
+        message=f"🚨 New report filed: {report.report_id} at {report.location}",
+        url=reverse("admin:reports_emergencyreport_change", args=[report.id])  # ✅ Django admin URL
+    )
+
+
+@task("notifications.assignment")
+def notify_assignment(report_pk, officer_ids):
+    report = EmergencyReport.objects.filter(pk=report_pk).first()
+    if report is None:
+        return
+    # Only officers still on the report; the unique key makes repeats no-ops
+    officer_ids = list(report.officers_responded.filter(pk__in=officer_ids).values_list('pk', flat=True))
+    if officer_ids:
+        Notification.notify_assignment(report, officer_ids)
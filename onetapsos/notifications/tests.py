@@ -1,3 +1,108 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from .models import Notification, NotificationCounter, NotificationReceipt
+
+
+class MarkReadForTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+        cls.officer = User.objects.create_user("PNP-00002", None, email="officer@example.com")
+
+    def setUp(self):
+        self.broadcasts = [Notification.objects.create(message=f"Broadcast {n}") for n in range(3)]
+        self.direct = [Notification.objects.create(recipient=self.staff, message=f"Direct {n}") for n in range(2)]
+
+    def assertCounterMatchesRows(self, user):
+        counter = NotificationCounter.objects.get(user=user)
+        self.assertEqual(
+            {'unread': counter.unread, 'broadcasts_read': counter.broadcasts_read},
+            NotificationCounter.counts_from_rows(user.pk),
+        )
+
+    def test_marking_twice_counts_once(self):
+        self.assertEqual(Notification.mark_read_for(self.staff, Notification.objects.all()), 5)
+        self.assertEqual(Notification.mark_read_for(self.staff, Notification.objects.all()), 0)
+        self.assertCounterMatchesRows(self.staff)
+        self.assertEqual(NotificationCounter.unread_count(self.staff), 0)
+
+    def test_receipts_written_concurrently_are_not_counted(self):
+        receipts = NotificationReceipt.objects.filter
+
+        def other_request_first(*args, **kwargs):
+            # Another request marks the first broadcast read after this one
+            # has listed the unread broadcasts
+            if not NotificationReceipt.objects.exists():
+                NotificationReceipt.objects.create(notification=self.broadcasts[0], user=self.staff)
+                NotificationCounter.adjust(self.staff.pk, broadcasts_read=1)
+            return receipts(*args, **kwargs)
+
+        with mock.patch.object(NotificationReceipt.objects, 'filter', side_effect=other_request_first):
+            marked = Notification.mark_read_for(self.staff, Notification.objects.filter(recipient__isnull=True))
+        self.assertEqual(marked, 2)
+        self.assertEqual(NotificationReceipt.objects.filter(user=self.staff).count(), 3)
+        self.assertCounterMatchesRows(self.staff)
+
+
+class VisibleToTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+        cls.other_staff = User.objects.create_user("PNP-00003", None, email="other@example.com", is_staff=True)
+        cls.officer = User.objects.create_user("PNP-00002", None, email="officer@example.com")
+        cls.broadcast = Notification.objects.create(message="New report")
+        cls.direct = Notification.objects.create(recipient=cls.staff, message="Assigned")
+
+    def read_flags(self, user):
+        return dict(Notification.objects.for_user(user).values_list('pk', 'read'))
+
+    def test_receipt_marks_read_only_for_its_owner(self):
+        self.broadcast.mark_read(self.staff)
+        self.assertEqual(self.read_flags(self.staff), {self.broadcast.pk: True, self.direct.pk: False})
+        self.assertEqual(self.read_flags(self.other_staff), {self.broadcast.pk: False})
+
+    def test_non_staff_see_only_their_own_notifications(self):
+        self.assertEqual(self.read_flags(self.officer), {})
+        self.assertNotIn(self.direct, Notification.objects.visible_to(self.other_staff))
+
+
+@override_settings(NOTIFICATION_CACHE='default')
+class CounterCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+
+    def setUp(self):
+        NotificationCounter.cache().clear()
+        NotificationCounter.reconcile(self.staff.pk)
+
+    def test_read_racing_a_change_does_not_cache_the_old_count(self):
+        counters = NotificationCounter.objects.filter
+
+        def change_during_read(*args, **kwargs):
+            patched.stop()
+            counter = counters(*args, **kwargs).first()
+            # A direct notification and a broadcast commit after this read
+            # but before its result is cached
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(recipient=self.staff, message="Assigned")
+                Notification.objects.create(message="New report")
+            return mock.Mock(first=lambda: counter)
+
+        patched = mock.patch.object(NotificationCounter.objects, 'filter', side_effect=change_during_read)
+        patched.start()
+        self.addCleanup(patched.stop)
+        # Stale for the direct count, which was read before the change
+        self.assertEqual(NotificationCounter.unread_count(self.staff), 1)
+        self.assertEqual(NotificationCounter.unread_count(self.staff), 2)
+
+    def test_counts_are_served_from_the_cache(self):
+        NotificationCounter.unread_count(self.staff)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationCounter.unread_count(self.staff), 0)
@@ -6,5 +6,8 @@ urlpatterns = [
     path("<int:pk>/read/", views.mark_as_read, name="mark_as_read"),
     path("mark/<int:pk>/", views.mark_as_read, name="mark_as_read"),
     path("json/", views.notifications_json, name="notifications_json"),  # <- add this
+    path("read/", views.mark_selected_read, name="mark_selected_read"),
+    path("read/all/", views.mark_all_read, name="mark_all_read"),
+    path("read/up-to/<int:pk>/", views.mark_read_up_to, name="mark_read_up_to"),
 ]
 
@@ -1,43 +1,161 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Notification
-from django.http import JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_POST
+from reports.events import broker
+from .events import CHANNEL, concerns
+from .models import Notification, NotificationCounter
+from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseNotModified
 
-# ---------------- API End POINTS ---------------- #
-@login_required
-def notifications_json(request):
-    latest_notes = Notification.objects.filter(recipient=request.user).order_by("-created_at")[:5]
-    data = {
-        "unread_count": Notification.objects.filter(recipient=request.user, is_read=False).count(),
+# How often the page polls when the server can't hold requests open (WSGI)
+POLL_INTERVAL_SECONDS = 10
+
+
+# ---------------- Helper Functions ---------------- #
+def notifications_etag(user):
+    """Changes whenever the user gets a notification or the unread count moves."""
+    latest_id = Notification.objects.visible_to(user).order_by("-id").values_list("id", flat=True).first()
+    return f'"{latest_id or 0}-{NotificationCounter.unread_count(user)}"'
+
+
+def notifications_data(user):
+    latest_notes = Notification.objects.for_user(user).order_by("-created_at")[:5]
+    return {
+        "unread_count": NotificationCounter.unread_count(user),
         "notifications": [
             {
                 "id": n.id,
                 "message": n.message,
                 "url": n.url or "#",
-                "is_read": n.is_read,
+                "is_read": n.read,
                 "created_at": n.created_at.strftime("%Y-%m-%d %H:%M:%S"),
             }
             for n in latest_notes
         ]
     }
-    return JsonResponse(data)
+
+
+def long_poll_timeout(request):
+    """Seconds to hold the request (?wait=), capped by NOTIFICATIONS_LONG_POLL_TIMEOUT."""
+    try:
+        wait = float(request.GET.get("wait", 0))
+    except ValueError:
+        return 0
+    return max(0, min(wait, getattr(settings, "NOTIFICATIONS_LONG_POLL_TIMEOUT", 25)))
+
+
+async def wait_for_change(user, etag, timeout):
+    """Waits until the user's notifications etag differs from `etag` or the timeout passes."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    queue = await broker.subscribe(channel=CHANNEL)
+    try:
+        # Check again now that we're subscribed, so nothing slips in between
+        current = await sync_to_async(notifications_etag)(user)
+        while current == etag:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if concerns(event, user):
+                current = await sync_to_async(notifications_etag)(user)
+        return current
+    finally:
+        broker.unsubscribe(queue)
+
+
+# ---------------- API End POINTS ---------------- #
+async def notifications_json(request):
+    """
+    Latest notifications and unread count, with an ETag. A request whose
+    If-None-Match still matches gets a 304.
+
+    With ?wait=<seconds> (ASGI only) a matching request is held until the
+    user's notifications change or the wait runs out, so the page can ask
+    again straight away. Responses that didn't wait carry X-Poll-Interval,
+    the seconds to pause before the next request.
+    """
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    known = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    etag = await sync_to_async(notifications_etag)(user)
+    # Under WSGI a held request would pin a worker, so answer at once
+    wait = long_poll_timeout(request) if isinstance(request, ASGIRequest) else 0
+    if wait and etag in known:
+        etag = await wait_for_change(user, etag, wait)
+
+    if etag in known:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(await sync_to_async(notifications_data)(user))
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    if not wait:
+        response["X-Poll-Interval"] = str(POLL_INTERVAL_SECONDS)
+    return response
 
 
 
 @login_required
 def notifications_list(request):
-    notifications = Notification.objects.filter(recipient=request.user).order_by("-created_at")
+    notifications = Notification.objects.for_user(request.user).order_by("-created_at")
     return render(request, "notifications/notifications_list.html", {
         "notifications": notifications
     })
 
 @login_required
 def mark_as_read(request, pk):
-    notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
-    notification.is_read = True
-    notification.save()
+    notification = get_object_or_404(Notification.objects.for_user(request.user), pk=pk)
+    notification.mark_read(request.user)
 
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return JsonResponse({"status": "ok"})  # no redirect for AJAX
 
     return redirect(notification.url or "/")
+
+
+# ---------------- Bulk read state ---------------- #
+def marked_response(request, marked):
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return JsonResponse({
+            "status": "ok",
+            "marked": marked,
+            "unread_count": NotificationCounter.unread_count(request.user),
+        })
+    return redirect("notifications_list")
+
+
+@login_required
+@require_POST
+def mark_all_read(request):
+    marked = Notification.mark_read_for(request.user, Notification.objects.all())
+    return marked_response(request, marked)
+
+
+@login_required
+@require_POST
+def mark_read_up_to(request, pk):
+    # Only what the user has seen: newer notifications stay unread
+    marked = Notification.mark_read_for(request.user, Notification.objects.filter(pk__lte=pk))
+    return marked_response(request, marked)
+
+
+@login_required
+@require_POST
+def mark_selected_read(request):
+    try:
+        ids = [int(pk) for pk in request.POST.getlist("ids")]
+    except ValueError:
+        return HttpResponseBadRequest("ids must be integers")
+    marked = Notification.mark_read_for(request.user, Notification.objects.filter(pk__in=ids))
+    return marked_response(request, marked)
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import JobRun, OutboxMessage, SchedulerLease
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ("job", "started_at", "duration", "status", "rows", "holder")
+    list_filter = ("job", "status")
+
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ("name", "holder", "expires_at")
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("task", "payload", "status", "attempts", "created_at", "processed_at")
+    list_filter = ("status", "task")
@@ -1,7 +1,4 @@
 from django.apps import AppConfig
-from django.core.management import call_command
-import threading
-import time
 
 
 class OnetapsosConfig(AppConfig):
@@ -9,20 +6,16 @@ class OnetapsosConfig(AppConfig):
     name = 'onetapsos'
 
     def ready(self):
-        """Run cleanup tasks daily in the background"""
-        from django.conf import settings
+        """
+        Run the scheduled cleanup jobs (see onetapsos/scheduler.py) and the
+        outbox of report side effects (see onetapsos/outbox.py)
+        """
+        from .outbox import worker
+        from .scheduler import runner, should_autostart
 
-        def scheduler():
-            while True:
-                # Run your existing report cleanup
-                call_command("cleanup_report")
-
-                # Run your notification cleanup
-                call_command("cleanup_notifications")
-
-                # Wait 24 hours (86400 seconds)
-                time.sleep(86400)
-
-        # Run scheduler in a background thread (so Django can still serve requests)
-        thread = threading.Thread(target=scheduler, daemon=True)
-        thread.start()
+        # Only web server processes; every one may start it, as a database
+        # lease picks the single process that actually runs the jobs.
+        if should_autostart():
+            runner.start()
+        if should_autostart("OUTBOX_AUTOSTART"):
+            worker.start()
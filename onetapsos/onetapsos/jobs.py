@@ -0,0 +1,37 @@
+# Scheduled maintenance jobs. Each returns {label: row count} for its JobRun.
+from reports.models import DeletedReport, EmergencyReport, ReportFacet
+from notifications.models import Notification
+from . import outbox
+
+
+def cleanup_reports():
+    return {
+        "expired_reports_deleted": EmergencyReport.delete_expired_reports(),
+        "deleted_markers_purged": DeletedReport.purge(),
+    }
+
+
+def cleanup_notifications():
+    deleted, batches = 0, 0
+    for _, count, _ in Notification.purge_batches():
+        deleted += count
+        batches += 1
+    return {"notifications_deleted": deleted, "batches": batches}
+
+
+def rebuild_report_facets():
+    # Reconciles the dropdown counts with the report table
+    return {"report_facets": ReportFacet.rebuild()}
+
+
+def purge_outbox():
+    return {"outbox_messages_deleted": outbox.purge()}
+
+
+# Job id -> function; schedules are in settings.SCHEDULED_JOBS
+JOBS = {
+    "cleanup_reports": cleanup_reports,
+    "cleanup_notifications": cleanup_notifications,
+    "rebuild_report_facets": rebuild_report_facets,
+    "purge_outbox": purge_outbox,
+}
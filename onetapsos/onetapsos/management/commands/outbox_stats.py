@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from onetapsos import outbox
+
+
+class Command(BaseCommand):
+    help = "Show the outbox backlog: messages by status, pending by task and how far behind it is"
+
+    def handle(self, *args, **options):
+        stats = outbox.stats()
+        self.stdout.write(
+            f"pending {stats['pending']} (retrying {stats['retrying']}), running {stats['running']}, "
+            f"done {stats['done']}, failed {stats['failed']}"
+        )
+        self.stdout.write(f"oldest pending: {stats['oldest_pending_seconds']:.1f}s")
+        for task, total in sorted(stats['pending_by_task'].items()):
+            self.stdout.write(f"  {task}: {total}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from onetapsos import outbox
+
+
+class Command(BaseCommand):
+    help = "Run queued report side effects (the outbox) in this process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--drain", action="store_true", help="Run what is queued now, then exit")
+
+    def handle(self, *args, **options):
+        if options["drain"]:
+            succeeded, failed = outbox.drain()
+            self.stdout.write(self.style.SUCCESS(f"Ran {succeeded} message(s); {failed} failed or will be retried."))
+            return
+        self.stdout.write("Outbox worker started; press Ctrl+C to stop.")
+        try:
+            outbox.worker.run()
+        except KeyboardInterrupt:
+            self.stdout.write(f"Outbox worker stopped ({dict(outbox.worker.counts)}).")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from onetapsos.scheduler import runner
+
+
+class Command(BaseCommand):
+    help = "Run the scheduled jobs in this process (competes for the scheduler lease with the web workers)"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Job runner started; press Ctrl+C to stop.")
+        try:
+            runner.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Job runner stopped.")
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=50)),
+                ('holder', models.CharField(max_length=100)),
+                ('started_at', models.DateTimeField(db_index=True)),
+                ('duration', models.FloatField(help_text='Seconds')),
+                ('status', models.CharField(choices=[('success', 'Success'), ('error', 'Error')], max_length=10)),
+                ('rows', models.JSONField(blank=True, default=dict, help_text='Row counts reported by the job')),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('holder', models.CharField(max_length=100)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
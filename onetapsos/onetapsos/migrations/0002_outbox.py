@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onetapsos', '0001_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=100)),
+                ('payload', models.JSONField(default=dict)),
+                ('key', models.CharField(blank=True, max_length=150, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not run before this (retry backoff)')),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='outboxmessage',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('key',), name='unique_pending_outbox_key'),
+        ),
+    ]
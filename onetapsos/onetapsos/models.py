@@ -0,0 +1,104 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class SchedulerLease(models.Model):
+    """
+    A named lease held by one process until `expires_at`. The job runner
+    (onetapsos/scheduler.py) keeps renewing the "scheduler" lease; only the
+    process holding it runs scheduled jobs.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    holder = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder} until {self.expires_at}"
+
+    @classmethod
+    def acquire(cls, name, holder, duration):
+        """Takes or renews the lease if it is free, expired or already ours."""
+        now = timezone.now()
+        renewed = cls.objects.filter(name=name).filter(
+            Q(holder=holder) | Q(expires_at__lt=now)
+        ).update(holder=holder, expires_at=now + duration)
+        if renewed:
+            return True
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, holder=holder, expires_at=now + duration)
+        except IntegrityError:
+            return False  # someone else holds it
+        return True
+
+    @classmethod
+    def holds(cls, name, holder):
+        return cls.objects.filter(name=name, holder=holder, expires_at__gte=timezone.now()).exists()
+
+    @classmethod
+    def release(cls, name, holder):
+        cls.objects.filter(name=name, holder=holder).update(expires_at=timezone.now())
+
+
+class JobRun(models.Model):
+    """One run of a scheduled job: when, how long, and the rows it touched."""
+    STATUS_CHOICES = [
+        ('success', 'Success'),
+        ('error', 'Error'),
+    ]
+
+    job = models.CharField(max_length=50)
+    holder = models.CharField(max_length=100)
+    started_at = models.DateTimeField(db_index=True)
+    duration = models.FloatField(help_text="Seconds")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    rows = models.JSONField(default=dict, blank=True, help_text="Row counts reported by the job")
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.job} at {self.started_at:%Y-%m-%d %H:%M} ({self.status}, {self.duration:.2f}s)"
+
+
+class OutboxMessage(models.Model):
+    """
+    A side effect of a report change, written in the same transaction as the
+    change and run afterwards by the outbox workers (onetapsos/outbox.py).
+    A message with a `key` is dropped if one with the same key is already
+    pending, so repeated changes to a report queue its work only once.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    key = models.CharField(max_length=150, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not run before this (retry backoff)")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Claiming: the next available pending messages
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=Q(status='pending'), name='unique_pending_outbox_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} {self.payload} ({self.status})"
@@ -0,0 +1,258 @@
+# Transactional outbox for slow side effects of report changes.
+#
+# Signal handlers call enqueue() instead of doing the work: that is one
+# INSERT into OutboxMessage, in the same transaction as the report change,
+# so a rolled back change queues nothing and a committed one is never lost.
+# Each web process runs an OutboxWorker (started like the job runner, see
+# scheduler.should_autostart) that claims pending messages and runs their
+# handlers on a small thread pool. `manage.py run_outbox` does the same in a
+# dedicated process.
+#
+# Handlers are registered with @task(name). They must be idempotent: a
+# message is retried with backoff when its handler raises, up to
+# OUTBOX_MAX_ATTEMPTS times, and a message whose worker died is claimed again
+# once its lock expires. A handler and the "done" mark commit together.
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+# Set when this process queues a message, so its worker needn't wait a poll
+_wakeup = threading.Event()
+
+
+def task(name):
+    """Registers the decorated function as the handler for `name` messages."""
+    def register(func):
+        _handlers[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload, key=None):
+    """
+    Queues `name` to run with **payload after the current transaction
+    commits. With a `key`, does nothing if a message with that key is
+    already waiting to run.
+    """
+    from .models import OutboxMessage
+
+    OutboxMessage.objects.bulk_create(
+        [OutboxMessage(task=name, payload=payload, key=key)], ignore_conflicts=key is not None
+    )
+    transaction.on_commit(_wakeup.set)
+
+
+def setting(name, default):
+    return getattr(settings, name, default)
+
+
+def claimable(now):
+    return Q(status='pending', available_at__lte=now) | Q(status='running', locked_until__lt=now)
+
+
+def claim(worker, limit):
+    """Locks up to `limit` runnable messages for `worker` and returns them."""
+    from .models import OutboxMessage
+
+    now = timezone.now()
+    lock_until = now + timedelta(seconds=setting('OUTBOX_LOCK_SECONDS', 300))
+    with transaction.atomic():
+        pks = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(claimable(now))
+            .order_by('available_at', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not pks:
+            return []
+        OutboxMessage.objects.filter(claimable(now), pk__in=pks).update(
+            status='running', locked_by=worker, locked_until=lock_until
+        )
+    return list(OutboxMessage.objects.filter(pk__in=pks, status='running', locked_by=worker))
+
+
+class Superseded(Exception):
+    """The message was claimed again by another worker while this one ran."""
+
+
+def process(message):
+    """Runs one claimed message. Returns True if it succeeded."""
+    from .models import OutboxMessage
+
+    mine = OutboxMessage.objects.filter(pk=message.pk, status='running', locked_by=message.locked_by)
+    try:
+        try:
+            handler = _handlers[message.task]
+        except KeyError:
+            raise LookupError(f"No outbox handler for {message.task!r}")
+        with transaction.atomic():
+            handler(**message.payload)
+            if not mine.update(status='done', attempts=F('attempts') + 1, processed_at=timezone.now(), last_error=''):
+                raise Superseded
+        return True
+    except Superseded:
+        return False
+    except Exception:
+        logger.exception("Outbox message %s (%s) failed", message.pk, message.task)
+        fail(mine, message, traceback.format_exc())
+        return False
+    finally:
+        connection.close()
+
+
+def fail(mine, message, error):
+    """Schedules a retry with exponential backoff, or gives up after OUTBOX_MAX_ATTEMPTS."""
+    attempts = message.attempts + 1
+    if attempts >= setting('OUTBOX_MAX_ATTEMPTS', 5):
+        mine.update(status='failed', attempts=attempts, processed_at=timezone.now(), last_error=error)
+        return
+    delay = min(2 ** attempts, setting('OUTBOX_MAX_BACKOFF_SECONDS', 300))
+    try:
+        with transaction.atomic():
+            mine.update(
+                status='pending', attempts=attempts, last_error=error, locked_by='', locked_until=None,
+                available_at=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # A newer message with the same key is already queued and will redo the work
+        mine.update(status='done', attempts=attempts, processed_at=timezone.now(), last_error=error)
+
+
+def drain(limit=None):
+    """Runs every runnable message in this thread, e.g. from a shell. Returns (succeeded, failed)."""
+    succeeded = failed = 0
+    worker = f"drain:{os.getpid()}"
+    while limit is None or succeeded + failed < limit:
+        messages = claim(worker, 100 if limit is None else min(100, limit - succeeded - failed))
+        if not messages:
+            break
+        for message in messages:
+            if process(message):
+                succeeded += 1
+            else:
+                failed += 1
+    return succeeded, failed
+
+
+def stats():
+    """Backlog numbers from the database: counts by status, pending by task and queue lag."""
+    from .models import OutboxMessage
+
+    now = timezone.now()
+    by_status = dict(OutboxMessage.objects.values_list('status').annotate(total=Count('pk')).order_by())
+    pending = OutboxMessage.objects.filter(status='pending')
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'pending': by_status.get('pending', 0),
+        'running': by_status.get('running', 0),
+        'done': by_status.get('done', 0),
+        'failed': by_status.get('failed', 0),
+        'retrying': pending.filter(attempts__gt=0).count(),
+        'oldest_pending_seconds': (now - oldest).total_seconds() if oldest else 0,
+        'pending_by_task': dict(pending.values_list('task').annotate(total=Count('pk')).order_by()),
+    }
+
+
+def purge(days=1):
+    """Deletes messages that finished more than `days` ago. Failed ones are kept for inspection."""
+    from .models import OutboxMessage
+
+    deleted, _ = OutboxMessage.objects.filter(
+        status='done', processed_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+class OutboxWorker:
+    """
+    Claims messages for a pool of OUTBOX_WORKERS threads. It claims no more
+    than the pool has room for, so a slow handler backs messages up in the
+    table (where stats() and other processes see them) rather than in memory.
+    """
+
+    def __init__(self):
+        self.name = None
+        self._thread = None
+        self._stopping = threading.Event()
+        # This process's counters since start
+        self.counts = Counter()
+        self.in_flight = 0
+
+    @property
+    def size(self):
+        return setting('OUTBOX_WORKERS', 2)
+
+    def start(self):
+        """Runs the worker in a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        _wakeup.set()
+
+    def run(self):
+        """Claims and runs messages until stop(); blocks."""
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        poll = setting('OUTBOX_POLL_INTERVAL', 1.0)
+        # Handlers register as their apps load; ready() may still be running
+        while not apps.ready and not self._stopping.wait(0.1):
+            pass
+        futures = set()
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="outbox-worker") as pool:
+            while not self._stopping.is_set():
+                _wakeup.clear()
+                room = self.size - len(futures)
+                messages = self.claim(room) if room else []
+                for message in messages:
+                    futures.add(pool.submit(self.process, message))
+                self.in_flight = len(futures)
+                if futures and (not room or not messages):
+                    # Pool full or backlog empty: wait for a handler to finish
+                    done, futures = wait(futures, timeout=poll, return_when=FIRST_COMPLETED)
+                elif not messages:
+                    _wakeup.wait(poll)
+            wait(futures)
+
+    def claim(self, limit):
+        try:
+            messages = claim(self.name, limit)
+        except Exception:
+            logger.exception("Could not claim outbox messages")
+            return []
+        finally:
+            connection.close()
+        if messages:
+            lag = max((timezone.now() - message.created_at).total_seconds() for message in messages)
+            self.counts['claimed'] += len(messages)
+            if lag > setting('OUTBOX_LAG_WARNING_SECONDS', 30):
+                logger.warning("Outbox is %.0fs behind (%d pending messages claimed)", lag, len(messages))
+        return messages
+
+    def process(self, message):
+        start = time.perf_counter()
+        succeeded = process(message)
+        self.counts['succeeded' if succeeded else 'failed'] += 1
+        self.counts['handler_ms'] += int((time.perf_counter() - start) * 1000)
+        return succeeded
+
+
+worker = OutboxWorker()
@@ -0,0 +1,182 @@
+# Runs the jobs in onetapsos/jobs.py on their cron schedules (SCHEDULED_JOBS).
+#
+# Any number of processes may start a JobRunner; they compete for the
+# "scheduler" SchedulerLease in the database and only the holder starts an
+# APScheduler (with django_apscheduler's job store), so each job runs once.
+# The holder renews the lease every SCHEDULER_HEARTBEAT_SECONDS; if it dies,
+# another process takes over once the lease expires.
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django_apscheduler import util
+from django_apscheduler.jobstores import DjangoJobStore
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+
+
+# Programs that serve requests; background threads start only in these
+SERVER_PROGRAMS = {"gunicorn", "uvicorn", "daphne"}
+# Management command runners, where only `runserver` serves requests
+COMMAND_PROGRAMS = {"manage.py", "django-admin", "django"}
+
+
+def program_name(argv):
+    """The program being run: the script's name, or the package for `python -m package`."""
+    if not argv or not argv[0]:
+        return ""
+    name = os.path.basename(argv[0])
+    if name == "__main__.py":
+        return os.path.basename(os.path.dirname(argv[0]))
+    return name
+
+
+def should_autostart(setting="SCHEDULER_AUTOSTART"):
+    """
+    Start only in the web server processes: gunicorn, uvicorn, daphne and
+    runserver's serving process. Never for other manage.py commands
+    (migrate, shell, test, ...), scripts or pytest. `manage.py run_scheduler`
+    runs the scheduler on its own.
+    """
+    if not getattr(settings, setting, True) or "pytest" in sys.modules:
+        return False
+    program = program_name(sys.argv)
+    if program in COMMAND_PROGRAMS:
+        # With the autoreloader, only the child process serves requests
+        return sys.argv[1:2] == ["runserver"] and (
+            os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+        )
+    return program in SERVER_PROGRAMS
+
+
+@util.close_old_connections
+def run_job(job_id):
+    """Runs one job and records it as a JobRun, if this process still leads."""
+    from .jobs import JOBS
+    from .models import JobRun, SchedulerLease
+
+    if not SchedulerLease.holds(LEASE_NAME, runner.holder):
+        logger.info("Skipping %s: this process no longer holds the scheduler lease", job_id)
+        return
+    started_at = timezone.now()
+    start = time.perf_counter()
+    status, rows, error = "success", {}, ""
+    try:
+        rows = JOBS[job_id]() or {}
+    except Exception:
+        status, error = "error", traceback.format_exc()
+        logger.exception("Scheduled job %s failed", job_id)
+    JobRun.objects.create(
+        job=job_id,
+        holder=runner.holder,
+        started_at=started_at,
+        duration=time.perf_counter() - start,
+        status=status,
+        rows=rows,
+        error=error,
+    )
+
+
+class JobRunner:
+    def __init__(self):
+        self.holder = None
+        self.scheduler = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def heartbeat(self):
+        return getattr(settings, "SCHEDULER_HEARTBEAT_SECONDS", 30)
+
+    @property
+    def lease_duration(self):
+        # Long enough to survive a missed heartbeat or two
+        return timedelta(seconds=self.heartbeat * 3)
+
+    def start(self):
+        """Competes for the lease from a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """Competes for the lease until stop(); blocks."""
+        # Named here, in the process that runs, not where the module was imported
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        try:
+            while not self._stopping.is_set():
+                self.tick()
+                self._stopping.wait(self.heartbeat)
+        finally:
+            self.stop_scheduler()
+            self.release()
+
+    def stop(self):
+        self._stopping.set()
+
+    def tick(self):
+        from .models import SchedulerLease
+
+        try:
+            leading = SchedulerLease.acquire(LEASE_NAME, self.holder, self.lease_duration)
+        except Exception:
+            logger.exception("Could not renew the scheduler lease")
+            leading = False
+        finally:
+            connection.close()
+
+        if leading and self.scheduler is None:
+            self.start_scheduler()
+        elif not leading and self.scheduler is not None:
+            self.stop_scheduler()
+
+    def start_scheduler(self):
+        scheduler = BackgroundScheduler(timezone=settings.TIME_ZONE)
+        scheduler.add_jobstore(DjangoJobStore(), "default")
+        for job_id, cron in getattr(settings, "SCHEDULED_JOBS", {}).items():
+            scheduler.add_job(
+                run_job,
+                trigger=CronTrigger.from_crontab(cron, timezone=settings.TIME_ZONE),
+                args=[job_id],
+                id=job_id,
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=3600,
+                replace_existing=True,
+            )
+        scheduler.start()
+        self.scheduler = scheduler
+        logger.info("%s took the scheduler lease; running %s", self.holder, [job.id for job in scheduler.get_jobs()])
+
+    def stop_scheduler(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+            logger.info("%s stopped running scheduled jobs", self.holder)
+
+    def release(self):
+        from .models import SchedulerLease
+
+        try:
+            SchedulerLease.release(LEASE_NAME, self.holder)
+        except Exception:
+            logger.exception("Could not release the scheduler lease")
+        finally:
+            connection.close()
+
+
+runner = JobRunner()
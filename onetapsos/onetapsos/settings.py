@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -144,6 +145,103 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.UserProfile'
 
+# Report IDs are reserved from reports.ReportSequence in blocks of this size
+# per worker process. Larger blocks mean fewer writes to the sequence row.
+REPORT_ID_BLOCK_SIZE = 20
+
+# Report JSON endpoints send keyset-paginated pages of REPORT_PAGE_SIZE rows
+# (?limit= up to REPORT_PAGE_SIZE_MAX), looking up officer names
+# REPORT_ITERATOR_CHUNK_SIZE rows at a time.
+REPORT_PAGE_SIZE = 50
+REPORT_PAGE_SIZE_MAX = 500
+REPORT_ITERATOR_CHUNK_SIZE = 200
+
+# cleanup_report deletes expired rejected reports REPORT_EXPIRY_BATCH_SIZE
+# per transaction, pausing REPORT_EXPIRY_PAUSE seconds between batches.
+REPORT_EXPIRY_BATCH_SIZE = 200
+REPORT_EXPIRY_PAUSE = 0.1
+
+# Live report events (reports/events.py) are shared between workers through
+# this SQLite file. Each worker with open dashboards checks it every
+# REPORT_EVENTS_POLL_INTERVAL seconds.
+REPORT_EVENTS_DB = BASE_DIR / 'report_events.sqlite3'
+REPORT_EVENTS_POLL_INTERVAL = 0.5
+REPORT_EVENTS_RETENTION_SECONDS = 300
+
+# Unread notification counts are cached here. It is a file cache so every
+# worker on the host sees the same (invalidated) entries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'notifications': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'notifications',
+        'TIMEOUT': 300,
+    },
+}
+NOTIFICATION_CACHE = 'notifications'
+
+# Longest a notifications_json long-poll (?wait=) is held open, in seconds
+NOTIFICATIONS_LONG_POLL_TIMEOUT = 25
+
+# Days each kind of notification is kept (others: 7). cleanup_notifications
+# deletes expired ones NOTIFICATION_CLEANUP_BATCH_SIZE rows per transaction,
+# pausing NOTIFICATION_CLEANUP_PAUSE seconds between batches.
+NOTIFICATION_RETENTION_DAYS = {
+    'general': 7,
+    'new_report': 7,
+    'assignment': 30,
+}
+NOTIFICATION_CLEANUP_BATCH_SIZE = 500
+NOTIFICATION_CLEANUP_PAUSE = 0.1
+
+# Scheduled jobs (onetapsos/jobs.py) and their cron schedules. Web processes
+# start the job runner unless SCHEDULER_AUTOSTART is off (then use
+# `manage.py run_scheduler`); one process at a time holds the lease and runs
+# the jobs, renewing it every SCHEDULER_HEARTBEAT_SECONDS.
+SCHEDULED_JOBS = {
+    'cleanup_reports': '0 3 * * *',
+    'cleanup_notifications': '15 3 * * *',
+    'rebuild_report_facets': '30 3 * * *',
+    'purge_outbox': '45 3 * * *',
+}
+SCHEDULER_AUTOSTART = True
+SCHEDULER_HEARTBEAT_SECONDS = 30
+
+# Side effects of report changes (deployment history, notifications) are
+# queued in the outbox (onetapsos/outbox.py) and run after the request by
+# OUTBOX_WORKERS threads in each web process (or `manage.py run_outbox` when
+# OUTBOX_AUTOSTART is off). Failed messages are retried up to
+# OUTBOX_MAX_ATTEMPTS times with exponential backoff.
+OUTBOX_AUTOSTART = True
+OUTBOX_WORKERS = 2
+OUTBOX_POLL_INTERVAL = 1.0
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_LAG_WARNING_SECONDS = 30
+
+# Web processes build the in-memory dispatch index (users/dispatch.py) at
+# startup; otherwise it is built after its first lookup. Its thread picks up
+# other workers' officer changes every DISPATCH_INDEX_POLL_SECONDS.
+DISPATCH_INDEX_AUTOSTART = True
+DISPATCH_INDEX_POLL_SECONDS = 1.0
+
+# Response-time analytics (users/analytics.py) keep deployments in memory a
+# month at a time: the last two months for ANALYTICS_RECENT_CACHE_SECONDS
+# (they still change), older ones for ANALYTICS_HISTORY_CACHE_SECONDS.
+# A request may span at most ANALYTICS_MAX_RANGE_DAYS.
+ANALYTICS_RECENT_CACHE_SECONDS = 60
+ANALYTICS_HISTORY_CACHE_SECONDS = 3600
+ANALYTICS_MAX_RANGE_DAYS = 731
+
+# Caller mobile API tokens (callers/tokens.py). Access tokens are verified
+# without a database query, so they are kept short; the app renews them at
+# api/token/refresh/ with its refresh token.
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
+}
+
 #for Officer Profile Picture
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
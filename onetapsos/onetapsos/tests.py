@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import outbox
+from .models import JobRun, OutboxMessage
+
+
+@outbox.task("tests.record")
+def record(job):
+    JobRun.objects.create(job=job, holder="tests", started_at=timezone.now(), duration=0, status="success")
+
+
+@outbox.task("tests.fail")
+def fail():
+    raise RuntimeError("handler failed")
+
+
+class OutboxTests(TestCase):
+    def claim_one(self, worker="worker"):
+        [message] = outbox.claim(worker, 10)
+        return message
+
+    def test_pending_key_is_queued_once(self):
+        outbox.enqueue("tests.record", {"job": "a"}, key="k")
+        outbox.enqueue("tests.record", {"job": "b"}, key="k")
+        self.assertEqual(OutboxMessage.objects.filter(key="k").count(), 1)
+        # Once claimed, the key is free for the next change
+        self.claim_one()
+        outbox.enqueue("tests.record", {"job": "c"}, key="k")
+        self.assertEqual(OutboxMessage.objects.filter(key="k", status="pending").count(), 1)
+
+    def test_claim_locks_messages_until_they_expire(self):
+        outbox.enqueue("tests.record", {"job": "a"})
+        OutboxMessage.objects.create(
+            task="tests.record", payload={"job": "later"}, available_at=timezone.now() + timedelta(minutes=1)
+        )
+        message = self.claim_one("first")
+        self.assertEqual((message.status, message.locked_by, message.payload), ("running", "first", {"job": "a"}))
+        self.assertEqual(outbox.claim("second", 10), [])
+
+        # A worker that died leaves its lock behind; it is claimed again once it expires
+        OutboxMessage.objects.filter(pk=message.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.claim_one("second").pk, message.pk)
+
+    def test_handler_and_done_mark_commit_together(self):
+        outbox.enqueue("tests.record", {"job": "a"})
+        self.assertTrue(outbox.process(self.claim_one()))
+        self.assertEqual(OutboxMessage.objects.get().status, "done")
+        self.assertTrue(JobRun.objects.filter(job="a").exists())
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        outbox.enqueue("tests.fail", {})
+        before = timezone.now()
+        self.assertFalse(outbox.process(self.claim_one()))
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts, message.locked_by), ("pending", 1, ""))
+        self.assertIn("handler failed", message.last_error)
+        self.assertGreaterEqual(message.available_at, before + timedelta(seconds=2))
+        self.assertEqual(outbox.claim("worker", 10), [])  # not before its backoff
+
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertFalse(outbox.process(self.claim_one()))
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), ("failed", 2))
+
+    def test_failed_retry_yields_to_a_newer_message_with_its_key(self):
+        outbox.enqueue("tests.fail", {}, key="k")
+        message = self.claim_one()
+        outbox.enqueue("tests.fail", {}, key="k")
+        outbox.process(message)
+        self.assertEqual(OutboxMessage.objects.get(pk=message.pk).status, "done")
+        self.assertEqual(OutboxMessage.objects.filter(key="k", status="pending").count(), 1)
+
+    def test_superseded_handler_is_rolled_back(self):
+        outbox.enqueue("tests.record", {"job": "a"})
+        message = self.claim_one()
+        # Its lock ran out and another worker claimed it while this one ran
+        OutboxMessage.objects.filter(pk=message.pk).update(locked_by="other")
+        self.assertFalse(outbox.process(message))
+        self.assertFalse(JobRun.objects.exists())
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.locked_by, message.attempts), ("running", "other", 0))
@@ -1,11 +1,23 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from .models import EmergencyReport
+from . import search
+
+
+class ReportChangeList(ChangeList):
+    """Keeps a full-text search best match first unless a column is sorted."""
+
+    def get_ordering(self, request, queryset):
+        if 'search_rank' in queryset.query.annotations and ORDER_VAR not in self.params:
+            return ['search_rank', '-date_time_reported', '-pk']
+        return super().get_ordering(request, queryset)
+
 
 @admin.register(EmergencyReport)
 class EmergencyReportAdmin(admin.ModelAdmin):
     list_display = ('report_id', 'date_time_reported', 'location', 'crime_category', 'status', 'display_officers')
     list_filter = ('crime_category', 'status', 'date_time_reported')
-    search_fields = ('report_id', 'location', 'sender')
+    search_fields = ('report_id', 'location', 'sender__full_name', 'message')
 
     # Show M2M properly with a dual list box
     filter_horizontal = ('officers_responded',)  
@@ -16,3 +28,15 @@ class EmergencyReportAdmin(admin.ModelAdmin):
         return ", ".join(str(o) for o in officers) if officers else "None"
 
     display_officers.short_description = 'Officers Responded'
+
+    def get_changelist(self, request, **kwargs):
+        return ReportChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text search instead of icontains over every column; ranked
+        # (bm25) only when no column sort would replace that order
+        if not search_term or not search.search_available():
+            return super().get_search_results(request, queryset, search_term)
+        if ORDER_VAR in request.GET:
+            return search.filter_reports(queryset, search_term), False
+        return search.rank_reports(queryset, search_term), False
@@ -0,0 +1,165 @@
+# Live report events for the dashboards (Server-Sent Events).
+#
+# Report hooks call publish() after their transaction commits. Each event is
+# appended to a small SQLite file shared by every worker on the host and
+# handed straight to the streams open in this process. Each process with open
+# streams also tails the file, so events published by other workers reach its
+# dashboards too.
+#
+# Events carry a "channel" ("reports" unless given) and each subscriber only
+# receives its own channel, so other apps (notifications) can share the file.
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUED_EVENTS = 100
+
+
+class ReportEventBroker:
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._subscribers = set()  # (loop, queue, channel)
+        self._pollers = {}  # loop -> asyncio.Task
+        self._schema_ready = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._pollers = {}
+
+    # ---------------- Fan-out file ---------------- #
+    @property
+    def path(self):
+        return str(getattr(settings, 'REPORT_EVENTS_DB', settings.BASE_DIR / 'report_events.sqlite3'))
+
+    @property
+    def retention(self):
+        return getattr(settings, 'REPORT_EVENTS_RETENTION_SECONDS', 300)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_event ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " created REAL NOT NULL,"
+                " origin TEXT NOT NULL,"
+                " payload TEXT NOT NULL)"
+            )
+            self._schema_ready = True
+        return conn
+
+    def last_event_id(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM report_event").fetchone()[0]
+        finally:
+            conn.close()
+
+    def read_since(self, last_id):
+        """Returns (id, event) pairs written by other processes after last_id."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, payload FROM report_event WHERE id > ? AND origin != ? ORDER BY id",
+                (last_id, self.origin),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(event_id, json.loads(payload)) for event_id, payload in rows]
+
+    # ---------------- Publishing ---------------- #
+    def publish(self, event, channel="reports"):
+        event = dict(event, channel=channel)
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO report_event (created, origin, payload) VALUES (?, ?, ?)",
+                (now, self.origin, json.dumps(event)),
+            )
+            conn.execute("DELETE FROM report_event WHERE created < ?", (now - self.retention,))
+        finally:
+            conn.close()
+        self._dispatch(event)
+
+    def _dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        channel = event.get("channel", "reports")
+        for loop, queue, wanted in subscribers:
+            if wanted != channel:
+                continue
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                pass  # loop already closed
+
+    @staticmethod
+    def _offer(queue, event):
+        # Dashboards only need a nudge to re-fetch, so a slow client that
+        # falls behind simply loses the oldest nudges.
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    # ---------------- Subscribing ---------------- #
+    async def subscribe(self, channel="reports"):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=MAX_QUEUED_EVENTS)
+        with self._lock:
+            self._subscribers.add((loop, queue, channel))
+            poller = self._pollers.get(loop)
+            if poller is None or poller.done():
+                self._pollers[loop] = loop.create_task(self._poll_file(loop))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {sub for sub in self._subscribers if sub[1] is not queue}
+
+    def _keep_polling(self, loop):
+        with self._lock:
+            if any(sub[0] is loop for sub in self._subscribers):
+                return True
+            self._pollers.pop(loop, None)
+            return False
+
+    async def _poll_file(self, loop):
+        interval = getattr(settings, 'REPORT_EVENTS_POLL_INTERVAL', 0.5)
+        last_id = await asyncio.to_thread(self.last_event_id)
+        while self._keep_polling(loop):
+            await asyncio.sleep(interval)
+            for event_id, event in await asyncio.to_thread(self.read_since, last_id):
+                last_id = event_id
+                self._dispatch(event)
+
+
+broker = ReportEventBroker()
+
+
+def publish_report_event(kind, report):
+    event = {
+        "kind": kind,
+        "report_id": report.report_id,
+        "status": report.status,
+    }
+    try:
+        broker.publish(event)
+    except sqlite3.Error:
+        # Live updates are best effort; dashboards still poll as a fallback.
+        logger.exception("Could not publish report event %s", event)
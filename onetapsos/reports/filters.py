@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import search
+
+
+def parse_day(value):
+    """YYYY-MM-DD from a date input, or None if empty or invalid."""
+    try:
+        return parse_date(value.strip())
+    except ValueError:
+        return None
+
+
+class ReportFilter:
+    """
+    The search/filter/sort parameters shared by every report list and JSON view
+    (?q=, ?date_filter=, ?location_filter=, ?crime_category_filter=,
+    ?status_filter=, ?sort=), compiled into predicates the report indexes can
+    serve: plain equality on status/crime_category/location, a half-open
+    range on date_time_reported instead of __date, and the full-text index
+    (reports/search.py) for ?q=.
+    """
+
+    # Every ordering ends in id so it can be keyset-paginated.
+    SORTS = {
+        'date_desc': ('-date_time_reported', '-id'),
+        'date_asc': ('date_time_reported', 'id'),
+        'crime_category': ('category_key', '-date_time_reported', '-id'),
+        'status': ('status', '-date_time_reported', '-id'),
+    }
+    DEFAULT_SORT = 'date_desc'
+
+    def __init__(self, query='', date=None, location='', crime_category='', status='', sort=''):
+        self.query = query
+        self.date = date
+        self.location = location
+        self.crime_category = crime_category
+        self.status = status
+        self.sort = sort if sort in self.SORTS else self.DEFAULT_SORT
+
+    @classmethod
+    def from_request(cls, request):
+        params = request.GET
+        return cls(
+            query=params.get('q', '').strip(),
+            date=parse_day(params.get('date_filter', '')),
+            location=params.get('location_filter', '').strip(),
+            crime_category=params.get('crime_category_filter', '').strip(),
+            status=params.get('status_filter', '').strip(),
+            sort=params.get('sort', '').strip(),
+        )
+
+    @property
+    def ordering(self):
+        return self.SORTS[self.sort]
+
+    def date_range(self):
+        """[start, end) of the filtered day in the current timezone."""
+        start = timezone.make_aware(datetime.combine(self.date, time.min))
+        return start, start + timedelta(days=1)
+
+    def apply(self, queryset):
+        if self.query:
+            queryset = search.filter_reports(queryset, self.query)
+        if self.date:
+            start, end = self.date_range()
+            queryset = queryset.filter(date_time_reported__gte=start, date_time_reported__lt=end)
+        if self.location:
+            queryset = queryset.filter(location=self.location)
+        if self.crime_category:
+            queryset = queryset.filter(crime_category=self.crime_category)
+        if self.status:
+            queryset = queryset.filter(status=self.status)
+        if self.sort == 'crime_category':
+            queryset = queryset.annotate(category_key=Coalesce('crime_category', Value('')))
+        return queryset.order_by(*self.ordering)
@@ -0,0 +1,85 @@
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, OperationalError, connection, connections
+from callers.models import Caller
+from reports.models import EmergencyReport, ReportSequence, report_id_allocator
+
+BENCH_PHONE = "09000000000"
+
+
+def insert_reports(sender_id, year, count):
+    """Allocates `count` report IDs and inserts a report for each one."""
+    ids, errors = [], 0
+    try:
+        for _ in range(count):
+            report = EmergencyReport(
+                report_id=report_id_allocator.next_report_id(year),
+                location="BENCHMARK",
+                sender_id=sender_id,
+                status="unclassified",
+            )
+            try:
+                # bulk_create skips save() and its signals, so only the
+                # allocator and the unique index are exercised.
+                EmergencyReport.objects.bulk_create([report])
+                ids.append(report.report_id)
+            except (IntegrityError, OperationalError):
+                errors += 1
+    finally:
+        connection.close()
+    return ids, errors
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent report inserts using the report ID allocator"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--per-worker", type=int, default=250)
+        parser.add_argument("--year", type=int, default=9999,
+                            help="Sequence year to allocate from (kept apart from real reports)")
+
+    def handle(self, *args, **options):
+        year = options["year"]
+        caller, _ = Caller.objects.get_or_create(
+            phone_number=BENCH_PHONE, defaults={"full_name": "Benchmark Caller"}
+        )
+
+        try:
+            self.run_mode("threads", ThreadPoolExecutor(options["threads"]),
+                          options["threads"], caller.pk, year, options["per_worker"])
+
+            # Children must not inherit open SQLite handles.
+            connections.close_all()
+            ctx = multiprocessing.get_context("fork")
+            self.run_mode("processes", ProcessPoolExecutor(options["processes"], mp_context=ctx),
+                          options["processes"], caller.pk, year, options["per_worker"])
+        finally:
+            caller.delete()
+            ReportSequence.objects.filter(year=year).delete()
+            report_id_allocator.reset()
+
+    def run_mode(self, label, executor, workers, sender_id, year, per_worker):
+        start = time.perf_counter()
+        with executor:
+            results = list(executor.map(
+                insert_reports, [sender_id] * workers, [year] * workers, [per_worker] * workers
+            ))
+        elapsed = time.perf_counter() - start
+
+        ids = [report_id for worker_ids, _ in results for report_id in worker_ids]
+        errors = sum(worker_errors for _, worker_errors in results)
+        duplicates = len(ids) - len(set(ids))
+        stored = EmergencyReport.objects.filter(report_id__startswith=f"RPT-{year}-").count()
+
+        self.stdout.write(
+            f"{label:<10} workers={workers:<3} inserted={len(ids):<6} "
+            f"ids/sec={len(ids) / elapsed:,.0f} duplicates={duplicates} "
+            f"errors={errors} stored={stored}"
+        )
+        style = self.style.SUCCESS if duplicates == 0 else self.style.ERROR
+        self.stdout.write(style(f"{label}: {'no' if duplicates == 0 else duplicates} duplicate report IDs"))
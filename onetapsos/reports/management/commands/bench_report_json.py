@@ -0,0 +1,98 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from callers.models import Caller
+from reports.models import EmergencyReport
+from reports.projections import REPORT_ROWS, REJECTED_REPORT_ROWS, UNCLASSIFIED_REPORT_ROWS
+
+BENCH_PHONE = "09000000001"
+
+
+def instance_report_row(r):
+    """The instance-based row the JSON views built before the projections."""
+    return {
+        "report_id": r.report_id,
+        "reported_at": r.date_time_reported.isoformat(),
+        "date_time_reported": r.date_time_reported.strftime("%Y-%m-%d %I:%M %p"),
+        "location": r.location,
+        "sender": str(r.sender),
+        "crime_category": r.get_crime_category_display(),
+        "status": r.get_status_display(),
+        "date_time_responded": r.date_time_responded.strftime("%Y-%m-%d %I:%M %p") if r.date_time_responded else None,
+        "officers_responded": [o.get_full_name() for o in r.officers_responded.all()],
+        "date_time_resolved": r.date_time_resolved.strftime("%Y-%m-%d %I:%M %p") if r.date_time_resolved else None,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark report JSON serialization (query count and per-row cost)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reports", type=int, default=10_000)
+        parser.add_argument("--officers-per-report", type=int, default=2)
+
+    def handle(self, *args, **options):
+        # Everything is created inside a transaction that is rolled back.
+        with transaction.atomic():
+            self.seed(options["reports"], options["officers_per_report"])
+            reports = EmergencyReport.objects.filter(location="BENCHMARK").order_by("-date_time_reported", "-id")
+
+            self.measure("instances", lambda: [
+                instance_report_row(r) for r in reports.prefetch_related("officers_responded")
+            ])
+            for label, projection in (
+                ("projection report", REPORT_ROWS),
+                ("projection rejected", REJECTED_REPORT_ROWS),
+                ("projection unclassified", UNCLASSIFIED_REPORT_ROWS),
+            ):
+                self.measure(label, lambda: [
+                    data for _, data in projection.rows(projection.values(reports).iterator())
+                ])
+            transaction.set_rollback(True)
+
+    def seed(self, count, officers_per_report):
+        caller, _ = Caller.objects.get_or_create(
+            phone_number=BENCH_PHONE, defaults={"full_name": "Benchmark Caller"}
+        )
+        User = get_user_model()
+        officers = [
+            User.objects.create(
+                police_id=f"BENCH-{i}", email=f"bench{i}@example.com",
+                first_name="Bench", last_name=f"Officer {i}",
+            )
+            for i in range(max(officers_per_report, 1))
+        ]
+        reports = EmergencyReport.objects.bulk_create([
+            EmergencyReport(
+                report_id=f"RPT-9998-{i:04d}" if i < 10_000 else f"RPT-9998-A{i}",
+                location="BENCHMARK",
+                sender=caller,
+                status="active",
+                crime_category="robbery",
+            )
+            for i in range(count)
+        ], batch_size=500)
+        through = EmergencyReport.officers_responded.through
+        through.objects.bulk_create([
+            through(emergencyreport_id=report.pk, userprofile_id=officer.pk)
+            for report in reports for officer in officers[:officers_per_report]
+        ], batch_size=500)
+
+    def measure(self, label, serialize):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            rows = serialize()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:<30} rows={len(rows):<6} queries={queries:<6} "
+            f"total={elapsed * 1000:,.0f}ms per-row={elapsed / max(len(rows), 1) * 1_000_000:,.1f}us"
+        )
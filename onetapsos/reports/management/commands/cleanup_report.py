@@ -1,11 +1,54 @@
+import time
+
 from django.core.management.base import BaseCommand
-from reports.models import EmergencyReport  # adjust if your app is named differently
+from django.db.models import Count, Min
+from reports.models import EmergencyReport, DeletedReport  # adjust if your app is named differently
 
 class Command(BaseCommand):
-    help = "Delete expired rejected reports (days_remaining == 0)"
+    help = "Delete expired rejected reports (days_remaining == 0), in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Reports per batch (default REPORT_EXPIRY_BATCH_SIZE)")
+        parser.add_argument("--pause", type=float, help="Seconds between batches (default REPORT_EXPIRY_PAUSE)")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be deleted")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            expired = EmergencyReport.expired_reports()
+            summary = expired.aggregate(reports=Count("pk"), oldest=Min("date_time_rejected"))
+            self.stdout.write(
+                f"Would delete {summary['reports']} expired rejected report(s) "
+                f"(rejected before {EmergencyReport.expiry_cutoff():%Y-%m-%d %H:%M}"
+                + (f", oldest {summary['oldest']:%Y-%m-%d %H:%M}" if summary['oldest'] else "")
+                + ")."
+            )
+            self.stdout.write(
+                f"Would purge {DeletedReport.expired().count()} old deleted-report marker(s)."
+            )
+            return
+
+        start = time.perf_counter()
+        totals, batches = {}, 0
+        for deleted, seconds in EmergencyReport.expire_batches(
+            batch_size=options["batch_size"], pause=options["pause"]
+        ):
+            batches += 1
+            for label, count in deleted.items():
+                totals[label] = totals.get(label, 0) + count
+            self.stdout.write(
+                f"  batch {batches} deleted {deleted.get(EmergencyReport._meta.label, 0)} report(s) "
+                f"in {seconds * 1000:.0f} ms"
+            )
+        deleted_count = totals.pop(EmergencyReport._meta.label, 0)
+        related = ", ".join(f"{count} {label}" for label, count in sorted(totals.items()) if count)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted_count} expired rejected report(s) in {batches} batch(es), "
+                f"{time.perf_counter() - start:.2f}s." + (f" Also deleted: {related}." if related else "")
+            )
+        )
 
-    def handle(self, *args, **kwargs):
-        deleted_count = EmergencyReport.delete_expired_reports()
+        purged_count = DeletedReport.purge()
         self.stdout.write(
-            self.style.SUCCESS(f"Deleted {deleted_count} expired rejected report(s).")
+            self.style.SUCCESS(f"Purged {purged_count} old deleted-report marker(s).")
         )
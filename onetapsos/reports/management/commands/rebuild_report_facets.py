@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from reports.models import ReportFacet
+
+
+class Command(BaseCommand):
+    help = "Recount the report filter dropdown facets from the report table"
+
+    def handle(self, *args, **kwargs):
+        facet_count = ReportFacet.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {facet_count} report facet(s).")
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from reports.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text report search index from the report table"
+
+    def handle(self, *args, **kwargs):
+        if not search_available():
+            self.stdout.write(self.style.WARNING("Full-text search index is only used on SQLite; nothing to do."))
+            return
+        indexed_count = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed_count} report(s).")
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:14
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    ReportSequence = apps.get_model('reports', 'ReportSequence')
+
+    last_numbers = {}
+    for report_id in EmergencyReport.objects.values_list('report_id', flat=True):
+        parts = report_id.split('-')
+        if len(parts) != 3:
+            continue
+        suffix = parts[2][1:] if parts[2][:1].isalpha() else parts[2]
+        try:
+            year, number = int(parts[1]), int(suffix)
+        except ValueError:
+            continue
+        last_numbers[year] = max(last_numbers.get(year, 0), number)
+
+    ReportSequence.objects.bulk_create([
+        ReportSequence(year=year, last_number=number)
+        for year, number in last_numbers.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0012_alter_emergencyreport_sender'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(unique=True)),
+                ('last_number', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='emergencyreport',
+            name='report_id',
+            field=models.CharField(max_length=50, unique=True, validators=[django.core.validators.RegexValidator('^RPT-\\d{4}-(\\d{4}|[A-Z]\\d{5,})$', 'Report ID must be in format RPT-YYYY-0000')]),
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
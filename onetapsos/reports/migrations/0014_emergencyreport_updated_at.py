@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0013_reportsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.CharField(max_length=50)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
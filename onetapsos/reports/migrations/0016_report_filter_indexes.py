@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:22
+
+from django.db import migrations, models
+from django.db.models.functions import Trim
+
+
+def trim_locations(apps, schema_editor):
+    # EmergencyReport.save() now strips location; bring existing rows in line
+    # so the location filter can use plain equality.
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    EmergencyReport.objects.update(location=Trim('location'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0015_emergencyreport_status_reported_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['status', 'crime_category'], name='report_status_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['status', 'location'], name='report_status_location_idx'),
+        ),
+        migrations.RunPython(trim_locations, migrations.RunPython.noop),
+    ]
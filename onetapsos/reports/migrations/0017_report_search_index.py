@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Copied from reports/search.py as they were when this migration was written
+SEARCH_TABLE = "reports_search"
+
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reports_search USING fts5("
+    "report_id, location, message, sender_name, tokenize = 'unicode61')"
+)
+
+FILL_SEARCH_TABLE = (
+    "INSERT INTO reports_search (rowid, report_id, location, message, sender_name) "
+    "SELECT r.id, r.report_id, r.location, COALESCE(r.message, ''), c.full_name "
+    "FROM reports_emergencyreport r JOIN callers_caller c ON c.caller_id = r.sender_id"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE)
+    schema_editor.execute(FILL_SEARCH_TABLE)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('callers', '0001_initial'),
+        ('reports', '0016_report_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:25
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def fill_facets(apps, schema_editor):
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    ReportFacet = apps.get_model('reports', 'ReportFacet')
+    facets = []
+    for kind, expression in (
+        ('location', F('location')),
+        ('day', TruncDate('date_time_reported')),
+        ('crime_category', F('crime_category')),
+    ):
+        rows = (
+            EmergencyReport.objects
+            .annotate(facet_value=expression)
+            .exclude(facet_value__isnull=True)
+            .values('status', 'facet_value')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        facets += [
+            ReportFacet(status=row['status'], kind=kind, value=str(row['facet_value']), count=row['total'])
+            for row in rows if row['facet_value'] != ''
+        ]
+    ReportFacet.objects.bulk_create(facets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0017_report_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('resolved', 'Resolved'), ('unclassified', 'Unclassified'), ('rejected', 'Rejected')], max_length=20)),
+                ('kind', models.CharField(choices=[('location', 'Location'), ('day', 'Day reported'), ('crime_category', 'Crime category')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reportfacet',
+            constraint=models.UniqueConstraint(fields=('status', 'kind', 'value'), name='unique_report_facet'),
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0018_report_facets'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['status', 'date_time_rejected'], name='report_status_rejected_idx'),
+        ),
+    ]
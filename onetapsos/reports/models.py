@@ -1,15 +1,130 @@
-from datetime import date, timedelta
-from django.db import models, transaction
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.conf import settings
 
+
+def format_report_id(year, number):
+    """
+    Builds RPT-YYYY-NNNN. Numbers above 9999 get a width letter in front
+    (A = 5 digits, B = 6 digits, ...) so that plain string ordering of
+    report_id still matches numeric ordering within a year.
+    """
+    if number <= 9999:
+        return f"RPT-{year}-{number:04d}"
+    digits = str(number)
+    return f"RPT-{year}-{chr(ord('A') + len(digits) - 5)}{digits}"
+
+
+def parse_report_number(report_id):
+    """Inverse of format_report_id(). Returns None for malformed IDs."""
+    suffix = report_id.rsplit('-', 1)[-1]
+    if suffix[:1].isalpha():
+        suffix = suffix[1:]
+    try:
+        return int(suffix)
+    except ValueError:
+        return None
+
+
+class ReportSequence(models.Model):
+    """Per-year counter for report IDs, so allocation never scans EmergencyReport."""
+    year = models.IntegerField(unique=True)
+    last_number = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
+    @classmethod
+    def reserve(cls, year, count=1):
+        """
+        Atomically reserves `count` numbers for `year`.
+        Returns the (first, last) numbers of the reserved block.
+        """
+        with transaction.atomic():
+            updated = cls.objects.filter(year=year).update(last_number=F('last_number') + count)
+            if not updated:
+                # First report of the year: seed the row from any reports already
+                # on file, then retry the increment under the row's lock.
+                last_number = 0
+                for report_id in EmergencyReport.objects.filter(
+                    report_id__startswith=f"RPT-{year}-"
+                ).values_list('report_id', flat=True):
+                    last_number = max(last_number, parse_report_number(report_id) or 0)
+                cls.objects.get_or_create(year=year, defaults={'last_number': last_number})
+                cls.objects.filter(year=year).update(last_number=F('last_number') + count)
+
+            last = cls.objects.filter(year=year).values_list('last_number', flat=True).get()
+        return last - count + 1, last
+
+
+class ReportIdAllocator:
+    """
+    Hands out report numbers from blocks reserved in ReportSequence.
+    Each process keeps its own block, so only one in REPORT_ID_BLOCK_SIZE
+    inserts touches the sequence row. Unused numbers in a block are skipped
+    when the process exits, leaving gaps but never duplicates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}  # year -> [next_number, last_number]
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker must never reuse its parent's block.
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+
+    @property
+    def block_size(self):
+        return max(1, getattr(settings, 'REPORT_ID_BLOCK_SIZE', 20))
+
+    def next_number(self, year):
+        with self._lock:
+            block = self._blocks.get(year)
+            if block and block[0] <= block[1]:
+                number = block[0]
+                block[0] += 1
+                return number
+
+            first, last = ReportSequence.reserve(year, self.block_size)
+
+        if first < last:
+            # Only keep the rest of the block once the reservation is committed;
+            # if an outer transaction rolls back, the numbers go back to the DB.
+            def keep_block():
+                with self._lock:
+                    self._blocks[year] = [first + 1, last]
+            transaction.on_commit(keep_block)
+        return first
+
+    def next_report_id(self, year=None):
+        year = year or date.today().year
+        return format_report_id(year, self.next_number(year))
+
+    def reset(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+report_id_allocator = ReportIdAllocator()
+
+
 class EmergencyReport(models.Model):
     report_id = models.CharField(
         max_length=50,
         unique=True,
         validators=[RegexValidator(
-            r'^RPT-\d{4}-\d{4}$',
+            r'^RPT-\d{4}-(\d{4}|[A-Z]\d{5,})$',
             'Report ID must be in format RPT-YYYY-0000'
         )]
     )
@@ -50,6 +165,9 @@ class EmergencyReport(models.Model):
     date_time_resolved = models.DateTimeField(null=True, blank=True)
     date_time_rejected = models.DateTimeField(null=True, blank=True)
 
+    # Bumped on every save and officer change; drives the ?since= delta feed.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     # Number of days after rejection until it expires
     REJECTION_EXPIRATION_DAYS = 7
 
@@ -62,42 +180,136 @@ class EmergencyReport(models.Model):
 
     class Meta:
         ordering = ['-date_time_reported']
+        indexes = [
+            # Keyset pagination of each status list on (date_time_reported, id)
+            models.Index(fields=['status', '-date_time_reported', '-id'], name='report_status_reported_idx'),
+            # ReportFilter's equality filters within a status list
+            models.Index(fields=['status', 'crime_category'], name='report_status_category_idx'),
+            models.Index(fields=['status', 'location'], name='report_status_location_idx'),
+            # Expiry of rejected reports (date_time_rejected < cutoff)
+            models.Index(fields=['status', 'date_time_rejected'], name='report_status_rejected_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the status as loaded so save() can check transitions
+        # without reading the row again.
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'status' in fields:
+            self._loaded_status = self.status
+
+    FACET_FIELDS = ('status', 'location', 'date_time_reported', 'crime_category')
+
+    @staticmethod
+    def facets_of(row):
+        """(status, {facet kind: value}) a report with these FACET_FIELDS counts towards in ReportFacet."""
+        reported = row['date_time_reported']
+        return row['status'], {
+            'location': row['location'],
+            'day': timezone.localtime(reported).date().isoformat() if reported else None,
+            'crime_category': row['crime_category'],
+        }
+
+    def facet_values(self):
+        return self.facets_of({name: getattr(self, name) for name in self.FACET_FIELDS})
+
+    def stored_facet_values(self):
+        """facet_values() of this report's row as stored, read under its row lock; None if it is gone."""
+        row = (
+            type(self)._base_manager.select_for_update()
+            .filter(pk=self.pk).values(*self.FACET_FIELDS).first()
+        )
+        return row and self.facets_of(row)
+
+    def allowed_predecessors(self):
+        """Statuses the stored row may be in for this report's status to be valid."""
+        predecessors = {self.status}
+        predecessors.update(old for old, new in self.ALLOWED_TRANSITIONS.items() if self.status in new)
+        if self.status == 'active' and self.crime_category:
+            predecessors.add('unclassified')  # accepted once classified
+        return sorted(predecessors)
+
+    def check_transition(self, old_status):
+        """Raises ValueError if this report may not move from old_status to its current status."""
+        if old_status is not None and old_status not in self.allowed_predecessors():
+            raise ValueError(f"Invalid status change from {old_status} to {self.status}")
+
+    def clean(self):
+        super().clean()
+        # Lets the admin form show a bad transition as a field error.
+        if self.pk:
+            try:
+                self.check_transition(getattr(self, '_loaded_status', None))
+            except ValueError as e:
+                raise ValidationError({'status': str(e)})
 
     def save(self, *args, **kwargs):
+        # Stored trimmed so the location filter can match with plain equality
+        if self.location:
+            self.location = self.location.strip()
+
         # Automatically set rejection time
         if self.status == 'rejected' and not self.date_time_rejected:
             self.date_time_rejected = timezone.now()
 
-        # Enforce allowed status transitions
-        if self.pk:
-            old_status = EmergencyReport.objects.get(pk=self.pk).status
-            if old_status == 'unclassified' and self.status == 'active' and self.crime_category:
-                pass  # allowed
-            elif self.status != old_status and self.status not in self.ALLOWED_TRANSITIONS.get(old_status, []):
-                raise ValueError(f"Invalid status change from {old_status} to {self.status}")
+        # Enforce allowed status transitions: checked here against the status
+        # we loaded, and again by _do_update() against the row itself.
+        if self.pk and not self._state.adding:
+            self.check_transition(getattr(self, '_loaded_status', None))
 
         # Generate report_id if not set
         if not self.report_id:
-            current_year = date.today().year
-            with transaction.atomic():
-                last_report = (
-                    EmergencyReport.objects
-                    .select_for_update()
-                    .filter(report_id__startswith=f"RPT-{current_year}-")
-                    .order_by('-report_id')
-                    .first()
-                )
+            self.report_id = report_id_allocator.next_report_id()
 
-                last_number = 0
-                if last_report:
-                    try:
-                        last_number = int(last_report.report_id.split('-')[-1])
-                    except ValueError:
-                        pass
+        # post_save handlers (facets, search index, outbox messages) commit
+        # or roll back together with the row
+        self._facet_move = None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_status = self.status
 
-                self.report_id = f"RPT-{current_year}-{last_number + 1:04d}"
+    def delete(self, *args, **kwargs):
+        # Count the delete against the row as stored: this instance may have
+        # been loaded before another save moved the report
+        with transaction.atomic():
+            self._deleted_facets = self.stored_facet_values()
+            return super().delete(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Only update the row if its current status can still move to ours, so
+        # a concurrent resolve/reject can't be overwritten by a stale instance.
+        #
+        # This hooks Model.save_table()'s UPDATE (a private method; Django is
+        # pinned in requirements.txt) instead of calling
+        # filter(status__in=...).update() from save(): a queryset update skips
+        # save_base(), so pre_save/post_save (facets, search index, outbox)
+        # wouldn't run, auto_now updated_at wouldn't be set, and save()'s
+        # insert-when-no-row-matched fallback would have to be rebuilt. Here
+        # the WHERE gains one condition and everything else stays Django's.
+        #
+        # The facet counts move from the row this UPDATE replaces, read under
+        # its lock, to that row with the saved fields applied; never from what
+        # this instance loaded, which may be stale or deferred.
+        replaced = None
+        if update_fields is None or set(update_fields) & set(self.FACET_FIELDS):
+            replaced = base_qs.select_for_update().filter(pk=pk_val).values(*self.FACET_FIELDS).first()
+        if update_fields is None or 'status' in update_fields:
+            updated = super()._do_update(
+                base_qs.filter(status__in=self.allowed_predecessors()), using, pk_val, values, update_fields, forced_update
+            )
+            if not updated and replaced is not None:
+                raise ValueError(f"Invalid status change from {replaced['status']} to {self.status}")
+        else:
+            updated = super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if updated and replaced is not None:
+            saved = {**replaced, **{field.attname: value for field, _, value in values if field.attname in replaced}}
+            self._facet_move = (self.facets_of(replaced), self.facets_of(saved))
+        return updated
 
     @property
     def days_remaining(self):
@@ -109,16 +321,181 @@ class EmergencyReport(models.Model):
         return None
 
     @classmethod
-    def delete_expired_reports(cls):
+    def expiry_cutoff(cls):
+        """
+        Rejected reports rejected before this have expired (days_remaining == 0):
+        midnight at the start of the day REJECTION_EXPIRATION_DAYS - 1 days ago.
+        """
+        now = timezone.now()
+        last_day = now.date() - timedelta(days=cls.REJECTION_EXPIRATION_DAYS - 1)
+        return datetime.combine(last_day, datetime.min.time(), tzinfo=now.tzinfo)
+
+    @classmethod
+    def expired_reports(cls):
+        return cls.objects.filter(status='rejected', date_time_rejected__lt=cls.expiry_cutoff())
+
+    @classmethod
+    def expire_batches(cls, batch_size=None, pause=None):
         """
-        Deletes all rejected reports whose days_remaining == 0.
-        Uses the days_remaining property directly.
+        Deletes expired rejected reports, oldest first, at most `batch_size`
+        per transaction and sleeping `pause` seconds between batches. Each
+        batch deletes its deployments and officer links in one statement per
+        table and refreshes the affected officers' CurrentDeployment once, so
+        its query count grows with the reports in it (their delete signals),
+        not with their deployments. Yields ({model label: rows deleted},
+        seconds taken) per batch.
         """
-        expired = []
-        for report in cls.objects.filter(status='rejected', date_time_rejected__isnull=False):
-            if report.days_remaining == 0:
-                expired.append(report)
-                report.delete()
+        from users.models import CurrentDeployment, DeploymentHistory
+
+        batch_size = batch_size or getattr(settings, 'REPORT_EXPIRY_BATCH_SIZE', 200)
+        pause = getattr(settings, 'REPORT_EXPIRY_PAUSE', 0.1) if pause is None else pause
+        expired = cls.expired_reports().order_by('date_time_rejected', 'pk')
+        while True:
+            start = time.perf_counter()
+            with transaction.atomic():
+                batch = list(expired.values_list('pk', flat=True)[:batch_size])
+                if not batch:
+                    return
+                # Deployments first, so the officers' CurrentDeployment is
+                # refreshed once for the batch rather than once per report
+                deployments = DeploymentHistory.objects.filter(report__in=batch)
+                officer_ids = set(deployments.filter(police__isnull=False).values_list('police_id', flat=True))
+                _, deleted = deployments.delete()
+                _, reports_deleted = cls.objects.filter(pk__in=batch).delete()
+                for label, count in reports_deleted.items():
+                    deleted[label] = deleted.get(label, 0) + count
+                CurrentDeployment.refresh(officer_ids)
+            yield deleted, time.perf_counter() - start
+            if len(batch) < batch_size:
+                return
+            time.sleep(pause)
+
+    @classmethod
+    def delete_expired_reports(cls, batch_size=None):
+        """Deletes all rejected reports whose days_remaining == 0, in batches."""
+        return sum(deleted.get(cls._meta.label, 0) for deleted, _ in cls.expire_batches(batch_size))
+
+
+
+class DeletedReport(models.Model):
+    """
+    Tombstone left behind when a report is deleted, so dashboards polling
+    with ?since= can drop it. Kept for DELTA_HORIZON; older cursors get a
+    full list instead.
+    """
+    DELTA_HORIZON = timedelta(days=1)
+
+    report_id = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.report_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def expired(cls):
+        return cls.objects.filter(deleted_at__lt=timezone.now() - cls.DELTA_HORIZON)
 
-        return len(expired)
+    @classmethod
+    def purge(cls):
+        """Deletes tombstones older than DELTA_HORIZON."""
+        deleted_count, _ = cls.expired().delete()
+        return deleted_count
+
+
+class ReportFacet(models.Model):
+    """
+    Distinct locations, reporting days and crime categories per report status,
+    with how many reports have each. Kept up to date by the report save/delete
+    hooks so the filter dropdowns read this small table instead of running
+    DISTINCT over every report; the rebuild_report_facets job recounts it
+    nightly.
+    """
+    KIND_CHOICES = [
+        ('location', 'Location'),
+        ('day', 'Day reported'),
+        ('crime_category', 'Crime category'),
+    ]
+
+    status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'kind', 'value'], name='unique_report_facet'),
+        ]
+
+    def __str__(self):
+        return f"{self.status} {self.kind}={self.value} ({self.count})"
+
+    @classmethod
+    def values_for(cls, kind, status=None):
+        """Sorted distinct values of `kind`, for one status or across all of them."""
+        facets = cls.objects.filter(kind=kind, count__gt=0)
+        if status:
+            facets = facets.filter(status=status)
+        return facets.order_by('value').values_list('value', flat=True).distinct()
 
+    @classmethod
+    def days(cls, status=None):
+        """Distinct reporting days, newest first, as dates."""
+        return [date.fromisoformat(value) for value in list(cls.values_for('day', status))[::-1]]
+
+    @classmethod
+    def adjust(cls, status, kind, value, delta):
+        if not value:
+            return
+        facets = cls.objects.filter(status=status, kind=kind, value=value)
+        if delta < 0:
+            facets.update(count=F('count') + delta)
+            facets.filter(count__lte=0).delete()
+            return
+        if facets.update(count=F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(status=status, kind=kind, value=value, count=delta)
+        except IntegrityError:
+            # Created concurrently; add to that row instead
+            facets.update(count=F('count') + delta)
+
+    @classmethod
+    def add_report(cls, facets, delta=1):
+        """Adds delta to each of a report's facets (see EmergencyReport.facets_of())."""
+        status, values = facets
+        for kind, value in values.items():
+            cls.adjust(status, kind, value, delta)
+
+    @classmethod
+    def move_report(cls, old_facets, new_facets):
+        """Moves a saved report's counts from old_facets to new_facets (see EmergencyReport.facets_of())."""
+        old_status, old_values = old_facets
+        status, values = new_facets
+        for kind, value in values.items():
+            if (old_status, old_values[kind]) != (status, value):
+                cls.adjust(old_status, kind, old_values[kind], -1)
+                cls.adjust(status, kind, value, 1)
+
+    @classmethod
+    def rebuild(cls):
+        """Recounts every facet from the report table. Returns the number of facets."""
+        facets = []
+        day = TruncDate('date_time_reported')
+        for kind, expression in (('location', F('location')), ('day', day), ('crime_category', F('crime_category'))):
+            rows = (
+                EmergencyReport.objects
+                .annotate(facet_value=expression)
+                .exclude(facet_value__isnull=True)
+                .values('status', 'facet_value')
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+            facets += [
+                cls(status=row['status'], kind=kind, value=str(row['facet_value']), count=row['total'])
+                for row in rows if row['facet_value'] != ''
+            ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(facets)
+        return len(facets)
@@ -0,0 +1,209 @@
+# JSON rows for the report endpoints, built from values() projections.
+#
+# Each projection reads only the columns its rows need, with the sender's
+# name joined in, and fetches officer names for a whole chunk of reports in
+# one query. Rows are plain dicts, so no model instances, display lookups or
+# related-object queries happen per report.
+#
+# Each row also has a compact form (?format=compact): a list in the order of
+# the projection's `compact_columns`, with status and crime category as
+# integer codes (indexes into COMPACT_CODES) and times as epoch milliseconds.
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import EmergencyReport
+
+DISPLAY_FORMAT = "%Y-%m-%d %I:%M %p"
+
+CRIME_CATEGORY_LABELS = dict(EmergencyReport.CRIME_CATEGORIES)
+STATUS_LABELS = dict(EmergencyReport.STATUS_CHOICES)
+
+STATUS_CODES = {value: code for code, (value, _) in enumerate(EmergencyReport.STATUS_CHOICES)}
+CRIME_CATEGORY_CODES = {value: code for code, (value, _) in enumerate(EmergencyReport.CRIME_CATEGORIES)}
+# Labels by code, sent with every compact response
+COMPACT_CODES = {
+    'status': [label for _, label in EmergencyReport.STATUS_CHOICES],
+    'crime_category': [label for _, label in EmergencyReport.CRIME_CATEGORIES],
+}
+
+
+def display_time(value):
+    return value.strftime(DISPLAY_FORMAT) if value else None
+
+
+def epoch_ms(value):
+    return int(value.timestamp() * 1000) if value else None
+
+
+def sender_label(row):
+    # Same text as str(Caller)
+    return f"{row['sender__full_name']} ({row['sender__phone_number']})"
+
+
+def officer_names(report_pks):
+    """{report pk: [officer full names]} for the given reports, in one query."""
+    through = EmergencyReport.officers_responded.through
+    names = {}
+    rows = (
+        through.objects
+        .filter(emergencyreport_id__in=report_pks)
+        .order_by('pk')
+        .values_list('emergencyreport_id', 'userprofile__first_name', 'userprofile__last_name')
+    )
+    for report_pk, first_name, last_name in rows:
+        names.setdefault(report_pk, []).append(f"{first_name} {last_name}".strip())
+    return names
+
+
+def days_remaining(row, today):
+    """EmergencyReport.days_remaining for a values() row."""
+    if row['status'] == 'rejected' and row['date_time_rejected']:
+        expiration_date = row['date_time_rejected'].date() + timedelta(days=EmergencyReport.REJECTION_EXPIRATION_DAYS)
+        return max((expiration_date - today).days, 0)
+    return None
+
+
+def report_row(row, officers, today):
+    return {
+        "report_id": row['report_id'],
+        "reported_at": row['date_time_reported'].isoformat(),
+        "date_time_reported": display_time(row['date_time_reported']),
+        "location": row['location'],
+        "sender": sender_label(row),
+        "crime_category": CRIME_CATEGORY_LABELS.get(row['crime_category'], row['crime_category']),
+        "status": STATUS_LABELS.get(row['status'], row['status']),
+        "date_time_responded": display_time(row['date_time_responded']),
+        "officers_responded": officers.get(row['id'], []),
+        "date_time_resolved": display_time(row['date_time_resolved']),
+    }
+
+
+def rejected_report_row(row, officers, today):
+    return {
+        'report_id': row['report_id'],
+        'reported_at': row['date_time_reported'].isoformat(),
+        'date_time_reported': display_time(row['date_time_reported']),
+        'location': row['location'],
+        'crime_category': CRIME_CATEGORY_LABELS.get(row['crime_category'], row['crime_category']) or 'Unknown',
+        'sender': sender_label(row),
+        'status': STATUS_LABELS.get(row['status'], row['status']),
+        'date_time_rejected': display_time(row['date_time_rejected']),
+        'message': row['message'] or '--',
+        'days_remaining': days_remaining(row, today),
+    }
+
+
+def unclassified_report_row(row, officers, today):
+    return {
+        'report_id': row['report_id'],
+        'reported_at': row['date_time_reported'].isoformat(),
+        'date_time_reported': display_time(row['date_time_reported']),
+        'location': row['location'],
+        'sender': sender_label(row),
+        'message': row['message'] or '--',
+    }
+
+
+def compact_report_row(row, officers, today):
+    return [
+        row['report_id'],
+        epoch_ms(row['date_time_reported']),
+        row['location'],
+        sender_label(row),
+        CRIME_CATEGORY_CODES.get(row['crime_category']),
+        STATUS_CODES.get(row['status']),
+        epoch_ms(row['date_time_responded']),
+        officers.get(row['id'], []),
+        epoch_ms(row['date_time_resolved']),
+    ]
+
+
+def compact_rejected_report_row(row, officers, today):
+    return [
+        row['report_id'],
+        epoch_ms(row['date_time_reported']),
+        row['location'],
+        CRIME_CATEGORY_CODES.get(row['crime_category']),
+        sender_label(row),
+        STATUS_CODES.get(row['status']),
+        epoch_ms(row['date_time_rejected']),
+        row['message'],
+        days_remaining(row, today),
+    ]
+
+
+def compact_unclassified_report_row(row, officers, today):
+    return [
+        row['report_id'],
+        epoch_ms(row['date_time_reported']),
+        row['location'],
+        sender_label(row),
+        row['message'],
+    ]
+
+
+class ReportProjection:
+    """
+    The columns one kind of report row needs and the functions that turn a
+    values() row into JSON, verbose or compact. `with_officers` adds one
+    officer-name query per chunk of rows; leave it off for rows that don't
+    list officers.
+    """
+
+    def __init__(self, fields, build_row, compact_columns, build_compact_row, with_officers=False):
+        self.fields = ('id', 'sender__full_name', 'sender__phone_number') + tuple(fields)
+        self.build_row = build_row
+        self.compact_columns = compact_columns
+        self.build_compact_row = build_compact_row
+        self.with_officers = with_officers
+
+    def values(self, queryset, ordering=()):
+        """The queryset as values() rows, including the ordering columns for cursors."""
+        extra = [field.lstrip('-') for field in ordering if field.lstrip('-') not in self.fields]
+        return queryset.values(*self.fields, *extra)
+
+    def rows(self, values_rows, chunk_size=None, compact=False):
+        """Yields (values row, JSON row) pairs, a chunk at a time."""
+        build_row = self.build_compact_row if compact else self.build_row
+        chunk_size = chunk_size or getattr(settings, 'REPORT_ITERATOR_CHUNK_SIZE', 200)
+        values_rows = iter(values_rows)
+        today = timezone.now().date()
+        while True:
+            chunk = list(islice(values_rows, chunk_size))
+            if not chunk:
+                return
+            officers = officer_names([row['id'] for row in chunk]) if self.with_officers else {}
+            for row in chunk:
+                yield row, build_row(row, officers, today)
+
+    def serialize(self, queryset, compact=False):
+        """JSON rows for a whole (small) queryset, e.g. a ?since= delta."""
+        return [data for _, data in self.rows(self.values(queryset), compact=compact)]
+
+
+DISPLAY_COLUMNS = ('report_id', 'date_time_reported', 'location', 'crime_category', 'status')
+
+REPORT_ROWS = ReportProjection(
+    DISPLAY_COLUMNS + ('date_time_responded', 'date_time_resolved'),
+    report_row,
+    ['report_id', 'reported_at', 'location', 'sender', 'crime_category', 'status',
+     'responded_at', 'officers_responded', 'resolved_at'],
+    compact_report_row,
+    with_officers=True,
+)
+REJECTED_REPORT_ROWS = ReportProjection(
+    DISPLAY_COLUMNS + ('date_time_rejected', 'message'),
+    rejected_report_row,
+    ['report_id', 'reported_at', 'location', 'crime_category', 'sender', 'status',
+     'rejected_at', 'message', 'days_remaining'],
+    compact_rejected_report_row,
+)
+UNCLASSIFIED_REPORT_ROWS = ReportProjection(
+    ('report_id', 'date_time_reported', 'location', 'message'),
+    unclassified_report_row,
+    ['report_id', 'reported_at', 'location', 'sender', 'message'],
+    compact_unclassified_report_row,
+)
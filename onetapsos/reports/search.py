@@ -0,0 +1,104 @@
+# Full-text search over reports (report_id, location, message, sender name).
+#
+# On SQLite the text lives in an FTS5 table, reports_search, whose rowid is the
+# EmergencyReport id. The report and caller save hooks in reports/signals.py
+# keep it in sync, and `manage.py rebuild_search_index` refills it. On other
+# databases search falls back to icontains lookups.
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "reports_search"
+
+CREATE_SEARCH_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "report_id, location, message, sender_name, tokenize = 'unicode61')"
+)
+
+# Fills rows from the report table; append a WHERE to limit it.
+FILL_SEARCH_TABLE = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, report_id, location, message, sender_name) "
+    "SELECT r.id, r.report_id, r.location, COALESCE(r.message, ''), c.full_name "
+    "FROM reports_emergencyreport r JOIN callers_caller c ON c.caller_id = r.sender_id"
+)
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    """
+    FTS5 query for `query`: every word must match, and the last token of each
+    word may be a prefix, so "rob longo" finds "Robbery near Longos".
+    """
+    terms = query.split()
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def filter_reports(queryset, query):
+    """Narrows an EmergencyReport queryset to reports matching `query`."""
+    if not search_available():
+        return queryset.filter(
+            Q(report_id__icontains=query) |
+            Q(location__icontains=query) |
+            Q(sender__full_name__icontains=query) |
+            Q(message__icontains=query)
+        )
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+        [match_expression(query)],
+    ))
+
+
+def rank_reports(queryset, query):
+    """Like filter_reports(), but ordered best match first (bm25)."""
+    if not search_available():
+        return filter_reports(queryset, query)
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+        [match_expression(query)],
+    )).annotate(search_rank=RawSQL(
+        f"SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+        f"AND rowid = reports_emergencyreport.id",
+        [match_expression(query)],
+    )).order_by("search_rank", "-date_time_reported")
+
+
+# ---------------- Index maintenance ---------------- #
+def index_report(report_pk):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [report_pk])
+        cursor.execute(FILL_SEARCH_TABLE + " WHERE r.id = %s", [report_pk])
+
+
+def unindex_report(report_pk):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [report_pk])
+
+
+def reindex_caller(caller_pk, full_name):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {SEARCH_TABLE} SET sender_name = %s WHERE rowid IN "
+            "(SELECT id FROM reports_emergencyreport WHERE sender_id = %s)",
+            [full_name, caller_pk],
+        )
+
+
+def rebuild_index():
+    """Refills the whole index from the report table. Returns the row count."""
+    if not search_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SEARCH_TABLE)
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(FILL_SEARCH_TABLE)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
@@ -1,47 +1,81 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from reports.models import EmergencyReport  # import from reports app
-from users.models import DeploymentHistory  # import from users app (adjust if different)
+from callers.models import Caller
+from reports import search
+from reports.events import publish_report_event
+from reports.models import EmergencyReport, DeletedReport, ReportFacet  # import from reports app
+from onetapsos import outbox
+from reports import tasks  # noqa: registers the outbox handlers
 from django.utils import timezone
 
-# When EmergencyReport is saved, update DeploymentHistory status/times
+# DeploymentHistory follows each report's officers, status and times. The
+# outbox workers sync it after the request (reports/tasks.py); repeated
+# changes to one report before it runs are synced once.
+def sync_deployments_later(report_pk):
+    outbox.enqueue("reports.sync_deployments", {"report_pk": report_pk}, key=f"sync_deployments:{report_pk}")
+
 @receiver(post_save, sender=EmergencyReport)
-def update_deployment_history_on_report_save(sender, instance, **kwargs):
-    # For each officer assigned to this report, update or create DeploymentHistory
-    for officer in instance.officers_responded.all():
-        deployment, created = DeploymentHistory.objects.get_or_create(
-            report=instance,
-            police=officer,
-            defaults={
-                'status': instance.status,
-                'date_time_responded': instance.date_time_responded,
-                'date_time_resolved': instance.date_time_resolved,
-            }
-        )
-        if not created:
-            # Update fields in case report changed
-            deployment.status = instance.status
-            deployment.date_time_responded = instance.date_time_responded
-            deployment.date_time_resolved = instance.date_time_resolved
-            deployment.save()
+def update_deployment_history_on_report_save(sender, instance, created, **kwargs):
+    # A new report has no officers yet
+    if not created:
+        sync_deployments_later(instance.pk)
 
 # When officers_responded m2m field changes (add/remove officers)
 @receiver(m2m_changed, sender=EmergencyReport.officers_responded.through)
-def manage_deployment_on_officers_changed(sender, instance, action, pk_set, **kwargs):
-    if action == "post_add":
-        # Add deployment records for newly added officers
-        for police_id in pk_set:
-            officer = instance.officers_responded.model.objects.get(pk=police_id)
-            DeploymentHistory.objects.get_or_create(
-                report=instance,
-                police=officer,
-                defaults={
-                    'status': instance.status,
-                    'date_time_responded': instance.date_time_responded,
-                    'date_time_resolved': instance.date_time_resolved,
-                }
-            )
-    elif action == "post_remove":
-        # Optionally delete deployment records for removed officers
-        for police_id in pk_set:
-            DeploymentHistory.objects.filter(report=instance, police__pk=police_id).delete()
+def manage_deployment_on_officers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        for report_pk in (pk_set or ()) if reverse else [instance.pk]:
+            sync_deployments_later(report_pk)
+
+# Push report changes to open dashboards once they are committed
+@receiver(post_save, sender=EmergencyReport)
+def publish_report_on_save(sender, instance, created, **kwargs):
+    kind = "created" if created else "updated"
+    transaction.on_commit(lambda: publish_report_event(kind, instance))
+
+# Officer changes don't go through save(), so bump updated_at for the delta feed
+@receiver(m2m_changed, sender=EmergencyReport.officers_responded.through)
+def touch_report_on_officers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        report_pks = pk_set if reverse else [instance.pk]
+        if report_pks:
+            EmergencyReport.objects.filter(pk__in=report_pks).update(updated_at=timezone.now())
+            if not reverse:
+                transaction.on_commit(lambda: publish_report_event("updated", instance))
+
+# Leave a tombstone so polling dashboards can drop deleted reports
+@receiver(post_delete, sender=EmergencyReport)
+def record_deleted_report(sender, instance, **kwargs):
+    DeletedReport.objects.create(report_id=instance.report_id)
+    transaction.on_commit(lambda: publish_report_event("deleted", instance))
+
+# Keep the full-text search index in step with reports and caller names
+@receiver(post_save, sender=EmergencyReport)
+def index_report_on_save(sender, instance, **kwargs):
+    search.index_report(instance.pk)
+
+@receiver(post_delete, sender=EmergencyReport)
+def unindex_report_on_delete(sender, instance, **kwargs):
+    search.unindex_report(instance.pk)
+
+@receiver(post_save, sender=Caller)
+def reindex_caller_reports_on_save(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex_caller(instance.pk, instance.full_name)
+
+# Keep the dropdown facet counts in step with report creates, moves and deletes
+@receiver(post_save, sender=EmergencyReport)
+def update_facets_on_save(sender, instance, created, **kwargs):
+    if created:
+        ReportFacet.add_report(instance.facet_values())
+    elif getattr(instance, '_facet_move', None):
+        # Set by EmergencyReport._do_update() from the row it replaced
+        ReportFacet.move_report(*instance._facet_move)
+
+@receiver(post_delete, sender=EmergencyReport)
+def update_facets_on_delete(sender, instance, **kwargs):
+    # Queryset deletes pass freshly fetched instances; Model.delete() reads
+    # the stored row first
+    facets = getattr(instance, '_deleted_facets', None) or instance.facet_values()
+    ReportFacet.add_report(facets, delta=-1)
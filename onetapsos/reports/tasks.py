@@ -0,0 +1,14 @@
+# Outbox handlers (onetapsos/outbox.py) for side effects of report changes.
+# Queued by reports/signals.py; each must be safe to run more than once.
+from onetapsos.outbox import task
+from reports.models import EmergencyReport
+from users.models import DeploymentHistory
+
+
+@task("reports.sync_deployments")
+def sync_deployments(report_pk):
+    """Brings a report's DeploymentHistory in line with its officers, status and times."""
+    report = EmergencyReport.objects.filter(pk=report_pk).first()
+    if report is None:
+        return  # deleted since; its deployments went with it
+    DeploymentHistory.sync_report(report)
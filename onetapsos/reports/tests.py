@@ -1,3 +1,411 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from callers.models import Caller
+from reports import search
+from reports.filters import ReportFilter
+from reports.models import DeletedReport, EmergencyReport, ReportFacet, ReportIdAllocator, ReportSequence
+from reports.tasks import sync_deployments
+from reports.utils import InvalidPageCursor, KeysetPaginator, encode_delta_cursor
+from users.models import CurrentDeployment, DeploymentHistory
+
+
+@override_settings(REPORT_ID_BLOCK_SIZE=5)
+class ReportIdAllocatorTests(TestCase):
+    YEAR = 2099
+
+    def take(self, allocator):
+        # The allocator keeps the rest of a block only once it is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return allocator.next_number(self.YEAR)
+
+    def test_allocators_never_share_numbers(self):
+        first, second = ReportIdAllocator(), ReportIdAllocator()
+        numbers = [self.take(allocator) for _ in range(12) for allocator in (first, second)]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        # Each reserves a block of 5 at a time rather than a number at a time
+        self.assertEqual(ReportSequence.objects.get(year=self.YEAR).last_number, 30)
+
+    def test_rolled_back_block_is_released(self):
+        allocator = ReportIdAllocator()
+        self.assertEqual(self.take(allocator), 1)
+        for _ in range(4):
+            self.take(allocator)
+        try:
+            with transaction.atomic():
+                self.assertEqual(allocator.next_number(self.YEAR), 6)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(ReportSequence.objects.get(year=self.YEAR).last_number, 5)
+        # Neither the sequence row nor this allocator kept the rolled-back block
+        self.assertEqual(self.take(allocator), 6)
+        self.assertEqual(self.take(ReportIdAllocator()), 11)
+
+
+class StatusTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+
+    def test_illegal_transition_raises(self):
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, status="resolved")
+        report.status = "active"
+        with self.assertRaises(ValueError):
+            report.save()
+        self.assertEqual(EmergencyReport.objects.get(pk=report.pk).status, "resolved")
+
+    def test_stale_instance_loses_the_conditional_update(self):
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller)
+        first = EmergencyReport.objects.get(pk=report.pk)
+        stale = EmergencyReport.objects.get(pk=report.pk)
+        first.status = "resolved"
+        first.save()
+        # Still "active" as far as this instance knows, so only the UPDATE's
+        # WHERE status IN (...) can catch it
+        stale.status = "rejected"
+        with self.assertRaises(ValueError):
+            stale.save()
+        self.assertEqual(EmergencyReport.objects.get(pk=report.pk).status, "resolved")
+
+    def test_allowed_transition_saves(self):
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller)
+        report.status = "resolved"
+        report.save()
+        self.assertEqual(EmergencyReport.objects.get(pk=report.pk).status, "resolved")
+
+
+class ReportFacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+
+    def assertFacetsMatchRebuild(self):
+        facets = lambda: set(ReportFacet.objects.values_list("status", "kind", "value", "count"))
+        kept = facets()
+        ReportFacet.rebuild()
+        self.assertEqual(kept, facets())
+
+    def test_counts_follow_saves_transitions_and_deletes(self):
+        first = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, crime_category="robbery")
+        second = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, crime_category="assault")
+        self.assertFacetsMatchRebuild()
+        first.location = "Pasig"
+        first.save()
+        self.assertFacetsMatchRebuild()
+        second.status = "resolved"
+        second.save()
+        self.assertFacetsMatchRebuild()
+        first.delete()
+        self.assertFacetsMatchRebuild()
+
+    def test_stale_instances_move_the_stored_row(self):
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, crime_category="robbery")
+        EmergencyReport.objects.create(location="Quezon City", sender=self.caller, crime_category="robbery")
+        first = EmergencyReport.objects.get(pk=report.pk)
+        second = EmergencyReport.objects.get(pk=report.pk)
+        for instance in (first, second):
+            instance.status = "resolved"
+            instance.save()
+        self.assertFacetsMatchRebuild()
+        # The other active report still keeps its location in the dropdown
+        self.assertEqual(list(ReportFacet.values_for("location", "active")), ["Quezon City"])
+
+        # Loaded while active, deleted after being resolved
+        stale = EmergencyReport.objects.get(status="active")
+        fresh = EmergencyReport.objects.get(pk=stale.pk)
+        fresh.status = "resolved"
+        fresh.save()
+        stale.delete()
+        self.assertFacetsMatchRebuild()
+
+    def test_deferred_instance_still_moves(self):
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, crime_category="robbery")
+        deferred = EmergencyReport.objects.only("pk", "status").get(pk=report.pk)
+        deferred.status = "resolved"
+        deferred.save()
+        self.assertFacetsMatchRebuild()
+        deferred = EmergencyReport.objects.only("pk").get(pk=report.pk)
+        deferred.location = "Pasig"
+        deferred.save(update_fields=["location"])
+        self.assertFacetsMatchRebuild()
+
+
+class OfficerReportMixin:
+    """A caller and OFFICER_COUNT officers, and reports with some of them on it."""
+    OFFICER_COUNT = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+        cls.officers = [
+            get_user_model().objects.create_user(
+                f"PNP-{n:05d}", None, email=f"officer{n}@example.com", first_name="Officer", last_name=str(n)
+            )
+            for n in range(1, cls.OFFICER_COUNT + 1)
+        ]
+
+    def report_with_officers(self, count, **fields):
+        report = EmergencyReport.objects.create(
+            location="Quezon City", sender=self.caller, crime_category="robbery", **fields
+        )
+        report.officers_responded.add(*self.officers[:count])
+        return report
+
+
+class SyncDeploymentsTests(OfficerReportMixin, TestCase):
+
+    def count_sync_queries(self, report):
+        with CaptureQueriesContext(connection) as queries:
+            sync_deployments(report.pk)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_officer_count(self):
+        counts = {n: self.count_sync_queries(self.report_with_officers(n)) for n in (1, 5, 25)}
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+    def synced_report_with_officers(self, count):
+        report = self.report_with_officers(count)
+        sync_deployments(report.pk)
+        return report
+
+    def test_removal_query_count_does_not_depend_on_officer_count(self):
+        counts = {}
+        for n in (1, 5, 25):
+            report = self.synced_report_with_officers(n)
+            report.officers_responded.clear()
+            counts[n] = self.count_sync_queries(report)
+            self.assertFalse(DeploymentHistory.objects.filter(report=report).exists())
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+    def test_report_delete_query_count_does_not_depend_on_deployment_count(self):
+        counts = {}
+        for n in (1, 5, 25):
+            report = self.synced_report_with_officers(n)
+            with CaptureQueriesContext(connection) as queries:
+                report.delete()
+            counts[n] = len(queries)
+            self.assertFalse(CurrentDeployment.objects.exists())
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+    def test_upserts_and_removes_deployments(self):
+        report = self.report_with_officers(3)
+        sync_deployments(report.pk)
+        self.assertEqual(DeploymentHistory.objects.filter(report=report).count(), 3)
+
+        report.officers_responded.remove(self.officers[0])
+        report.status = "resolved"
+        report.save()
+        sync_deployments(report.pk)
+        sync_deployments(report.pk)  # running again changes nothing
+        self.assertCountEqual(
+            DeploymentHistory.objects.filter(report=report).values_list("police_id", "status"),
+            [(officer.pk, "resolved") for officer in self.officers[1:3]],
+        )
+
+
+class ExpireReportsTests(OfficerReportMixin, TestCase):
+    OFFICER_COUNT = 10
+
+    def expired_report_with_officers(self, count):
+        report = self.report_with_officers(count)
+        sync_deployments(report.pk)
+        EmergencyReport.objects.filter(pk=report.pk).update(
+            status="rejected", date_time_rejected=timezone.now() - timedelta(days=30)
+        )
+        return report
+
+    def count_expire_queries(self, deployments):
+        self.expired_report_with_officers(deployments)
+        with CaptureQueriesContext(connection) as queries:
+            batches = list(EmergencyReport.expire_batches(pause=0))
+        self.assertEqual(batches[0][0]["users.DeploymentHistory"], deployments)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_deployment_count(self):
+        counts = {n: self.count_expire_queries(n) for n in (1, 5, 10)}
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+    def test_expires_reports_and_their_deployments(self):
+        kept = self.report_with_officers(0)
+        self.expired_report_with_officers(3)
+        self.assertEqual(EmergencyReport.delete_expired_reports(batch_size=1), 1)
+        self.assertEqual(list(EmergencyReport.objects.values_list("pk", flat=True)), [kept.pk])
+        self.assertFalse(DeploymentHistory.objects.exists())
+        self.assertFalse(CurrentDeployment.objects.exists())
+
+
+class ReportFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+
+    def report_at(self, moment, location="Quezon City"):
+        return EmergencyReport.objects.create(location=location, sender=self.caller, date_time_reported=moment)
+
+    def filtered(self, **params):
+        return list(ReportFilter(**params).apply(EmergencyReport.objects.all()))
+
+    def test_day_is_a_half_open_local_range(self):
+        day = date(2026, 3, 10)
+        midnight = timezone.make_aware(datetime.combine(day, time.min))
+        inside = [self.report_at(midnight), self.report_at(midnight + timedelta(days=1, microseconds=-1))]
+        self.report_at(midnight - timedelta(microseconds=1))
+        self.report_at(midnight + timedelta(days=1))
+        self.assertCountEqual(self.filtered(date=day), inside)
+
+    def test_location_matches_trimmed_values(self):
+        report = self.report_at(timezone.now(), location="  Quezon City ")
+        self.report_at(timezone.now(), location="Quezon City Hall")
+        self.assertEqual(EmergencyReport.objects.get(pk=report.pk).location, "Quezon City")
+        self.assertEqual(self.filtered(location="Quezon City"), [report])
+
+    def test_from_request_strips_and_validates_params(self):
+        request = RequestFactory().get("/", {
+            "location_filter": " Quezon City ", "date_filter": "2026-02-30", "sort": "bogus",
+        })
+        filters = ReportFilter.from_request(request)
+        self.assertEqual(filters.location, "Quezon City")
+        self.assertIsNone(filters.date)
+        self.assertEqual(filters.ordering, ReportFilter.SORTS[ReportFilter.DEFAULT_SORT])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+
+    def search(self, query):
+        return list(search.filter_reports(EmergencyReport.objects.order_by("pk"), query))
+
+    def test_match_expression_quotes_each_word_as_a_prefix(self):
+        self.assertEqual(search.match_expression(' rob  "longo '), '"rob"* """longo"*')
+
+    def test_every_word_must_match_as_a_prefix(self):
+        robbery = EmergencyReport.objects.create(location="Longos", sender=self.caller, message="Robbery near the market")
+        EmergencyReport.objects.create(location="Pasig", sender=self.caller, message="Robbery at the mall")
+        self.assertEqual(self.search("rob longo"), [robbery])
+        self.assertEqual(self.search('juan "cruz'), list(EmergencyReport.objects.order_by("pk")))
+
+    def test_index_follows_report_and_caller_changes(self):
+        report = EmergencyReport.objects.create(location="Longos", sender=self.caller)
+        report.location = "Pasig"
+        report.save()
+        self.assertEqual(self.search("longos"), [])
+        self.assertEqual(self.search("pasig"), [report])
+
+        self.caller.full_name = "Maria Santos"
+        self.caller.save()
+        self.assertEqual(self.search("juan"), [])
+        self.assertEqual(self.search("santos"), [report])
+
+        report.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.SEARCH_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+class KeysetPaginatorTests(TestCase):
+    ORDERING = ("-date_time_reported", "-id")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+        cls.staff = get_user_model().objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+        moment = timezone.now() - timedelta(hours=1)
+        # Pairs of reports at the same instant, so pages have to break ties on id
+        cls.reports = [
+            EmergencyReport.objects.create(
+                location="Quezon City", sender=cls.caller, date_time_reported=moment - timedelta(minutes=n // 2)
+            )
+            for n in range(7)
+        ]
+
+    def test_pages_cover_every_row_once_in_order(self):
+        paginator = KeysetPaginator(EmergencyReport.objects.all(), self.ORDERING, 3)
+        seen, cursor = [], None
+        while True:
+            page = list(paginator.page(cursor))
+            seen += page[:paginator.page_size]
+            if len(page) <= paginator.page_size:
+                break
+            cursor = paginator.encode_cursor(page[paginator.page_size - 1])
+        self.assertEqual(seen, list(EmergencyReport.objects.order_by(*self.ORDERING)))
+
+    def test_malformed_cursors_are_rejected(self):
+        paginator = KeysetPaginator(EmergencyReport.objects.all(), self.ORDERING, 3)
+        for cursor in ("not-base64!", "WzFd", "WyJub3QgYSBkYXRlIiwgMV0"):  # junk, [1], ["not a date", 1]
+            with self.assertRaises(InvalidPageCursor):
+                paginator.decode_cursor(cursor)
+
+    def test_json_view_pages_and_rejects_bad_cursors(self):
+        self.client.force_login(self.staff)
+        url = reverse("report_list_json")
+        first = self.client.get(url, {"limit": 4}).json()
+        second = self.client.get(url, {"limit": 4, "after": first["next"]}).json()
+        self.assertIsNone(second["next"])
+        self.assertEqual(
+            [row["report_id"] for row in first["reports"] + second["reports"]],
+            [report.report_id for report in EmergencyReport.objects.order_by(*self.ORDERING)],
+        )
+        self.assertEqual(self.client.get(url, {"after": "not-base64!"}).status_code, 400)
+
+
+class ReportDeltaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.caller = Caller.objects.create(full_name="Juan Dela Cruz", phone_number="09123456789")
+        cls.staff = get_user_model().objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def poll(self, **params):
+        return self.client.get(reverse("report_list_json"), params)
+
+    def test_out_of_range_cursor_gets_the_full_list(self):
+        EmergencyReport.objects.create(location="Quezon City", sender=self.caller)
+        for params in ({}, {"format": "compact"}):
+            response = self.poll(since="99999999999999999999", **params)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()["full"])
+            self.assertEqual(len(response.json()["reports"]), 1)
+
+    def settled_report(self, moment, **fields):
+        """A report last changed at `moment`, outside the cursor's lag window."""
+        report = EmergencyReport.objects.create(location="Quezon City", sender=self.caller, **fields)
+        EmergencyReport.objects.filter(pk=report.pk).update(updated_at=moment)
+        return report
+
+    def test_idle_compact_poll_is_not_modified(self):
+        self.settled_report(timezone.now() - timedelta(minutes=5))
+        cursor = self.poll(format="compact").json()["cursor"]
+        self.assertEqual(self.poll(format="compact", since=cursor).status_code, 304)
+
+    def test_same_microsecond_change_with_higher_id_is_sent(self):
+        moment = timezone.now() - timedelta(minutes=5)
+        first, second = self.settled_report(moment), self.settled_report(moment)
+        self.assertEqual(self.poll(format="compact").json()["cursor"], encode_delta_cursor(moment, second.pk))
+        response = self.poll(since=encode_delta_cursor(moment, first.pk))
+        self.assertEqual([row["report_id"] for row in response.json()["reports"]], [second.report_id])
+
+    def test_deleted_report_is_removed(self):
+        before = timezone.now() - timedelta(minutes=10)
+        self.settled_report(before)
+        cursor = self.poll(format="compact").json()["cursor"]
+        doomed = self.settled_report(before)
+        doomed.delete()
+        deleted_at = timezone.now() - timedelta(minutes=5)
+        DeletedReport.objects.update(deleted_at=deleted_at)
+
+        response = self.poll(format="compact", since=cursor)
+        self.assertEqual(response.json()["removed"], [doomed.report_id])
+        # The tombstone is now the newest change, so polling from it is idle
+        self.assertEqual(response.json()["cursor"], encode_delta_cursor(deleted_at))
+        self.assertEqual(self.poll(format="compact", since=response.json()["cursor"]).status_code, 304)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.report_list, name='report_list'),
     path("reports/json/", views.report_list_json, name="report_list_json"),
+    path("reports/stream/", views.report_stream, name="report_stream"),
 
     path('archived/', views.archived_reports, name='archived_reports'),
     path('reports/archived/json/', views.archived_reports_json, name='archived_reports_json'),
@@ -19,4 +20,5 @@ urlpatterns = [
     
     path('view/<str:report_id>/', views.report_view, name='report_view'),
     path('edit/<str:report_id>/', views.edit_report, name='edit_report'),
+    path('reports/<str:report_id>/suggested-officers/', views.suggest_officers, name='suggest_officers'),
 ]
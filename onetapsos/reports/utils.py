@@ -1,19 +1,209 @@
 #A python file made for Helpers
+import base64
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
 
-def filter_reports_date(reports, query, date_filter=None, location_filter=None, crime_category_filter=None):
-    if query:
-        reports = reports.filter(
-            Q(report_id__icontains=query) |
-            Q(location__icontains=query) |
-            Q(sender__icontains=query)
-        )
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-    if location_filter:
-        reports = reports.filter(location__icontains=location_filter)
-    if crime_category_filter:
-        reports = reports.filter(crime_category=crime_category_filter)
-
-    return reports
+try:
+    import brotli
+except ImportError:  # optional; compact responses fall back to gzip
+    brotli = None
 
+# Rows committed slightly after they were stamped must still be picked up,
+# so each cursor trails the clock by this much. Clients merge by report_id,
+# so resending a row inside the window is harmless.
+DELTA_CURSOR_LAG = timedelta(seconds=2)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def make_delta_cursor(now=None):
+    """Opaque ?since= cursor: microseconds since the epoch, minus the lag."""
+    moment = (now or timezone.now()) - DELTA_CURSOR_LAG
+    return encode_delta_cursor(moment)
+
+
+def encode_delta_cursor(moment, pk=0):
+    """
+    ?since= cursor for the position (moment, pk) in (updated_at, id) order:
+    "<microseconds>" or "<microseconds>.<id>". The delta continues with
+    reports changed after `moment`, or at `moment` with a larger id.
+    """
+    # Exact integer arithmetic: a float timestamp can be a microsecond short
+    micros = (moment - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{pk}" if pk else str(micros)
+
+
+def parse_delta_cursor(value):
+    """Returns the cursor as (aware datetime, id), or None if missing/invalid."""
+    micros, _, pk = (value or "").partition(".")
+    try:
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk or 0)
+    except (ValueError, OverflowError):
+        return None
+
+
+def changed_after(moment, pk=0):
+    """Q for reports after the delta cursor position (moment, pk)."""
+    return Q(updated_at__gt=moment) | Q(updated_at=moment, pk__gt=pk)
+
+
+class InvalidPageCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) pagination: each page continues with a WHERE on the
+    ordering columns of the last row sent, instead of an OFFSET, so every
+    page is an index range scan no matter how deep the client has paged.
+
+    `ordering` must end in a unique column (id) and may name annotations.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.page_size = page_size
+
+    def encode_cursor(self, obj):
+        """Cursor for the row after `obj`, a model instance or a values() dict."""
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(obj, dict):
+            values = [obj[field] for field in fields]
+        else:
+            values = [getattr(obj, field) for field in fields]
+        # Full isoformat: DjangoJSONEncoder would cut datetimes to milliseconds
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+        raw = json.dumps(values).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise InvalidPageCursor(cursor)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidPageCursor(cursor)
+
+        decoded = []
+        for field, value in zip(self.ordering, values):
+            try:
+                model_field = self.queryset.model._meta.get_field(field.lstrip('-'))
+            except FieldDoesNotExist:
+                decoded.append(value)  # annotation, compared as-is
+                continue
+            try:
+                decoded.append(model_field.to_python(value))
+            except ValidationError:
+                raise InvalidPageCursor(cursor)
+        return decoded
+
+    def after(self, values):
+        """Q for rows strictly after `values` in this ordering."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f"{field.lstrip('-')}__{lookup}": values[i]})
+            for previous, value in zip(self.ordering[:i], values):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+        return condition
+
+    def page(self, cursor=None):
+        """Queryset for one page, with one extra row to tell if another page follows."""
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+        return queryset[:self.page_size + 1]
+
+
+def page_size_from(request):
+    """?limit=, bounded by REPORT_PAGE_SIZE_MAX; REPORT_PAGE_SIZE if missing."""
+    default = getattr(settings, 'REPORT_PAGE_SIZE', 50)
+    try:
+        size = int(request.GET.get('limit', default))
+    except ValueError:
+        size = default
+    return max(1, min(size, getattr(settings, 'REPORT_PAGE_SIZE_MAX', 500)))
+
+
+def read_report_page(paginator, cursor, projection, compact=False):
+    """
+    One page of `paginator` as JSON rows: returns (rows, next cursor), the
+    cursor being None on the last page. The paginator's queryset must be
+    `projection.values(...)` rows. Pages are bounded by REPORT_PAGE_SIZE_MAX,
+    so the page is read whole rather than streamed.
+    """
+    rows, next_cursor, last = [], None, None
+    for i, (row, data) in enumerate(projection.rows(paginator.page(cursor), compact=compact)):
+        if i == paginator.page_size:
+            next_cursor = paginator.encode_cursor(last)
+            break
+        rows.append(data)
+        last = row
+    return rows, next_cursor
+
+
+# ---------------- Compact responses ---------------- #
+# Content codings we can produce, best first
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def accepted_encoding(request):
+    """The best content coding the client accepts (Accept-Encoding), or None."""
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def encode_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body)
+    if encoding == 'gzip':
+        # mtime=0 keeps the bytes (and so the ETag) the same for the same body
+        return gzip.compress(body, mtime=0)
+    return body
+
+
+def compact_json_response(request, payload):
+    """
+    `payload` as minified JSON with a strong ETag, compressed for the client.
+    The ETag names the encoding too, since each coding is its own set of bytes.
+    Answers 304 when the client already holds this exact body.
+    """
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    encoding = accepted_encoding(request)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(encode_body(body, encoding), content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
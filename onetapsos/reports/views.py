@@ -1,11 +1,24 @@
-from datetime import timezone
+import asyncio
+import json
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Q, Func
+from django.db import transaction
+from django.db.models import Max
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
-from .models import EmergencyReport
+from .events import broker
+from .filters import ReportFilter
+from .models import EmergencyReport, DeletedReport, ReportFacet
+from .projections import COMPACT_CODES, REPORT_ROWS, REJECTED_REPORT_ROWS, UNCLASSIFIED_REPORT_ROWS
+from .utils import (
+    DELTA_CURSOR_LAG, InvalidPageCursor, KeysetPaginator, changed_after, compact_json_response,
+    encode_delta_cursor, make_delta_cursor, page_size_from, parse_delta_cursor, read_report_page,
+)
+from users.dispatch import index as dispatch_index
 from users.models import UserProfile
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.contrib import messages
 from datetime import timedelta
 
@@ -19,240 +32,166 @@ def get_officer_photo_url(user):
     return None
 
 
-def filter_reports(queryset, query):
-    if query:
-        queryset = queryset.filter(
-            Q(report_id__icontains=query) |
-            Q(location__icontains=query)
-        )
-    return queryset
+def latest_change_cursor():
+    """
+    Delta cursor at the newest report change rather than the clock, so an
+    idle poll finds nothing after it (an index range scan that returns no
+    rows, then a 304) and polling unchanged data yields byte-identical
+    compact responses. Changes from the last DELTA_CURSOR_LAG aren't used as
+    a position yet, since rows stamped just before them may still commit;
+    the cursor stays behind them and they are sent again.
+    """
+    horizon = timezone.now() - DELTA_CURSOR_LAG
+    positions = [EmergencyReport.objects.order_by('-updated_at', '-pk').values_list('updated_at', 'pk').first()]
+    deleted_at = DeletedReport.objects.aggregate(latest=Max('deleted_at'))['latest']
+    if deleted_at:
+        positions.append((deleted_at, 0))  # tombstones are read with deleted_at > cursor
+    latest = max(filter(None, positions), default=None)
+    if latest is None or latest[0] > horizon:
+        return encode_delta_cursor(horizon)
+    return encode_delta_cursor(*latest)
+
+
+def report_json_response(request, reports, projection, ordering=('-date_time_reported', '-id')):
+    """
+    Serializes the filtered `reports` queryset for the JSON endpoints, as the
+    rows of `projection` (reports/projections.py).
+
+    Without ?since= the reports are sent a page at a time (?limit=, ?after=),
+    keyset-paginated on `ordering`. `next` is the ?after= value for the
+    following page, or null on the last one.
+
+    With ?since=<cursor> only reports changed after the cursor are sent, and
+    `removed` lists reports that were deleted or no longer match the page
+    (e.g. an active report that got resolved). Answers 304 when nothing changed.
+
+    With ?format=compact the rows are arrays in the order of `columns`, with
+    status/crime category codes (labels in `codes`) and epoch-millisecond
+    times. Compact responses are compressed and carry a strong ETag, so a
+    poll with If-None-Match costs a 304 while the data is unchanged.
+    """
+    compact = request.GET.get('format') == 'compact'
+    cursor = latest_change_cursor() if compact else make_delta_cursor()
+    since, since_pk = parse_delta_cursor(request.GET.get('since')) or (None, 0)
+    extra = {"columns": projection.compact_columns, "codes": COMPACT_CODES} if compact else {}
+
+    if since is None or since < timezone.now() - DeletedReport.DELTA_HORIZON:
+        paginator = KeysetPaginator(projection.values(reports, ordering), ordering, page_size_from(request))
+        after = request.GET.get('after') or None
+        try:
+            if after:
+                paginator.decode_cursor(after)
+        except InvalidPageCursor:
+            return JsonResponse({"error": "Invalid page cursor"}, status=400)
+        extra.update(removed=[], cursor=cursor, full=True)
+        data, next_page = read_report_page(paginator, after, projection, compact=compact)
+        payload = dict(extra, reports=data, next=next_page)
+        if compact:
+            return compact_json_response(request, payload)
+        return JsonResponse(payload)
+
+    changed = reports.filter(changed_after(since, since_pk))
+    data = projection.serialize(changed, compact=compact)
+    removed = list(
+        EmergencyReport.objects
+        .filter(changed_after(since, since_pk))
+        .exclude(pk__in=changed.values('pk'))
+        .values_list('report_id', flat=True)
+    )
+    removed += DeletedReport.objects.filter(deleted_at__gt=since).values_list('report_id', flat=True)
+
+    if not data and not removed:
+        return HttpResponseNotModified()
+    payload = dict(extra, reports=data, removed=removed, cursor=cursor, full=False)
+    if compact:
+        return compact_json_response(request, payload)
+    return JsonResponse(payload)
+
+
+# Seconds between keep-alive comments on an idle report stream
+REPORT_STREAM_KEEPALIVE = 15
+
+
+async def report_event_stream():
+    queue = await broker.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=REPORT_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: report\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(queue)
 
 
 # ---------------- Ajax ---------------- #
+async def report_stream(request):
+    """
+    Server-Sent Events feed of report changes. Each event only says which
+    report changed; the page then fetches the delta from its *_json view.
+    """
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return HttpResponse(status=401)
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI a stream would pin a worker for the whole shift.
+        # 204 tells EventSource not to reconnect, so the page keeps polling.
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(report_event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+
 @login_required
 def report_list_json(request):
-    reports = EmergencyReport.objects.filter(status='active').order_by('-date_time_reported')
-
-    # --- Apply filters from query parameters ---
-    q = request.GET.get('q', '').strip()
-    date_filter = request.GET.get('date_filter', '').strip()
-    location_filter = request.GET.get('location_filter', '').strip()
-    crime_filter = request.GET.get('crime_category_filter', '').strip()
-
-    if q:
-        reports = reports.filter(
-            Q(location__icontains=q) |
-            Q(sender__full_name__icontains=q)|
-            Q(message__icontains=q)
-        )
-
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-
-    if location_filter:
-        reports = reports.filter(location__icontains=location_filter)
-
-    if crime_filter:
-        reports = reports.filter(crime_category__icontains=crime_filter)
-
-    # --- Build JSON data ---
-    data = []
-    for r in reports.prefetch_related('officers_responded'):
-        data.append({
-            "report_id": r.report_id,
-            "date_time_reported": r.date_time_reported.strftime("%Y-%m-%d %I:%M %p"),
-            "location": r.location,
-            "sender": str(r.sender),
-            "crime_category": r.get_crime_category_display(),
-            "status": r.get_status_display(),
-            "date_time_responded": r.date_time_responded.strftime("%Y-%m-%d %I:%M %p") if r.date_time_responded else None,
-            "officers_responded": [
-                o.get_full_name() if hasattr(o, "get_full_name") else str(o)
-                for o in r.officers_responded.all()
-            ],
-            "date_time_resolved": r.date_time_resolved.strftime("%Y-%m-%d %I:%M %p") if r.date_time_resolved else None,
-        })
-    return JsonResponse({"reports": data})
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='active'))
+    return report_json_response(request, reports, REPORT_ROWS, filters.ordering)
 
 
 @login_required
 def archived_reports_json(request):
-    # Base queryset: resolved reports
-    reports = EmergencyReport.objects.filter(status='resolved').prefetch_related('officers_responded')
-
-    # --- Get filter parameters ---
-    query = request.GET.get('q', '').strip()
-    date_filter = request.GET.get('date_filter', '').strip()
-    location_filter = request.GET.get('location_filter', '').strip()
-    crime_filter = request.GET.get('crime_category_filter', '').strip()
-    status_filter = request.GET.get('status_filter', '').strip()
-    sort = request.GET.get('sort', '').strip()
-
-    # --- Apply search ---
-    if query:
-        reports = reports.filter(
-            Q(report_id__icontains=query) |
-            Q(location__icontains=query) |
-            Q(sender__full_name__icontains=query)|
-            Q(message__icontains=query)
-        )
-
-    # --- Apply filters ---
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-    if location_filter:
-        reports = reports.filter(location=location_filter)
-    if crime_filter:
-        reports = reports.filter(crime_category=crime_filter)
-    if status_filter:
-        reports = reports.filter(status=status_filter)
-
-    # --- Sorting ---
-    if sort == "date_asc":
-        reports = reports.order_by("date_time_reported")
-    elif sort == "date_desc":
-        reports = reports.order_by("-date_time_reported")
-    elif sort == "crime_category":
-        reports = reports.order_by("crime_category")
-    elif sort == "status":
-        reports = reports.order_by("status")
-    else:
-        reports = reports.order_by("-date_time_reported")
-
-    # --- Build JSON response ---
-    data = []
-    for r in reports.prefetch_related('officers_responded'):
-        data.append({
-            "report_id": r.report_id,
-            "date_time_reported": r.date_time_reported.strftime("%Y-%m-%d %I:%M %p"),
-            "location": r.location,
-            "sender": str(r.sender),
-            "crime_category": r.get_crime_category_display(),
-            "status": r.get_status_display(),
-            "date_time_responded": r.date_time_responded.strftime("%Y-%m-%d %I:%M %p") if r.date_time_responded else None,
-            "officers_responded": [
-                o.get_full_name() if hasattr(o, "get_full_name") else str(o)
-                for o in r.officers_responded.all()
-            ],
-            "date_time_resolved": r.date_time_resolved.strftime("%Y-%m-%d %I:%M %p") if r.date_time_resolved else None,
-        })
-
-    return JsonResponse({"reports": data})
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='resolved'))
+    return report_json_response(request, reports, REPORT_ROWS, filters.ordering)
+
 
 @login_required
 def rejected_reports_json(request):
-    reports = EmergencyReport.objects.filter(status='rejected').order_by('-date_time_reported')
-
-    q = request.GET.get('q','').strip()
-    date_filter = request.GET.get('date_filter','').strip()
-    location_filter = request.GET.get('location_filter','').strip()
-
-    if q:
-        reports = reports.filter(
-            Q(report_id__icontains=q) |
-            Q(location__icontains=q) |
-            Q(sender__full_name__icontains=q)|
-            Q(message__icontains=q)
-        )
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-    if location_filter:
-        reports = reports.filter(location=location_filter)
-
-    data = []
-    for r in reports.prefetch_related('officers_responded'):
-        data.append({
-            'report_id': r.report_id,
-            'date_time_reported': r.date_time_reported.strftime("%Y-%m-%d %I:%M %p"),
-            'location': r.location,
-            'crime_category': r.get_crime_category_display() or 'Unknown',
-            'sender': str(r.sender),
-            'status': r.get_status_display(),
-            'date_time_rejected': r.date_time_rejected.strftime("%Y-%m-%d %I:%M %p") if r.date_time_rejected else None,
-            'message': r.message or '--',
-            'days_remaining': r.days_remaining,
-        })
-    return JsonResponse({'reports': data})
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='rejected'))
+    return report_json_response(request, reports, REJECTED_REPORT_ROWS, filters.ordering)
+
 
 @login_required
 def unclassified_reports_json(request):
-    reports = EmergencyReport.objects.filter(status='unclassified').order_by('-date_time_reported')
-
-    # Get filters
-    q = request.GET.get('q','').strip()
-    date_filter = request.GET.get('date_filter','').strip()
-    location_filter = request.GET.get('location_filter','').strip()
-
-    if q:
-        reports = reports.filter(
-            Q(report_id__icontains=q) |
-            Q(location__icontains=q) |
-            Q(sender__full_name__icontains=q)|
-            Q(message__icontains=q)
-        )
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-    if location_filter:
-        reports = reports.filter(location=location_filter)
-
-    # Build JSON response
-    data = []
-    for r in reports.prefetch_related('officers_responded'):
-        data.append({
-            'report_id': r.report_id,
-            'date_time_reported': r.date_time_reported.strftime("%Y-%m-%d %I:%M %p"),
-            'location': r.location,
-            'sender': str(r.sender),
-            'message': r.message or '--',
-        })
-    return JsonResponse({'reports': data})
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='unclassified'))
+    return report_json_response(request, reports, UNCLASSIFIED_REPORT_ROWS, filters.ordering)
 
 # ---------------- Views ---------------- #
 @login_required
 def report_list(request):
-    # ✅ Base queryset: only active reports
-    reports = EmergencyReport.objects.filter(status='active').order_by('-date_time_reported')
-
-    # ✅ Search & filters
-    query = request.GET.get('q', '')
-    date_filter = request.GET.get('date_filter', '')
-    location_filter = request.GET.get('location_filter', '')
-    crime_filter = request.GET.get('crime_category_filter', '')
-    status_filter = request.GET.get('status_filter', '')
-
-    if query:
-        reports = reports.filter(
-            Q(location__icontains=query) | Q(sender__full_name__icontains=query)| Q(message__icontains=query)
-        )
-
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-
-    if location_filter:
-        reports = reports.filter(location=location_filter)
-
-    if crime_filter:
-        reports = reports.filter(crime_category=crime_filter)
-
-    if status_filter:
-        reports = reports.filter(status=status_filter)
+    # ✅ Base queryset: only active reports, with the shared search & filters
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='active'))
 
     # ✅ Distinct values for dropdowns
-    locations = (
-    EmergencyReport.objects
-    .annotate(location_clean=Func('location', function='TRIM'))  # remove leading/trailing spaces
-    .values_list('location_clean', flat=True)
-    .distinct()
-    .order_by('location_clean')
-)
+    locations = ReportFacet.values_for('location')  # across every status
     crime_categories = EmergencyReport.CRIME_CATEGORIES  # <-- All defined choices
     statuses = EmergencyReport.STATUS_CHOICES            # <-- All defined choices
-    dates = EmergencyReport.objects.dates("date_time_reported", "day").distinct()
+    dates = ReportFacet.days()
 
 
     context = {
         "reports": reports,
-        "query": query,
+        "query": filters.query,
         "locations": locations,
         "crime_categories": crime_categories,
         "statuses": statuses,
@@ -265,72 +204,25 @@ def report_list(request):
 
 @login_required
 def archived_reports(request):
-    # Base queryset: resolved reports
-    reports = EmergencyReport.objects.filter(status='resolved').prefetch_related('officers_responded')
-
-    # --- Get filter parameters ---
-    query = request.GET.get('q', '').strip()
-    date_filter = request.GET.get('date_filter', '').strip()
-    location_filter = request.GET.get('location_filter', '').strip()
-    crime_filter = request.GET.get('crime_category_filter', '').strip()
-    status_filter = request.GET.get('status_filter', '').strip()
-    sort = request.GET.get('sort', '').strip()
-
-    # --- Apply search ---
-    if query:
-        reports = reports.filter(
-            Q(report_id__icontains=query) |
-            Q(location__icontains=query) |
-            Q(sender__full_name__icontains=query)|
-            Q(message__icontains=query)
-        )
-
-    # --- Apply filters ---
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-
-    if location_filter:
-        reports = reports.filter(location=location_filter)
-
-    if crime_filter:
-        reports = reports.filter(crime_category=crime_filter)
-
-    if status_filter:
-        reports = reports.filter(status=status_filter)
-
-    # --- Sorting ---
-    if sort == "date_asc":
-        reports = reports.order_by("date_time_reported")
-    elif sort == "date_desc":
-        reports = reports.order_by("-date_time_reported")
-    elif sort == "crime_category":
-        reports = reports.order_by("crime_category")
-    elif sort == "status":
-        reports = reports.order_by("status")
-    else:
-        reports = reports.order_by("-date_time_reported")  # default
+    # Base queryset: resolved reports, with the shared search, filters & sort
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='resolved'))
 
     # --- Dropdown values ---
-    # Get all distinct locations from resolved reports (ignoring location filter)
-    locations = EmergencyReport.objects.filter(status='resolved') \
-        .annotate(location_clean=Func('location', function='TRIM')) \
-        .values_list('location_clean', flat=True).distinct().order_by('location_clean')
-
-    dates = reports.dates("date_time_reported", "day").distinct()
+    # Distinct locations and days of resolved reports (ignoring the filters)
+    locations = ReportFacet.values_for('location', 'resolved')
+    dates = ReportFacet.days('resolved')
     crime_categories = EmergencyReport.CRIME_CATEGORIES
     statuses = EmergencyReport.STATUS_CHOICES
 
-
-    crime_categories = EmergencyReport.CRIME_CATEGORIES
-    statuses = EmergencyReport.STATUS_CHOICES
     context = {
         "reports": reports,
-        "query": query,
+        "query": filters.query,
         "dates": dates,
         "locations": locations,
         "crime_categories": crime_categories,
         "statuses": statuses,
-        "sort": sort,
+        "sort": filters.sort,
         "officer_photo_url": get_officer_photo_url(request.user),
     }
     return render(request, "reports/archived.html", context)
@@ -341,41 +233,17 @@ def archived_reports(request):
 
 @login_required
 def unclassified_reports(request):
-    # Base queryset: unclassified reports
-    reports = EmergencyReport.objects.filter(status='unclassified').order_by('-date_time_reported')
-
-    # Get filter parameters
-    query = request.GET.get('q', '')
-    date_filter = request.GET.get('date_filter', '')
-    location_filter = request.GET.get('location_filter', '')
-
-    # Apply search filter
-    if query:
-        reports = reports.filter(
-            Q(location__icontains=query) |
-            Q(sender__full_name__icontains=query)|
-            Q(message__icontains=query)
-        )
-
-    # Apply date filter
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-
-    # Apply location filter
-    if location_filter:
-        reports = reports.filter(location=location_filter)
+    # Base queryset: unclassified reports, with the shared search & filters
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='unclassified'))
 
     # Distinct values for dropdowns
-    dates = EmergencyReport.objects.filter(status='unclassified').dates('date_time_reported', 'day').distinct()
-    locations = EmergencyReport.objects.filter(status='unclassified') \
-    .annotate(location_clean=Func('location', function='TRIM')) \
-    .values_list('location_clean', flat=True) \
-    .distinct() \
-    .order_by('location_clean')
+    dates = ReportFacet.days('unclassified')
+    locations = ReportFacet.values_for('location', 'unclassified')
 
     context = {
         'reports': reports,
-        'query': query,
+        'query': filters.query,
         'dates': dates,
         'locations': locations,
         'officer_photo_url': get_officer_photo_url(request.user),
@@ -421,7 +289,15 @@ def view_unclassified_reports(request, report_id):
 
         elif action == "reject":
             report.status = "rejected"
-            report.save()
+            try:
+                report.save()
+            except ValueError as e:
+                return render(request, "reports/view_unclassified.html", {
+                    "report": report,
+                    "crime_choices": EmergencyReport.CRIME_CATEGORIES,
+                    "error": str(e),
+                    "officer_photo_url": officer_photo_url,
+                })
             return redirect('unclassified_reports')
 
     context = {
@@ -434,40 +310,17 @@ def view_unclassified_reports(request, report_id):
 
 @login_required
 def rejected_reports(request):
-    # Base queryset: rejected reports only
-    reports = EmergencyReport.objects.filter(status='rejected').order_by('-date_time_reported')
-
-    # --- Get filter parameters ---
-    query = request.GET.get('q', '').strip()
-    date_filter = request.GET.get('date_filter', '').strip()
-    location_filter = request.GET.get('location_filter', '').strip()
-
-    # --- Apply filters ---
-    if query:
-        reports = reports.filter(
-            Q(report_id__icontains=query) |
-            Q(location__icontains=query) |
-            Q(sender__full_name__icontains=query)|
-            Q(message__icontains=query)
-        )
-
-    if date_filter:
-        reports = reports.filter(date_time_reported__date=date_filter)
-
-    if location_filter:
-        reports = reports.filter(location=location_filter)
+    # Base queryset: rejected reports only, with the shared search & filters
+    filters = ReportFilter.from_request(request)
+    reports = filters.apply(EmergencyReport.objects.filter(status='rejected'))
 
     # --- Distinct values for dropdowns ---
-    dates = EmergencyReport.objects.filter(status='rejected').dates('date_time_reported', 'day').distinct()
-    locations = EmergencyReport.objects.filter(status='rejected') \
-    .annotate(location_clean=Func('location', function='TRIM')) \
-    .values_list('location_clean', flat=True) \
-    .distinct() \
-    .order_by('location_clean')
+    dates = ReportFacet.days('rejected')
+    locations = ReportFacet.values_for('location', 'rejected')
 
     context = {
         'reports': reports,
-        'query': query,
+        'query': filters.query,
         'dates': dates,
         'locations': locations,
         'officer_photo_url': get_officer_photo_url(request.user),
@@ -495,10 +348,31 @@ def report_view(request, report_id):
 
 
 
+# Officers to suggest per report, at most
+SUGGESTED_OFFICERS_MAX = 20
+
+
+@login_required
+def suggest_officers(request, report_id):
+    """Available officers for a report, those in its area first (see users/dispatch.py)."""
+    report = get_object_or_404(EmergencyReport.objects.only('pk', 'report_id', 'location'), report_id=report_id)
+    try:
+        limit = int(request.GET.get('limit', 5))
+    except ValueError:
+        limit = 5
+    officers = dispatch_index.suggest(
+        report.location,
+        limit=max(1, min(limit, SUGGESTED_OFFICERS_MAX)),
+        exclude=report.officers_responded.values_list('pk', flat=True),
+    )
+    return JsonResponse({"report_id": report.report_id, "location": report.location, "officers": officers})
+
+
 @login_required
 def edit_report(request, report_id):
     report = get_object_or_404(EmergencyReport, report_id=report_id)
     officer_choices = UserProfile.objects.filter(is_staff=False, is_superuser=False)
+    error = None
 
     if request.method == "POST":
         # Update editable fields
@@ -513,12 +387,17 @@ def edit_report(request, report_id):
         report.date_time_resolved = parse_datetime(date_resolved) if date_resolved else None
 
         selected_officers = request.POST.getlist("officers")
-        report.officers_responded.set(UserProfile.objects.filter(id__in=selected_officers))
-
-        report.save()
-        # Refresh to ensure dynamic fields (e.g., date_time_rejected) are populated
-        report.refresh_from_db()
-        return redirect('report_list')
+        try:
+            with transaction.atomic():
+                report.officers_responded.set(UserProfile.objects.filter(id__in=selected_officers))
+                report.save()
+        except ValueError as e:
+            # The status change was refused; nothing (officers included) was saved.
+            error = str(e)
+            report.refresh_from_db()
+        else:
+            # save() already filled in dynamic fields (e.g., date_time_rejected)
+            return redirect('report_list')
 
     # Calculate days remaining if report is rejected
     days_remaining = report.days_remaining if report.status == "rejected" else None
@@ -528,7 +407,11 @@ def edit_report(request, report_id):
         'crime_choices': EmergencyReport.CRIME_CATEGORIES,
         'status_choices': EmergencyReport.STATUS_CHOICES,
         'officer_choices': officer_choices,
+        'suggested_officers': dispatch_index.suggest(
+            report.location, exclude=report.officers_responded.values_list('pk', flat=True)
+        ),
         'days_remaining': days_remaining,  # pass explicitly to template
+        'error': error,
     }
     return render(request, 'reports/edit_report.html', context)
 
@@ -1,23 +1,26 @@
 document.addEventListener("DOMContentLoaded", () => {
     const ul = document.getElementById("notif-list");
 
+    // Long-poll: the server holds each request until something changes (or
+    // ~25s pass) and answers 304 if nothing did. When it can't hold requests
+    // it says how long to wait instead (X-Poll-Interval).
+    let etag = null;
+
     function refreshNotifications() {
-        fetch(window.NOTIFICATIONS_JSON_URL)
-            .then(res => res.json())
+        const headers = etag ? { "If-None-Match": etag } : {};
+        let delay = 0;
+        fetch(`${window.NOTIFICATIONS_JSON_URL}?wait=25`, { headers, cache: "no-store" })
+            .then(res => {
+                delay = parseInt(res.headers.get("X-Poll-Interval") || "0", 10) * 1000;
+                if (res.status === 304) return null;
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                etag = res.headers.get("ETag");
+                return res.json();
+            })
             .then(data => {
-                // Update badge
-                let badge = document.querySelector("[x-ref='badge']");
-                if (data.unread_count > 0) {
-                    if (!badge) {
-                        badge = document.createElement("span");
-                        badge.setAttribute("x-ref", "badge");
-                        badge.className = "absolute -top-1 -right-2 bg-red-600 text-white text-xs font-bold px-1.5 py-0.5 rounded-full";
-                        document.querySelector("button.relative").appendChild(badge);
-                    }
-                    badge.innerText = data.unread_count;
-                } else if (badge) {
-                    badge.remove();
-                }
+                if (!data) return;
+
+                setBadge(data.unread_count);
 
                 // Update notification list
                 ul.innerHTML = "";
@@ -38,27 +41,61 @@ document.addEventListener("DOMContentLoaded", () => {
                 }
 
                 attachClickHandlers();
+            })
+            .catch(err => {
+                console.error("Error fetching notifications:", err);
+                delay = 10000;
+            })
+            .finally(() => setTimeout(refreshNotifications, delay));
+    }
+
+    function getCookie(name) {
+        const match = document.cookie.match(new RegExp(`(?:^|; )${name}=([^;]*)`));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    // POSTs to one of the bulk read endpoints; resolves to the new unread count
+    function markRead(url, ids) {
+        const body = new URLSearchParams();
+        (ids || []).forEach(id => body.append("ids", id));
+        return fetch(url, {
+            method: "POST",
+            headers: {
+                "X-Requested-With": "XMLHttpRequest",
+                "X-CSRFToken": getCookie("csrftoken"),
+            },
+            body,
+        })
+            .then(res => res.json())
+            .then(data => {
+                setBadge(data.unread_count);
+                return data.unread_count;
             });
     }
 
+    function setBadge(count) {
+        let badge = document.querySelector("[x-ref='badge']");
+        if (count > 0) {
+            if (!badge) {
+                badge = document.createElement("span");
+                badge.setAttribute("x-ref", "badge");
+                badge.className = "absolute -top-1 -right-2 bg-red-600 text-white text-xs font-bold px-1.5 py-0.5 rounded-full";
+                document.querySelector("button.relative").appendChild(badge);
+            }
+            badge.innerText = count;
+        } else if (badge) {
+            badge.remove();
+        }
+    }
+
     function attachClickHandlers() {
         document.querySelectorAll(".notif-link").forEach(link => {
             link.addEventListener("click", e => {
                 e.preventDefault();
                 const noteId = link.dataset.id;
 
-                fetch(`/notifications/mark/${noteId}/`, { 
-                    headers: { 'X-Requested-With': 'XMLHttpRequest' } 
-                })
-                .then(() => {
-                    // Update badge
-                    const badge = document.querySelector("[x-ref='badge']");
-                    if (badge) {
-                        let count = parseInt(badge.innerText);
-                        if (count > 0) badge.innerText = count - 1;
-                        if (count - 1 === 0) badge.remove();
-                    }
-
+                markRead(window.NOTIFICATIONS_READ_URL, [noteId])
+                .finally(() => {
                     // Remove highlight
                     const li = document.getElementById(`note-${noteId}`);
                     if (li) li.classList.remove('bg-gray-100','font-semibold');
@@ -70,9 +107,16 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
 
-    // Initial run
-    refreshNotifications();
+    // "Mark all read" covers the notifications shown, not ones arriving meanwhile
+    document.getElementById("notif-mark-all")?.addEventListener("click", () => {
+        const ids = Array.from(document.querySelectorAll(".notif-link")).map(link => parseInt(link.dataset.id, 10));
+        if (ids.length === 0) return;
+        const url = window.NOTIFICATIONS_READ_UP_TO_URL.replace(/0\/$/, `${Math.max(...ids)}/`);
+        markRead(url).then(() => {
+            ul.querySelectorAll("li").forEach(li => li.classList.remove("bg-gray-100", "font-semibold"));
+        });
+    });
 
-    // Refresh every 10 seconds
-    setInterval(refreshNotifications, 10000);
+    // Initial run; each request schedules the next
+    refreshNotifications();
 });
@@ -1,141 +1,286 @@
-function fetchReports() {
+// Reports currently shown, keyed by report_id. The first request loads one
+// page; "Load more" follows the server's `next` cursor. Polls after that send
+// ?since=<cursor> and only receive what changed (or a 304 if nothing did).
+// Responses use the compact columnar format; polls also send the last ETag
+// so an unchanged delta costs a 304.
+const reportsById = new Map();
+let reportCursor = null;
+let reportEtag = null;
+let nextPage = null;
+
+function buildReportUrl(params) {
     const q = document.querySelector('input[name="q"]')?.value || "";
     const date_filter = document.querySelector('input[name="date_filter"]')?.value || "";
     const location_filter = document.querySelector('select[name="location_filter"]')?.value || "";
     const crime_category_filter = document.querySelector('select[name="crime_category_filter"]')?.value || "";
     const status_filter = document.querySelector('select[name="status_filter"]')?.value || "";
 
-    let url = `${window.REPORT_LIST_URL}?q=${encodeURIComponent(q)}&date_filter=${encodeURIComponent(date_filter)}&location_filter=${encodeURIComponent(location_filter)}&crime_category_filter=${encodeURIComponent(crime_category_filter)}`;
+    let url = `${window.REPORT_LIST_URL}?format=compact&q=${encodeURIComponent(q)}&date_filter=${encodeURIComponent(date_filter)}&location_filter=${encodeURIComponent(location_filter)}&crime_category_filter=${encodeURIComponent(crime_category_filter)}`;
     if (status_filter) url += `&status_filter=${encodeURIComponent(status_filter)}`;
+    Object.entries(params || {}).forEach(([key, value]) => {
+        url += `&${key}=${encodeURIComponent(value)}`;
+    });
+    return url;
+}
+
+// Same text as the server's "%Y-%m-%d %I:%M %p" (times are shown in UTC)
+function formatTime(epochMs) {
+    if (epochMs === null || epochMs === undefined) return null;
+    const d = new Date(epochMs);
+    const pad = n => String(n).padStart(2, "0");
+    const hours = d.getUTCHours() % 12 || 12;
+    const ampm = d.getUTCHours() < 12 ? "AM" : "PM";
+    return `${d.getUTCFullYear()}-${pad(d.getUTCMonth() + 1)}-${pad(d.getUTCDate())} ${pad(hours)}:${pad(d.getUTCMinutes())} ${ampm}`;
+}
+
+// Turns compact rows (arrays in `columns` order) into the report objects
+// renderReports() expects.
+function decodeReports(data) {
+    const codes = data.codes;
+    return (data.reports || []).map(values => {
+        const row = {};
+        data.columns.forEach((column, i) => { row[column] = values[i]; });
+        return {
+            report_id: row.report_id,
+            reported_at: row.reported_at,
+            date_time_reported: formatTime(row.reported_at),
+            location: row.location,
+            sender: row.sender,
+            crime_category: row.crime_category === null || row.crime_category === undefined ? null : codes.crime_category[row.crime_category],
+            status: row.status === null || row.status === undefined ? null : codes.status[row.status],
+            date_time_responded: formatTime(row.responded_at),
+            officers_responded: row.officers_responded || [],
+            date_time_resolved: formatTime(row.resolved_at),
+            date_time_rejected: formatTime(row.rejected_at),
+            message: row.message || "--",
+            days_remaining: row.days_remaining === undefined ? null : row.days_remaining,
+        };
+    });
+}
+
+function sortedReports() {
+    // Newest first, same as the server's default ordering
+    const reports = Array.from(reportsById.values());
+    reports.sort((a, b) => (a.reported_at < b.reported_at ? 1 : a.reported_at > b.reported_at ? -1 : 0));
+    return reports;
+}
+
+function applyReportChanges(data) {
+    if (data.full) {
+        reportsById.clear();
+        nextPage = data.next;
+    }
+
+    // While older pages are still unloaded, leave changes to them for "Load more"
+    const loaded = sortedReports();
+    const oldest = nextPage && loaded.length ? loaded[loaded.length - 1].reported_at : null;
+
+    (data.removed || []).forEach(id => reportsById.delete(id));
+    decodeReports(data).forEach(r => {
+        if (!oldest || r.reported_at >= oldest) reportsById.set(r.report_id, r);
+    });
+    reportCursor = data.cursor;
+    renderReports(sortedReports());
+}
 
-    fetch(url, { credentials: "include" })
+function fetchReports(reset) {
+    if (reset) {
+        reportCursor = null;
+        reportEtag = null;
+    }
+
+    const headers = reportCursor && reportEtag ? { "If-None-Match": reportEtag } : {};
+    fetch(buildReportUrl(reportCursor ? { since: reportCursor } : {}), { credentials: "include", cache: "no-store", headers })
+        .then(response => {
+            if (response.status === 304) return null;
+            reportEtag = response.headers.get("ETag");
+            return response.json();
+        })
+        .then(data => {
+            if (data) applyReportChanges(data);
+        })
+        .catch(err => console.error("Error fetching reports:", err));
+}
+
+function loadMoreReports() {
+    if (!nextPage) return;
+
+    fetch(buildReportUrl({ after: nextPage }), { credentials: "include" })
         .then(response => response.json())
         .then(data => {
-            const tableBody = document.getElementById("reportTableBody");
-            const cardBody = document.getElementById("reportCardBody");
-            tableBody.innerHTML = "";
-            cardBody.innerHTML = "";
-
-            let colspan = 4; // ID, Date, Location, Sender
-            if (window.PAGE_CONTEXT.show_unclassified) colspan += 1; // Message
-            else colspan += 2; // Crime Category + Status
-            if (window.PAGE_CONTEXT.show_resolved) colspan += 3; // Responded, Officers, Resolved
-            if (window.PAGE_CONTEXT.show_rejected) colspan += 3; // Rejected On, Message, Days Remaining
-            colspan += 2; // Actions
-
-            if (!data.reports || data.reports.length === 0) {
-                tableBody.innerHTML = `<tr><td colspan="${colspan}" class="p-3 border-b text-center">No reports found.</td></tr>`;
-                cardBody.innerHTML = `<p class="text-center text-gray-500">No reports found.</p>`;
-                return;
-            }
-
-            data.reports.forEach(r => {
-                let officers = r.officers_responded && r.officers_responded.length > 0 
-                    ? r.officers_responded.join(", ")
-                    : "--";
-
-                const viewUrl = window.PAGE_CONTEXT.show_unclassified 
-                    ? `${window.UNCLASSIFIED_VIEW_BASE}${r.report_id}/` 
-                    : `/reports/view/${r.report_id}/`;
-                const editUrl = `/reports/edit/${r.report_id}/`;
-
-                // --- DESKTOP TABLE ROW ---
-                let row = `<tr>
-                    <td class="p-3 border-b">${r.report_id}</td>
-                    <td class="p-3 border-b">${r.date_time_reported}</td>
-                    <td class="p-3 border-b">${r.location}</td>
-                    <td class="p-3 border-b">${r.sender}</td>`;
-
-                if (window.PAGE_CONTEXT.show_unclassified) {
-                    row += `<td class="p-3 border-b">${r.message || "--"}</td>`;
-                } else {
-                    row += `<td class="p-3 border-b">${r.crime_category || "Unknown"}</td>
-                            <td class="p-3 border-b">${r.status}</td>`;
-                }
-
-                if (window.PAGE_CONTEXT.show_resolved) {
-                    row += `<td class="p-3 border-b">${r.date_time_responded || "--"}</td>
-                            <td class="p-3 border-b">${officers}</td>
-                            <td class="p-3 border-b">${r.date_time_resolved || "--"}</td>`;
-                }
-
-                if (window.PAGE_CONTEXT.show_rejected) {
-                    row += `<td class="p-3 border-b">${r.date_time_rejected || "--"}</td>
-                            <td class="p-3 border-b">${r.message || "--"}</td>
-                            <td class="p-3 border-b">${r.days_remaining !== null ? r.days_remaining + " day" + (r.days_remaining !== 1 ? "s" : "") : "--"}</td>`;
-                }
-
-                // --- ACTIONS ---
-                row += `<td class="p-3 border-b text-center">
-                            <a href="${viewUrl}">
-                                <button class="px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">VIEW</button>
-                            </a>
-                        </td>`;
-
-                // Only show EDIT button if NOT unclassified page
-                if (!window.PAGE_CONTEXT.show_unclassified) {
-                    row += `<td class="p-3 border-b text-center">
-                                <a href="${editUrl}">
-                                    <button class="px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">EDIT</button>
-                                </a>
-                            </td>`;
-                }
-
-                row += `</tr>`;
-                tableBody.innerHTML += row;
-
-                // --- MOBILE CARD ---
-                let card = `<div class="bg-white shadow-md rounded-lg p-4 border">
-                    <p><strong>ID:</strong> ${r.report_id}</p>
-                    <p><strong>Date:</strong> ${r.date_time_reported}</p>
-                    <p><strong>Location:</strong> ${r.location}</p>
-                    <p><strong>Sender:</strong> ${r.sender}</p>`;
-
-                if (window.PAGE_CONTEXT.show_unclassified) {
-                    card += `<p><strong>Message:</strong> ${r.message || "--"}</p>`;
-                } else {
-                    card += `<p><strong>Category:</strong> ${r.crime_category || "Unknown"}</p>
-                            <p><strong>Status:</strong> ${r.status}</p>`;
-                }
-
-                if (window.PAGE_CONTEXT.show_resolved) {
-                    card += `<p><strong>Responded:</strong> ${r.date_time_responded || "--"}</p>
-                            <p><strong>Officers:</strong> ${officers}</p>
-                            <p><strong>Resolved:</strong> ${r.date_time_resolved || "--"}</p>`;
-                }
-
-                if (window.PAGE_CONTEXT.show_rejected) {
-                    card += `<p><strong>Rejected On:</strong> ${r.date_time_rejected || "--"}</p>
-                            <p><strong>Message:</strong> ${r.message || "--"}</p>
-                            <p><strong>Days Remaining:</strong> ${r.days_remaining !== null ? r.days_remaining + " day" + (r.days_remaining !== 1 ? "s" : "") : "--"}</p>`;
-                }
-
-                // ACTION buttons
-                card += `<div class="mt-3 flex space-x-2">
-                            <a href="${viewUrl}" class="flex-1">
-                                <button class="w-full px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">VIEW</button>
-                            </a>`;
-
-                if (!window.PAGE_CONTEXT.show_unclassified) {
-                    card += `<a href="${editUrl}" class="flex-1">
-                                <button class="w-full px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">EDIT</button>
-                            </a>`;
-                }
-
-                card += `</div></div>`;
-                cardBody.innerHTML += card;
-            });
+            // Keep the delta cursor from the first page so no change is skipped
+            decodeReports(data).forEach(r => reportsById.set(r.report_id, r));
+            nextPage = data.next;
+            renderReports(sortedReports());
         })
         .catch(err => console.error("Error fetching reports:", err));
 }
 
-setInterval(fetchReports, 5000);
+function renderReports(reports) {
+    const tableBody = document.getElementById("reportTableBody");
+    const cardBody = document.getElementById("reportCardBody");
+    const loadMore = document.getElementById("loadMoreReports");
+    tableBody.innerHTML = "";
+    cardBody.innerHTML = "";
+    if (loadMore) loadMore.classList.toggle("hidden", !nextPage);
+
+    let colspan = 4; // ID, Date, Location, Sender
+    if (window.PAGE_CONTEXT.show_unclassified) colspan += 1; // Message
+    else colspan += 2; // Crime Category + Status
+    if (window.PAGE_CONTEXT.show_resolved) colspan += 3; // Responded, Officers, Resolved
+    if (window.PAGE_CONTEXT.show_rejected) colspan += 3; // Rejected On, Message, Days Remaining
+    colspan += 2; // Actions
+
+    if (reports.length === 0) {
+        tableBody.innerHTML = `<tr><td colspan="${colspan}" class="p-3 border-b text-center">No reports found.</td></tr>`;
+        cardBody.innerHTML = `<p class="text-center text-gray-500">No reports found.</p>`;
+        return;
+    }
+
+    reports.forEach(r => {
+        let officers = r.officers_responded && r.officers_responded.length > 0 
+            ? r.officers_responded.join(", ")
+            : "--";
+
+        const viewUrl = window.PAGE_CONTEXT.show_unclassified 
+            ? `${window.UNCLASSIFIED_VIEW_BASE}${r.report_id}/` 
+            : `/reports/view/${r.report_id}/`;
+        const editUrl = `/reports/edit/${r.report_id}/`;
+
+        // --- DESKTOP TABLE ROW ---
+        let row = `<tr>
+            <td class="p-3 border-b">${r.report_id}</td>
+            <td class="p-3 border-b">${r.date_time_reported}</td>
+            <td class="p-3 border-b">${r.location}</td>
+            <td class="p-3 border-b">${r.sender}</td>`;
+
+        if (window.PAGE_CONTEXT.show_unclassified) {
+            row += `<td class="p-3 border-b">${r.message || "--"}</td>`;
+        } else {
+            row += `<td class="p-3 border-b">${r.crime_category || "Unknown"}</td>
+                    <td class="p-3 border-b">${r.status}</td>`;
+        }
+
+        if (window.PAGE_CONTEXT.show_resolved) {
+            row += `<td class="p-3 border-b">${r.date_time_responded || "--"}</td>
+                    <td class="p-3 border-b">${officers}</td>
+                    <td class="p-3 border-b">${r.date_time_resolved || "--"}</td>`;
+        }
+
+        if (window.PAGE_CONTEXT.show_rejected) {
+            row += `<td class="p-3 border-b">${r.date_time_rejected || "--"}</td>
+                    <td class="p-3 border-b">${r.message || "--"}</td>
+                    <td class="p-3 border-b">${r.days_remaining !== null ? r.days_remaining + " day" + (r.days_remaining !== 1 ? "s" : "") : "--"}</td>`;
+        }
+
+        // --- ACTIONS ---
+        row += `<td class="p-3 border-b text-center">
+                    <a href="${viewUrl}">
+                        <button class="px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">VIEW</button>
+                    </a>
+                </td>`;
+
+        // Only show EDIT button if NOT unclassified page
+        if (!window.PAGE_CONTEXT.show_unclassified) {
+            row += `<td class="p-3 border-b text-center">
+                        <a href="${editUrl}">
+                            <button class="px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">EDIT</button>
+                        </a>
+                    </td>`;
+        }
+
+        row += `</tr>`;
+        tableBody.innerHTML += row;
+
+        // --- MOBILE CARD ---
+        let card = `<div class="bg-white shadow-md rounded-lg p-4 border">
+            <p><strong>ID:</strong> ${r.report_id}</p>
+            <p><strong>Date:</strong> ${r.date_time_reported}</p>
+            <p><strong>Location:</strong> ${r.location}</p>
+            <p><strong>Sender:</strong> ${r.sender}</p>`;
+
+        if (window.PAGE_CONTEXT.show_unclassified) {
+            card += `<p><strong>Message:</strong> ${r.message || "--"}</p>`;
+        } else {
+            card += `<p><strong>Category:</strong> ${r.crime_category || "Unknown"}</p>
+                    <p><strong>Status:</strong> ${r.status}</p>`;
+        }
+
+        if (window.PAGE_CONTEXT.show_resolved) {
+            card += `<p><strong>Responded:</strong> ${r.date_time_responded || "--"}</p>
+                    <p><strong>Officers:</strong> ${officers}</p>
+                    <p><strong>Resolved:</strong> ${r.date_time_resolved || "--"}</p>`;
+        }
+
+        if (window.PAGE_CONTEXT.show_rejected) {
+            card += `<p><strong>Rejected On:</strong> ${r.date_time_rejected || "--"}</p>
+                    <p><strong>Message:</strong> ${r.message || "--"}</p>
+                    <p><strong>Days Remaining:</strong> ${r.days_remaining !== null ? r.days_remaining + " day" + (r.days_remaining !== 1 ? "s" : "") : "--"}</p>`;
+        }
+
+        // ACTION buttons
+        card += `<div class="mt-3 flex space-x-2">
+                    <a href="${viewUrl}" class="flex-1">
+                        <button class="w-full px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">VIEW</button>
+                    </a>`;
+
+        if (!window.PAGE_CONTEXT.show_unclassified) {
+            card += `<a href="${editUrl}" class="flex-1">
+                        <button class="w-full px-2 py-1 bg-[#4B7289] text-white rounded hover:bg-[#6B7280]">EDIT</button>
+                    </a>`;
+        }
+
+        card += `</div></div>`;
+        cardBody.innerHTML += card;
+    });
+}
+
+// Live updates: the server pushes a "report" event whenever a report changes
+// and we fetch the delta. While the stream is down (or unsupported, or the
+// server answers 204 under WSGI) we fall back to polling every 5 seconds.
+let pollTimer = null;
+let pendingFetch = null;
+
+function startPolling() {
+    if (!pollTimer) pollTimer = setInterval(fetchReports, 5000);
+}
+
+function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+function scheduleFetch() {
+    // Coalesce bursts of events (e.g. a save plus an officer change) into one request
+    if (pendingFetch) return;
+    pendingFetch = setTimeout(() => {
+        pendingFetch = null;
+        fetchReports();
+    }, 250);
+}
+
+function startReportStream() {
+    if (!window.EventSource || !window.REPORT_STREAM_URL) return;
+
+    const source = new EventSource(window.REPORT_STREAM_URL);
+    source.addEventListener("report", scheduleFetch);
+    source.onopen = () => {
+        stopPolling();
+        scheduleFetch(); // catch up on anything missed while disconnected
+    };
+    source.onerror = () => startPolling();
+}
+
+startPolling();
+startReportStream();
 fetchReports();
 
+document.getElementById("loadMoreReports")?.addEventListener("click", loadMoreReports);
+
 const filterForm = document.querySelector('.filters form');
 if (filterForm) {
     filterForm.addEventListener('submit', function(e) {
         e.preventDefault();
-        fetchReports();
+        fetchReports(true);
     });
 }
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import UserProfile, DeploymentHistory
+from .models import UserProfile, DeploymentHistory, CurrentDeployment
 from django.utils.translation import gettext_lazy as _
 
 @admin.register(UserProfile)
@@ -75,6 +75,22 @@ class DeploymentHistoryAdmin(admin.ModelAdmin):
     ordering = ('-report__date_time_reported',)
     autocomplete_fields = ['police', 'report']
 
+    # DeploymentHistory sends no signals (see users/signals.py), so edits
+    # here refresh the officers' CurrentDeployment themselves.
+    def save_model(self, request, obj, form, change):
+        previous = DeploymentHistory.objects.filter(pk=obj.pk).values_list('police_id', flat=True).first()
+        super().save_model(request, obj, form, change)
+        CurrentDeployment.refresh({obj.police_id, previous})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        CurrentDeployment.refresh([obj.police_id])
+
+    def delete_queryset(self, request, queryset):
+        officer_ids = set(queryset.values_list('police_id', flat=True))
+        super().delete_queryset(request, queryset)
+        CurrentDeployment.refresh(officer_ids)
+
     def get_report_id(self, obj):
         return obj.report.report_id
     get_report_id.admin_order_field = 'report__report_id'
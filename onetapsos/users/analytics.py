@@ -0,0 +1,333 @@
+# Response-time analytics over DeploymentHistory.
+#
+# For each deployment we measure how long its report waited from being
+# reported until the deployment was responded to, and until it was resolved.
+# Deployments are loaded a calendar month at a time into NumPy columns and
+# kept in memory: months that can still change for ANALYTICS_RECENT_CACHE_SECONDS,
+# older ones for ANALYTICS_HISTORY_CACHE_SECONDS. Percentiles, histograms and
+# trends are then computed over those columns without going back to the
+# database, and each answer is cached for its time window as well.
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .models import DeploymentHistory
+
+PERCENTILES = (50, 90, 95, 99)
+# Histogram bucket upper bounds, in minutes; the last bucket is open-ended
+DISTRIBUTION_MINUTES = (5, 10, 15, 30, 60, 120, 240, 480, 1440)
+GROUPS = {
+    'officer': 'police__police_id',
+    'area': 'report__location',
+    'crime_category': 'report__crime_category',
+}
+MEASURES = ('respond', 'resolve')
+
+
+class Vocabulary:
+    """Stable integer codes for strings (officer ids, areas, categories) within this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {}
+        self.labels = []
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            with self._lock:
+                code = self._codes.setdefault(label, len(self.labels))
+                if code == len(self.labels):
+                    self.labels.append(label)
+        return code
+
+    def get(self, label):
+        return self._codes.get(label)
+
+
+VOCABULARIES = {group: Vocabulary() for group in GROUPS}
+
+
+class Frame:
+    """Deployment columns: reported time (epoch seconds), waits (seconds, NaN if not yet) and group codes."""
+
+    def __init__(self, reported, respond, resolve, codes):
+        self.reported = reported
+        self.respond = respond
+        self.resolve = resolve
+        self.codes = codes  # group -> int32 array
+
+    def __len__(self):
+        return len(self.reported)
+
+    @classmethod
+    def load(cls, start, end):
+        """Deployments of reports reported in [start, end)."""
+        rows = DeploymentHistory.objects.filter(
+            report__date_time_reported__gte=start,
+            report__date_time_reported__lt=end,
+            police__isnull=False,
+        ).values_list('report__date_time_reported', 'date_time_responded', 'date_time_resolved', *GROUPS.values())
+        reported, responded, resolved = [], [], []
+        codes = {group: [] for group in GROUPS}
+        for row in rows.iterator(chunk_size=5000):
+            reported.append(row[0].timestamp())
+            responded.append(row[1].timestamp() if row[1] else np.nan)
+            resolved.append(row[2].timestamp() if row[2] else np.nan)
+            for group, label in zip(GROUPS, row[3:]):
+                codes[group].append(VOCABULARIES[group].code(label or ""))
+        reported = np.array(reported, dtype=np.float64)
+        return cls(
+            reported,
+            np.array(responded, dtype=np.float64) - reported,
+            np.array(resolved, dtype=np.float64) - reported,
+            {group: np.array(values, dtype=np.int32) for group, values in codes.items()},
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.empty(0) for _ in range(3)), {group: np.empty(0, dtype=np.int32) for group in GROUPS})
+
+    @classmethod
+    def concat(cls, frames):
+        return cls(
+            np.concatenate([frame.reported for frame in frames]),
+            np.concatenate([frame.respond for frame in frames]),
+            np.concatenate([frame.resolve for frame in frames]),
+            {group: np.concatenate([frame.codes[group] for frame in frames]) for group in GROUPS},
+        )
+
+    def where(self, mask):
+        return Frame(
+            self.reported[mask], self.respond[mask], self.resolve[mask],
+            {group: codes[mask] for group, codes in self.codes.items()},
+        )
+
+
+class TimedCache:
+    def __init__(self, max_entries=256):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.max_entries = max_entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key, value, seconds):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + seconds, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+months = TimedCache(max_entries=240)
+results = TimedCache()
+
+
+def month_start(moment):
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment):
+    return month_start(month_start(moment) + timedelta(days=32))
+
+
+def cache_seconds(end):
+    """How long results over a window ending at `end` may be reused."""
+    # Reports from the last couple of months may still be responded to or resolved
+    if end > month_start(month_start(datetime.now(dt_timezone.utc)) - timedelta(days=1)):
+        return getattr(settings, 'ANALYTICS_RECENT_CACHE_SECONDS', 60)
+    return getattr(settings, 'ANALYTICS_HISTORY_CACHE_SECONDS', 3600)
+
+
+def deployments(start, end):
+    """Frame of the deployments of reports reported in [start, end) (aware datetimes)."""
+    frames = []
+    month = month_start(start.astimezone(dt_timezone.utc))
+    while month < end:
+        following = next_month(month)
+        frame = months.get(month)
+        if frame is None:
+            frame = months.set(month, Frame.load(month, following), cache_seconds(following))
+        frames.append(frame)
+        month = following
+    if not frames:
+        return Frame.empty()
+    frame = Frame.concat(frames)
+    return frame.where((frame.reported >= start.timestamp()) & (frame.reported < end.timestamp()))
+
+
+# ---------------- Statistics ---------------- #
+def minutes(seconds):
+    return None if seconds is None or np.isnan(seconds) else round(float(seconds) / 60, 1)
+
+
+def percentiles(values):
+    """{"p50": minutes, ...} over the values that are not NaN."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {f"p{q}": None for q in PERCENTILES}
+    return {f"p{q}": minutes(value) for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def distribution(values):
+    """Counts per DISTRIBUTION_MINUTES bucket, plus one for longer waits."""
+    values = values[~np.isnan(values)] / 60
+    edges = np.array((0,) + DISTRIBUTION_MINUTES + (np.inf,))
+    counts, _ = np.histogram(values, bins=edges)
+    return [
+        {"up_to_minutes": None if np.isinf(edge) else int(edge), "count": int(count)}
+        for edge, count in zip(edges[1:], counts)
+    ]
+
+
+def grouped_percentiles(codes, values, qs=PERCENTILES):
+    """
+    Percentiles of `values` per group code, all groups at once: returns
+    (codes present, counts, array of shape (groups, len(qs)) in seconds).
+    NaN values are left out; groups with none get NaN percentiles.
+    """
+    present = np.unique(codes)
+    keep = ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    groups = np.searchsorted(present, codes)
+    counts = np.bincount(groups, minlength=len(present))
+    starts = np.cumsum(counts) - counts
+    result = np.full((len(present), len(qs)), np.nan)
+    has_values = counts > 0
+    for column, q in enumerate(qs):
+        # Linear interpolation between closest ranks, as np.percentile does
+        position = (counts[has_values] - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        base = starts[has_values]
+        low_values = values[base + lower]
+        result[has_values, column] = low_values + (values[base + upper] - low_values) * (position - lower)
+    return present, counts, result
+
+
+def trend(frame, start, end):
+    """Median waits and deployment counts per day, week or month, depending on the window's length."""
+    span = end - start
+    unit = 'D' if span <= timedelta(days=92) else 'W' if span <= timedelta(days=731) else 'M'
+    periods = frame.reported.astype('datetime64[s]').astype(f'datetime64[{unit}]')
+    labels, period_codes = np.unique(periods, return_inverse=True)
+    counts = np.bincount(period_codes, minlength=len(labels))
+    medians = {
+        measure: grouped_percentiles(period_codes, getattr(frame, measure), qs=(50,))
+        for measure in MEASURES
+    }
+    points = []
+    for index, label in enumerate(labels):
+        point = {"period": str(label.astype('datetime64[D]')), "deployments": int(counts[index])}
+        for measure, (present, _, values) in medians.items():
+            found = np.searchsorted(present, index)
+            point[f"{measure}_p50"] = minutes(values[found, 0]) if found < len(present) and present[found] == index else None
+        points.append(point)
+    return {"unit": {'D': 'day', 'W': 'week', 'M': 'month'}[unit], "points": points}
+
+
+def group_table(frame, group):
+    """Per-group deployment counts and percentile waits, most deployments first."""
+    codes = frame.codes[group]
+    rows = {}
+    for measure in MEASURES:
+        present, counts, values = grouped_percentiles(codes, getattr(frame, measure))
+        for index, code in enumerate(present):
+            row = rows.setdefault(int(code), {group: VOCABULARIES[group].labels[code]})
+            row[f"{measure}_count"] = int(counts[index])
+            row.update({f"{measure}_p{q}": minutes(values[index, column]) for column, q in enumerate(PERCENTILES)})
+    totals = np.bincount(codes, minlength=len(VOCABULARIES[group].labels))
+    for code, row in rows.items():
+        row["deployments"] = int(totals[code])
+    return sorted(rows.values(), key=lambda row: -row["deployments"])
+
+
+# ---------------- Answers ---------------- #
+def summary(start, end, group_by=None, police_id=None):
+    """
+    Response and resolution waits for reports reported in [start, end):
+    counts, percentiles, distributions and a trend, optionally for one
+    officer, plus a per-group table when `group_by` is one of GROUPS.
+    """
+    key = ('summary', start, end, group_by, police_id)
+    cached = results.get(key)
+    if cached is not None:
+        return cached
+    frame = deployments(start, end)
+    if police_id is not None:
+        code = VOCABULARIES['officer'].get(police_id)
+        frame = frame.where(frame.codes['officer'] == (-1 if code is None else code))
+    answer = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "deployments": len(frame),
+    }
+    for measure in MEASURES:
+        values = getattr(frame, measure)
+        answer[measure] = {
+            "count": int(np.count_nonzero(~np.isnan(values))),
+            **percentiles(values),
+            "distribution": distribution(values),
+        }
+    answer["trend"] = trend(frame, start, end)
+    if group_by in GROUPS:
+        answer["groups"] = group_table(frame, group_by)
+    return results.set(key, answer, cache_seconds(end))
+
+
+def scorecard(police_id, days=90, now=None):
+    """
+    One officer's waits over the last `days` days, next to the median of all
+    officers' medians, and the share of officers with a slower median.
+    """
+    # Whole days, so every scorecard shown today shares one window (and cache entry)
+    today = (now or datetime.now(dt_timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    start, end = today - timedelta(days=days), today + timedelta(days=1)
+    key = ('scorecard', start, end)
+    table = results.get(key)
+    if table is None:
+        frame = deployments(start, end)
+        table = {}
+        for measure in MEASURES:
+            present, counts, values = grouped_percentiles(frame.codes['officer'], getattr(frame, measure), qs=(50, 90))
+            table[measure] = (present, counts, values)
+        table['deployments'] = np.bincount(frame.codes['officer'], minlength=len(VOCABULARIES['officer'].labels))
+        results.set(key, table, cache_seconds(end))
+
+    code = VOCABULARIES['officer'].get(police_id)
+    deployments_total = table['deployments']
+    card = {
+        "days": days,
+        "deployments": int(deployments_total[code]) if code is not None and code < len(deployments_total) else 0,
+    }
+    for measure in MEASURES:
+        present, counts, values = table[measure]
+        medians = values[:, 0][counts > 0]
+        found = np.searchsorted(present, code) if code is not None else len(present)
+        mine = found < len(present) and present[found] == code and counts[found] > 0
+        card[measure] = {
+            "count": int(counts[found]) if mine else 0,
+            "p50": minutes(values[found, 0]) if mine else None,
+            "p90": minutes(values[found, 1]) if mine else None,
+            "all_officers_p50": minutes(np.median(medians)) if len(medians) else None,
+            # Faster than this share of officers (by median)
+            "faster_than": round(float(np.mean(medians > values[found, 0])) * 100) if mine else None,
+        }
+    return card
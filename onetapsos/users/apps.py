@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        import users.signals  # noqa
+        from onetapsos.scheduler import should_autostart
+        from .dispatch import index
+
+        # Web server processes build the dispatch index up front; anything
+        # else builds it on its first lookup.
+        if should_autostart("DISPATCH_INDEX_AUTOSTART"):
+            index.start()
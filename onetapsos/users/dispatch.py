@@ -0,0 +1,256 @@
+# In-memory dispatch index: field officers by area and availability, for
+# suggesting who to send to a report (reports.views.suggest_officers).
+#
+# Each process keeps its own copy, maintained by a background thread started
+# with the process (or on the first lookup). The thread builds it from
+# UserProfile and CurrentDeployment and then updates it per officer:
+# CurrentDeployment.refresh() and officer profile changes call
+# officers_changed(), which marks the officers stale here and tells the other
+# workers through the report event broker's "dispatch" channel. The thread
+# re-reads stale officers, in one query, as soon as this process marks them
+# and every DISPATCH_INDEX_POLL_SECONDS for other workers' changes. Lookups
+# only read the index: no queries, no event file, never a rebuild.
+#
+# Available officers are kept per area in insertion order, so the officer
+# who has waited longest comes first and a lookup only reads as many
+# entries as it returns.
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from reports.events import broker
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "dispatch"
+
+# CurrentDeployment statuses (report or deployment statuses) that keep an
+# officer busy; officers with any other status, or none, are available.
+BUSY_STATUSES = {'active', 'unclassified', 'pending', 'responded'}
+
+
+def area_key(text):
+    return " ".join(text.split()).casefold() if text else ""
+
+
+def location_keys(location):
+    """Area keys a report location may match: the whole location, then each comma-separated part."""
+    keys = [area_key(location)] + [area_key(part) for part in (location or "").split(",")]
+    return [key for index, key in enumerate(keys) if key and key not in keys[:index]]
+
+
+def officer_rows(queryset):
+    """values() rows the index keeps for each officer, longest idle first."""
+    return (
+        queryset.filter(is_staff=False, is_superuser=False)
+        .order_by(
+            F('current_deployment__date_time_resolved').asc(nulls_first=True),
+            F('current_deployment__date_time_responded').asc(nulls_first=True),
+            'pk',
+        )
+        .values(
+            'id', 'police_id', 'first_name', 'last_name', 'rank', 'area_vicinity', 'is_active',
+            'current_deployment__status', 'current_deployment__report_id',
+        )
+    )
+
+
+class DispatchIndex:
+    def __init__(self):
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.RLock()
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._officers = {}  # officer pk -> entry
+        self._available = {}  # area key -> {officer pk: None}, longest idle first
+        self._all_available = {}  # {officer pk: None}, longest idle first
+        self._stale = set()  # officer pks to re-read before the next lookup
+        self._needs_rebuild = True
+        self._last_event_id = 0
+        self._synced_at = None
+
+    # ---------------- Building ---------------- #
+    @property
+    def poll_interval(self):
+        return getattr(settings, 'DISPATCH_INDEX_POLL_SECONDS', 1.0)
+
+    def start(self):
+        """Builds the index and keeps it in sync from a background thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="dispatch-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def run(self):
+        """Syncs the index until stop(): when woken by a local change, or every poll interval."""
+        while not apps.ready and not self._stopping.wait(0.1):
+            pass
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Could not sync the dispatch index")
+            finally:
+                connection.close()
+            self._wakeup.wait(self.poll_interval)
+
+    def rebuild(self):
+        from .models import UserProfile
+
+        try:
+            last_event_id = broker.last_event_id()
+        except sqlite3.Error:
+            logger.exception("Could not read the dispatch event position")
+            last_event_id = 0
+        rows = list(officer_rows(UserProfile.objects.all()))
+        with self._lock:
+            self._officers, self._available, self._all_available = {}, {}, {}
+            self._stale.clear()
+            self._needs_rebuild = False
+            for row in rows:
+                self._put(row)
+            self._last_event_id = last_event_id
+            self._synced_at = time.monotonic()
+        logger.info("Built the dispatch index: %d officers, %d available", len(rows), len(self._all_available))
+
+    def _put(self, row):
+        self._drop(row['id'])
+        entry = {
+            'id': row['id'],
+            'police_id': row['police_id'],
+            'name': f"{row['first_name']} {row['last_name']}".strip(),
+            'rank': row['rank'],
+            'area': row['area_vicinity'] or "",
+            'status': row['current_deployment__status'],
+            'report_id': row['current_deployment__report_id'],
+        }
+        self._officers[entry['id']] = entry
+        if row['is_active'] and entry['status'] not in BUSY_STATUSES:
+            self._available.setdefault(area_key(entry['area']), {})[entry['id']] = None
+            self._all_available[entry['id']] = None
+
+    def _drop(self, pk):
+        entry = self._officers.pop(pk, None)
+        if entry is None:
+            return
+        self._all_available.pop(pk, None)
+        area = self._available.get(area_key(entry['area']))
+        if area is not None:
+            area.pop(pk, None)
+            if not area:
+                del self._available[area_key(entry['area'])]
+
+    # ---------------- Updating ---------------- #
+    def mark_stale(self, officer_ids):
+        with self._lock:
+            self._stale.update(officer_ids)
+        self._wakeup.set()
+
+    def invalidate(self):
+        self._needs_rebuild = True
+        self._wakeup.set()
+
+    def sync(self):
+        """
+        Brings the index up to date: built, with other workers' changes and
+        stale officers re-read. Called by the background thread.
+        """
+        from .models import UserProfile
+
+        if self._needs_rebuild or time.monotonic() - self._synced_at > broker.retention:
+            # Not built yet, or changes may have aged out of the broker file
+            self.rebuild()
+            return
+        try:
+            events = broker.read_since(self._last_event_id)
+        except sqlite3.Error:
+            logger.exception("Could not read dispatch events; suggestions may be out of date")
+            events = []
+        with self._lock:
+            for event_id, event in events:
+                self._last_event_id = event_id
+                if event.get("channel") != CHANNEL:
+                    continue
+                if event.get("officers") is None:
+                    self._needs_rebuild = True
+                else:
+                    self._stale.update(event["officers"])
+            stale, self._stale = self._stale, set()
+            self._synced_at = time.monotonic()
+        if self._needs_rebuild:
+            self.rebuild()
+            return
+        if stale:
+            rows = list(officer_rows(UserProfile.objects.filter(pk__in=stale)))
+            with self._lock:
+                for pk in stale:
+                    self._drop(pk)
+                for row in rows:
+                    self._put(row)
+
+    # ---------------- Lookups ---------------- #
+    def suggest(self, location, limit=5, exclude=()):
+        """
+        Up to `limit` available officers for a report at `location`: first
+        those whose area matches the location, then any others, longest idle
+        first within each group. Each is an entry dict with a "match" of
+        "area" or "other". Empty until the background thread has built the
+        index.
+        """
+        self.start()
+        exclude = set(exclude)
+        suggestions = []
+        with self._lock:
+            groups = [(self._available.get(key, {}), "area") for key in location_keys(location)]
+            groups.append((self._all_available, "other"))
+            for officers, match in groups:
+                for pk in officers:
+                    if len(suggestions) >= limit:
+                        return suggestions
+                    if pk not in exclude:
+                        exclude.add(pk)
+                        suggestions.append(dict(self._officers[pk], match=match))
+        return suggestions
+
+
+index = DispatchIndex()
+
+
+def officers_changed(officer_ids=None):
+    """
+    Marks officers (by primary key) for re-reading in every worker's index
+    once the current transaction commits; None means all of them.
+    """
+    officer_ids = None if officer_ids is None else sorted(officer_id for officer_id in officer_ids if officer_id)
+    if officer_ids == []:
+        return
+
+    def publish():
+        if officer_ids is None:
+            index.invalidate()
+        else:
+            index.mark_stale(officer_ids)
+        try:
+            broker.publish({"officers": officer_ids}, channel=CHANNEL)
+        except sqlite3.Error:
+            logger.exception("Could not publish dispatch event for %s", officer_ids)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from callers.models import Caller
+from reports.models import EmergencyReport
+from users.models import CurrentDeployment, DeploymentHistory
+
+BENCH_PHONE = "09000000002"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the DeploymentHistory joins (query plans and latency) on a seeded dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--officers", type=int, default=200)
+        parser.add_argument("--reports", type=int, default=20_000)
+        parser.add_argument("--officers-per-report", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is reported")
+        parser.add_argument("--no-plans", action="store_true", help="Skip the query plans")
+
+    def handle(self, *args, **options):
+        # Everything is created inside a transaction that is rolled back.
+        with transaction.atomic():
+            officers, reports = self.seed(options["officers"], options["reports"], options["officers_per_report"])
+            officer = officers[len(officers) // 2]
+            some_reports = reports[:: max(len(reports) // 200, 1)][:200]
+            deployments = DeploymentHistory.objects.filter(report__location="BENCHMARK")
+            self.stdout.write(f"{deployments.count():,} deployments, {len(officers)} officers, {len(reports):,} reports")
+
+            cases = [
+                # officer_view: one officer's deployments, newest report first
+                ("officer deployments", lambda: list(
+                    DeploymentHistory.objects.filter(police=officer)
+                    .order_by("-report__date_time_reported")
+                    .values("status", "report__report_id", "report__location")
+                )),
+                # Report pages and the deployment sync: deployments of one report at a time
+                ("deployments per report x200", lambda: [
+                    list(DeploymentHistory.objects.filter(report=report).values("status", "police__police_id"))
+                    for report in some_reports
+                ]),
+                # Admin changelist: deployments with their report and officer
+                ("admin page (100 rows)", lambda: list(
+                    deployments.select_related("report", "police").order_by("-report__date_time_reported")[:100]
+                )),
+                # Analytics: every deployment with its report time and officer
+                ("deployments + report + officer", lambda: list(
+                    deployments.values_list("report__date_time_reported", "police__police_id", "date_time_responded")
+                )),
+                # Officer roster: latest deployment of every officer
+                ("current deployments rebuild", lambda: [CurrentDeployment.refresh()]),
+            ]
+            for label, run in cases:
+                self.measure(label, run, options["repeat"], not options["no_plans"])
+            transaction.set_rollback(True)
+
+    def seed(self, officer_count, report_count, officers_per_report):
+        caller, _ = Caller.objects.get_or_create(
+            phone_number=BENCH_PHONE, defaults={"full_name": "Benchmark Caller"}
+        )
+        User = get_user_model()
+        officers = User.objects.bulk_create([
+            User(
+                police_id=f"BENCH-{i}", email=f"bench-deploy{i}@example.com",
+                first_name="Bench", last_name=f"Officer {i}", password="!",
+            )
+            for i in range(officer_count)
+        ], batch_size=500)
+        now = timezone.now()
+        reports = EmergencyReport.objects.bulk_create([
+            EmergencyReport(
+                report_id=f"RPT-9997-{i:04d}" if i < 10_000 else f"RPT-9997-A{i}",
+                location="BENCHMARK",
+                sender=caller,
+                status="resolved",
+                crime_category="robbery",
+                date_time_reported=now - timedelta(minutes=i),
+            )
+            for i in range(report_count)
+        ], batch_size=500)
+        rng = random.Random(0)
+        DeploymentHistory.objects.bulk_create([
+            DeploymentHistory(
+                report=report,
+                police=officer,
+                status="resolved",
+                date_time_responded=report.date_time_reported + timedelta(minutes=rng.randint(1, 30)),
+                date_time_resolved=report.date_time_reported + timedelta(minutes=rng.randint(31, 240)),
+            )
+            for report in reports
+            for officer in rng.sample(officers, officers_per_report)
+        ], batch_size=500)
+        return officers, reports
+
+    def measure(self, label, run, repeat, show_plans):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        timings = []
+        for attempt in range(repeat):
+            statements.clear()
+            with connection.execute_wrapper(record):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f"{label:<32} queries={len(statements):<5} median={statistics.median(timings) * 1000:,.1f}ms "
+            f"min={min(timings) * 1000:,.1f}ms"
+        )
+        if show_plans:
+            for sql, params in self.explainable(statements):
+                for line in self.plan(sql, params):
+                    self.stdout.write(f"    {line}")
+
+    @staticmethod
+    def explainable(statements):
+        """The first statement of each distinct SELECT shape."""
+        seen = set()
+        for sql, params in statements:
+            if sql.lstrip().upper().startswith("SELECT") and sql not in seen:
+                seen.add(sql)
+                yield sql, params
+
+    @staticmethod
+    def plan(sql, params):
+        prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [" ".join(str(column) for column in row[-1:]) if connection.vendor == "sqlite" else str(row[0])
+                    for row in cursor.fetchall()]
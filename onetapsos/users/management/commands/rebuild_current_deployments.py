@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from users.models import CurrentDeployment
+
+
+class Command(BaseCommand):
+    help = "Recompute every officer's current deployment (the officer roster's status columns) from DeploymentHistory"
+
+    def handle(self, *args, **kwargs):
+        officer_count = CurrentDeployment.refresh()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the current deployment of {officer_count} officer(s).")
+        )
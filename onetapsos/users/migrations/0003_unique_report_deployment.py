@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:41
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_deployments(apps, schema_editor):
+    """Keeps the first deployment of each (report, officer) pair."""
+    DeploymentHistory = apps.get_model('users', 'DeploymentHistory')
+    duplicates = (
+        DeploymentHistory.objects.filter(police__isnull=False)
+        .values('report', 'police')
+        .annotate(first=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        DeploymentHistory.objects.filter(report=row['report'], police=row['police']).exclude(id=row['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userprofile_area_vicinity_userprofile_designation'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_deployments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='deploymenthistory',
+            constraint=models.UniqueConstraint(fields=('report', 'police'), name='unique_report_deployment'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def fill_current_deployments(apps, schema_editor):
+    """Each officer's latest deployment, as CurrentDeployment.refresh() computes it."""
+    DeploymentHistory = apps.get_model('users', 'DeploymentHistory')
+    CurrentDeployment = apps.get_model('users', 'CurrentDeployment')
+    latest = (
+        DeploymentHistory.objects.filter(police__isnull=False)
+        .annotate(row=Window(
+            RowNumber(),
+            partition_by=[F('police_id')],
+            order_by=[F('date_time_responded').desc(), F('date_time_resolved').desc(), F('id').desc()],
+        ))
+        .filter(row=1)
+        .values('police__id', 'status', 'report_id', 'date_time_responded', 'date_time_resolved')
+    )
+    CurrentDeployment.objects.bulk_create([
+        CurrentDeployment(
+            officer_id=row['police__id'],
+            status=row['status'],
+            report_id=row['report_id'],
+            date_time_responded=row['date_time_responded'],
+            date_time_resolved=row['date_time_resolved'],
+        )
+        for row in latest
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_unique_report_deployment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentDeployment',
+            fields=[
+                ('officer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_deployment', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('responded', 'Responded'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=20)),
+                ('report_id', models.CharField(max_length=50)),
+                ('date_time_responded', models.DateTimeField(blank=True, null=True)),
+                ('date_time_resolved', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['rank', 'last_name'], name='officer_rank_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['area_vicinity'], name='officer_area_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['designation'], name='officer_designation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='currentdeployment',
+            index=models.Index(fields=['status'], name='current_deployment_status_idx'),
+        ),
+        migrations.RunPython(fill_current_deployments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:02
+#
+# First half of moving DeploymentHistory from the report code and police ID
+# to integer foreign keys: adds the new columns next to the old ones and
+# fills them. 0006 switches over. The two can be deployed apart; 0006 fills
+# in any rows written in between before it drops the old columns.
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def fill_integer_keys(apps, schema_editor):
+    """Sets report_ref/police_ref from the report code and police ID, in two UPDATEs."""
+    DeploymentHistory = apps.get_model('users', 'DeploymentHistory')
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    UserProfile = apps.get_model('users', 'UserProfile')
+    DeploymentHistory.objects.filter(report_ref__isnull=True).update(report_ref=Subquery(
+        EmergencyReport.objects.filter(report_id=OuterRef('report_id')).values('pk')[:1]
+    ))
+    DeploymentHistory.objects.filter(police__isnull=False, police_ref__isnull=True).update(police_ref=Subquery(
+        UserProfile.objects.filter(police_id=OuterRef('police_id')).values('pk')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0019_report_status_rejected_idx'),
+        ('users', '0004_current_deployment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deploymenthistory',
+            name='report_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reports.emergencyreport'),
+        ),
+        migrations.AddField(
+            model_name='deploymenthistory',
+            name='police_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_integer_keys, migrations.RunPython.noop),
+    ]
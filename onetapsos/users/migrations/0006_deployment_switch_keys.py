@@ -0,0 +1,91 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:02
+#
+# Second half (see 0005): drops the report code and police ID columns and
+# renames the integer ones into their place, so the columns keep their names
+# (report_id, police_id) but now hold primary keys. Reversible: going back
+# re-adds the old columns and fills them from the integer keys.
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def fill_integer_keys(apps, schema_editor):
+    """As in 0005, for rows written since it ran."""
+    DeploymentHistory = apps.get_model('users', 'DeploymentHistory')
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    UserProfile = apps.get_model('users', 'UserProfile')
+    DeploymentHistory.objects.filter(report_ref__isnull=True).update(report_ref=Subquery(
+        EmergencyReport.objects.filter(report_id=OuterRef('report_id')).values('pk')[:1]
+    ))
+    DeploymentHistory.objects.filter(police__isnull=False, police_ref__isnull=True).update(police_ref=Subquery(
+        UserProfile.objects.filter(police_id=OuterRef('police_id')).values('pk')[:1]
+    ))
+
+
+def fill_legacy_keys(apps, schema_editor):
+    """Sets the re-added report code and police ID columns from the integer keys."""
+    DeploymentHistory = apps.get_model('users', 'DeploymentHistory')
+    EmergencyReport = apps.get_model('reports', 'EmergencyReport')
+    UserProfile = apps.get_model('users', 'UserProfile')
+    DeploymentHistory.objects.update(report=Subquery(
+        EmergencyReport.objects.filter(pk=OuterRef('report_ref')).values('report_id')[:1]
+    ))
+    DeploymentHistory.objects.filter(police_ref__isnull=False).update(police=Subquery(
+        UserProfile.objects.filter(pk=OuterRef('police_ref')).values('police_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_deployment_integer_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_integer_keys, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='deploymenthistory',
+            name='unique_report_deployment',
+        ),
+        # Nullable so that, going back, the column can be re-added before it is filled
+        migrations.AlterField(
+            model_name='deploymenthistory',
+            name='report',
+            field=models.ForeignKey(db_column='report_id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deployments', to='reports.emergencyreport', to_field='report_id'),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, fill_legacy_keys),
+        migrations.RemoveField(
+            model_name='deploymenthistory',
+            name='report',
+        ),
+        migrations.RemoveField(
+            model_name='deploymenthistory',
+            name='police',
+        ),
+        migrations.RenameField(
+            model_name='deploymenthistory',
+            old_name='report_ref',
+            new_name='report',
+        ),
+        migrations.RenameField(
+            model_name='deploymenthistory',
+            old_name='police_ref',
+            new_name='police',
+        ),
+        migrations.AlterField(
+            model_name='deploymenthistory',
+            name='report',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deployments', to='reports.emergencyreport'),
+        ),
+        migrations.AlterField(
+            model_name='deploymenthistory',
+            name='police',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deployments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='deploymenthistory',
+            constraint=models.UniqueConstraint(fields=('report', 'police'), name='unique_report_deployment'),
+        ),
+    ]
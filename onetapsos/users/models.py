@@ -1,7 +1,12 @@
+import warnings
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.core.validators import RegexValidator, FileExtensionValidator
 from django.conf import settings
+from . import dispatch
 
 # Validators
 philippine_mobile_regex = RegexValidator(
@@ -111,11 +116,19 @@ class UserProfile(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Officer roster: ordering and its filter dropdowns
+            models.Index(fields=['rank', 'last_name'], name='officer_rank_name_idx'),
+            models.Index(fields=['area_vicinity'], name='officer_area_idx'),
+            models.Index(fields=['designation'], name='officer_designation_idx'),
+        ]
+
     def __str__(self):
         return f"{self.rank} {self.last_name}, {self.first_name}"
 
 
-# Deployment History Model linked via police_id
+# Deployment History Model: one row per officer sent to a report
 STATUS_CHOICES = [
     ('pending', 'Pending'),
     ('responded', 'Responded'),
@@ -123,19 +136,64 @@ STATUS_CHOICES = [
     ('closed', 'Closed'),
 ]
 
+# Lookups that used to take a report code or police ID, before
+# DeploymentHistory pointed at the integer primary keys (users 0005/0006)
+LEGACY_DEPLOYMENT_LOOKUPS = {
+    'report_id': 'report__report_id',
+    'police_id': 'police__police_id',
+}
+
+
+def is_legacy_key(value, lookup):
+    """A report code or police ID (or, for __in, a list of them) where a primary key is expected."""
+    if lookup == 'in':
+        return isinstance(value, (list, tuple, set, frozenset)) and bool(value) and all(
+            is_legacy_key(item, '') for item in value
+        )
+    return isinstance(value, str) and not value.isdigit()
+
+
+def legacy_deployment_lookups(lookups):
+    translated = {}
+    for lookup, value in lookups.items():
+        field, _, rest = lookup.partition('__')
+        if field in LEGACY_DEPLOYMENT_LOOKUPS and rest in ('', 'exact', 'in') and is_legacy_key(value, rest):
+            new_lookup = LEGACY_DEPLOYMENT_LOOKUPS[field] + (f'__{rest}' if rest else '')
+            warnings.warn(
+                f"DeploymentHistory.{field} is an integer key; filter on {new_lookup} instead of {lookup}",
+                DeprecationWarning,
+                stacklevel=4,
+            )
+            lookup = new_lookup
+        translated[lookup] = value
+    return translated
+
+
+class DeploymentHistoryQuerySet(models.QuerySet):
+    """
+    report_id and police_id hold the report's and officer's primary keys.
+    Until every caller has moved over, keyword lookups (filter(), exclude(),
+    get() and the related managers) that pass a report code or police ID
+    there are translated to report__report_id / police__police_id, with a
+    DeprecationWarning.
+    """
+
+    def filter(self, *args, **kwargs):
+        return super().filter(*args, **legacy_deployment_lookups(kwargs))
+
+    def exclude(self, *args, **kwargs):
+        return super().exclude(*args, **legacy_deployment_lookups(kwargs))
+
+
 class DeploymentHistory(models.Model):
     report = models.ForeignKey(
-        'reports.EmergencyReport',  # assumes your EmergencyReport is in 'reports' app
+        'reports.EmergencyReport',
         on_delete=models.CASCADE,
-        to_field='report_id',
-        db_column='report_id',
         related_name='deployments'
     )
     police = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        to_field='police_id',
-        db_column='police_id',
         related_name='deployments',
         blank=True,
         null=True
@@ -148,5 +206,121 @@ class DeploymentHistory(models.Model):
     date_time_responded = models.DateTimeField(null=True, blank=True)
     date_time_resolved = models.DateTimeField(null=True, blank=True)
 
+    objects = DeploymentHistoryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # One deployment per officer per report; the upsert in sync_report() relies on it
+            models.UniqueConstraint(fields=['report', 'police'], name='unique_report_deployment'),
+        ]
+
+    @classmethod
+    def sync_report(cls, report):
+        """
+        Brings the report's deployments in line with its officers, status and
+        times: one upsert for all assigned officers and one delete for
+        officers no longer on it, however many there are. Then refreshes
+        those officers' CurrentDeployment.
+        """
+        officers = report.officers_responded.values('pk')
+        officer_ids = list(officers.values_list('pk', flat=True))
+        # Officers whose current deployment may change: those on the report
+        # before this sync and those on it now
+        affected = set(cls.objects.filter(report=report).values_list('police_id', flat=True))
+        affected.update(officer_ids)
+        cls.objects.bulk_create(
+            [
+                cls(
+                    report_id=report.pk,
+                    police_id=officer_id,
+                    status=report.status,
+                    date_time_responded=report.date_time_responded,
+                    date_time_resolved=report.date_time_resolved,
+                )
+                for officer_id in officer_ids
+            ],
+            update_conflicts=True,
+            unique_fields=['report', 'police'],
+            update_fields=['status', 'date_time_responded', 'date_time_resolved'],
+        )
+        cls.objects.filter(report=report, police__isnull=False).exclude(police__in=officers).delete()
+        CurrentDeployment.refresh(affected)
+
+    def __str__(self):
+        return f"Deployment for {self.report.report_id} - Officer: {self.police} - Status: {self.get_status_display()}"
+
+class CurrentDeployment(models.Model):
+    """
+    Each officer's latest deployment (by responded, then resolved time),
+    copied out of DeploymentHistory so the officer roster can show and filter
+    on it with a join instead of a subquery per officer. Officers who were
+    never deployed have no row. Kept current by DeploymentHistory.sync_report(),
+    EmergencyReport.expire_batches(), the deployment admin and users/signals.py;
+    `manage.py rebuild_current_deployments` rebuilds it.
+    """
+    officer = models.OneToOneField(
+        UserProfile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='current_deployment',
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    report_id = models.CharField(max_length=50)
+    date_time_responded = models.DateTimeField(null=True, blank=True)
+    date_time_resolved = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='current_deployment_status_idx'),
+        ]
+
     def __str__(self):
-        return f"Deployment for {self.report.report_id} - Officer: {self.police} - Status: {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.officer_id}: {self.report_id} ({self.status})"
+
+    @classmethod
+    def latest(cls, deployments):
+        """values() rows of the latest deployment per officer among `deployments`."""
+        return (
+            deployments.filter(police__isnull=False)
+            .annotate(row=Window(
+                RowNumber(),
+                partition_by=[F('police_id')],
+                order_by=[F('date_time_responded').desc(), F('date_time_resolved').desc(), F('id').desc()],
+            ))
+            .filter(row=1)
+            .values('police_id', 'status', 'report__report_id', 'date_time_responded', 'date_time_resolved')
+        )
+
+    @classmethod
+    def refresh(cls, officer_ids=None):
+        """
+        Recomputes the rows of the given officers (by primary key), or of
+        everyone. Returns how many officers have a current deployment.
+        """
+        deployments = DeploymentHistory.objects.all()
+        officers = cls.objects.all()
+        if officer_ids is not None:
+            officer_ids = [officer_id for officer_id in officer_ids if officer_id]
+            if not officer_ids:
+                return 0
+            deployments = deployments.filter(police__in=officer_ids)
+            officers = officers.filter(officer__in=officer_ids)
+        rows = [
+            cls(
+                officer_id=row['police_id'],
+                status=row['status'],
+                report_id=row['report__report_id'],
+                date_time_responded=row['date_time_responded'],
+                date_time_resolved=row['date_time_resolved'],
+            )
+            for row in cls.latest(deployments)
+        ]
+        officers.exclude(officer_id__in=[row.officer_id for row in rows]).delete()
+        dispatch.officers_changed(officer_ids)
+        cls.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['officer'],
+            update_fields=['status', 'report_id', 'date_time_responded', 'date_time_resolved'],
+        )
+        return len(rows)
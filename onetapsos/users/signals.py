@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from reports.models import EmergencyReport
+from . import dispatch
+from .models import CurrentDeployment, UserProfile
+
+# DeploymentHistory has no receivers of its own, so the collector deletes a
+# report's deployments in one statement. sync_report(), expire_batches() and
+# the deployment admin refresh CurrentDeployment for the officers involved;
+# these cover reports deleted one at a time (e.g. from the admin).
+
+@receiver(pre_delete, sender=EmergencyReport)
+def remember_report_officers(sender, instance, **kwargs):
+    instance._deployed_officer_ids = list(
+        instance.deployments.filter(police__isnull=False).values_list('police_id', flat=True).distinct()
+    )
+
+@receiver(post_delete, sender=EmergencyReport)
+def refresh_current_deployments_on_report_delete(sender, instance, **kwargs):
+    CurrentDeployment.refresh(getattr(instance, '_deployed_officer_ids', []))
+
+# Area, rank or active flag may have changed
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def update_dispatch_index_on_officer_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields != frozenset({'last_login'}):
+        dispatch.officers_changed([instance.pk])
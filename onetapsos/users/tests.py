@@ -1,3 +1,94 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .dispatch import DispatchIndex
+from .models import CurrentDeployment
+
+
+class ResponseTimeAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user("PNP-00001", None, email="staff@example.com", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def get(self, **params):
+        return self.client.get(reverse("response_time_analytics"), params)
+
+    def test_range_within_limit(self):
+        response = self.get(start="2026-01-01", end="2026-03-01", group_by="area")
+        self.assertEqual(response.status_code, 200)
+
+    def test_reversed_range_is_rejected(self):
+        response = self.get(start="2026-03-01", end="2026-01-01")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ANALYTICS_MAX_RANGE_DAYS=90)
+    def test_range_over_limit_is_rejected(self):
+        self.assertEqual(self.get(start="2026-01-01", end="2026-03-31").status_code, 200)
+        self.assertEqual(self.get(start="2026-01-01", end="2026-04-02").status_code, 400)
+        self.assertEqual(self.get(start="1900-01-01").status_code, 400)
+
+
+@mock.patch.object(DispatchIndex, "start")  # synced by hand instead of from its thread
+class DispatchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+
+        def officer(n, area, **fields):
+            return User.objects.create_user(
+                f"PNP-{n:05d}", None, email=f"officer{n}@example.com", area_vicinity=area, **fields
+            )
+
+        now = timezone.now()
+        cls.rested = officer(1, "Quezon City")
+        CurrentDeployment.objects.create(
+            officer=officer(2, " quezon  city"), status="resolved", report_id="RPT-2026-0001",
+            date_time_resolved=now - timedelta(hours=1),
+        )
+        CurrentDeployment.objects.create(
+            officer=officer(3, "Quezon City"), status="resolved", report_id="RPT-2026-0002",
+            date_time_resolved=now - timedelta(hours=3),
+        )
+        CurrentDeployment.objects.create(
+            officer=officer(4, "Quezon City"), status="responded", report_id="RPT-2026-0003",
+            date_time_responded=now,
+        )
+        officer(5, "Quezon City", is_active=False)
+        officer(6, "Quezon City", is_staff=True)
+        cls.elsewhere = officer(7, "Pasig")
+
+    def setUp(self):
+        self.index = DispatchIndex()
+        self.index.rebuild()
+
+    def suggested(self, location="Barangay 123, Quezon City", **kwargs):
+        return [(entry["police_id"], entry["match"]) for entry in self.index.suggest(location, **kwargs)]
+
+    def test_area_matches_first_then_longest_idle(self, start):
+        self.assertEqual(self.suggested(), [
+            ("PNP-00001", "area"), ("PNP-00003", "area"), ("PNP-00002", "area"), ("PNP-00007", "other"),
+        ])
+        self.assertEqual(self.suggested(limit=2), [("PNP-00001", "area"), ("PNP-00003", "area")])
+
+    def test_excluded_officers_are_skipped(self, start):
+        self.assertEqual(
+            self.suggested(exclude=[self.rested.pk, self.elsewhere.pk]),
+            [("PNP-00003", "area"), ("PNP-00002", "area")],
+        )
+
+    def test_stale_officers_are_reread_on_sync(self, start):
+        CurrentDeployment.objects.create(
+            officer=self.rested, status="pending", report_id="RPT-2026-0004", date_time_responded=timezone.now()
+        )
+        self.assertIn(("PNP-00001", "area"), self.suggested())
+        self.index.mark_stale([self.rested.pk])
+        self.index.sync()
+        self.assertNotIn(("PNP-00001", "area"), self.suggested())
@@ -8,6 +8,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('list/', views.officer_list, name='officer_list'),
     path('view/<int:user_id>/', views.officer_view, name='officer_view'),
+    path('analytics/response-times/', views.response_time_analytics, name='response_time_analytics'),
     path('callerslist/', views.callers_list, name='callers_list'),
     path('callersview/<int:caller_id>/', views.callers_view, name='callers_view'),
     path("notifications/", include("notifications.urls")),
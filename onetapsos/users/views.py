@@ -4,10 +4,16 @@ from django.contrib.auth import authenticate, login, logout
 from django.http import HttpResponseForbidden
 from django.contrib import messages
 from .forms import RegistrationForm 
-from .models import UserProfile, DeploymentHistory
+from .models import UserProfile, DeploymentHistory, CurrentDeployment
 from callers.models import Caller
 from reports.models import EmergencyReport
-from django.db.models import OuterRef, Subquery, Q
+from django.db.models import F, OuterRef, Subquery, Q
+from django.http import JsonResponse
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, timedelta, timezone as dt_timezone
+from . import analytics
 
 # Login View
 
@@ -68,21 +74,15 @@ def dashboard_view(request):
 # List of officers
 @login_required
 def officer_list(request):
-    # Subquery for last deployment
-    latest_deployment = (
-        DeploymentHistory.objects
-        .filter(police_id=OuterRef("police_id"))
-        .order_by("-date_time_responded", "-date_time_resolved", "-id")
-    )
-
+    # Latest deployment, kept per officer in CurrentDeployment
     users = (
         UserProfile.objects
         .filter(is_staff=False, is_superuser=False)
         .annotate(
-            last_status=Subquery(latest_deployment.values("status")[:1]),
-            last_report_id=Subquery(latest_deployment.values("report__report_id")[:1]),
-            last_responded=Subquery(latest_deployment.values("date_time_responded")[:1]),
-            last_resolved=Subquery(latest_deployment.values("date_time_resolved")[:1]),
+            last_status=F("current_deployment__status"),
+            last_report_id=F("current_deployment__report_id"),
+            last_responded=F("current_deployment__date_time_responded"),
+            last_resolved=F("current_deployment__date_time_resolved"),
         )
     )
 
@@ -135,7 +135,7 @@ def officer_list(request):
     .values_list("area_vicinity", flat=True)
     .distinct()
 )
-    statuses = DeploymentHistory.objects.values_list("status", flat=True).distinct()
+    statuses = CurrentDeployment.objects.order_by("status").values_list("status", flat=True).distinct()
 
     return render(request, "users/officers_list.html", {
         "users": users,
@@ -158,12 +158,55 @@ def officer_view(request, user_id):
     # Fix here: use 'report__date_time_reported' instead of 'date_time_reported'
     deployments = DeploymentHistory.objects.filter(police=user).order_by('-report__date_time_reported')
 
+    scorecard = analytics.scorecard(user.police_id)
+
     return render(request, 'users/officers_view.html', {
         'user': user,
-        'deployments': deployments
+        'deployments': deployments,
+        'scorecard': scorecard,
+        'scorecard_measures': [
+            ("Time to respond", scorecard['respond']),
+            ("Time to resolve", scorecard['resolve']),
+        ],
     })
 
 
+# Response-time analytics (JSON)
+@login_required
+def response_time_analytics(request):
+    """
+    Waits from report to response and to resolution for reports reported
+    between ?start= and ?end= (dates, default the last 30 days, at most
+    ANALYTICS_MAX_RANGE_DAYS apart), optionally for one ?officer= (police ID)
+    and broken down by ?group_by= officer, area or crime_category.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Only staff can view response-time analytics.")
+
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        end = parse_date(request.GET.get("end") or "") or (today + timedelta(days=1)).date()
+        start = parse_date(request.GET.get("start") or "") or end - timedelta(days=30)
+    except ValueError:
+        return JsonResponse({"error": "start and end must be dates (YYYY-MM-DD)"}, status=400)
+    if start > end:
+        return JsonResponse({"error": "start must not be after end"}, status=400)
+    # Each month in the range is a query and a cache entry
+    max_days = getattr(settings, "ANALYTICS_MAX_RANGE_DAYS", 731)
+    if (end - start).days > max_days:
+        return JsonResponse({"error": f"The range may span at most {max_days} days"}, status=400)
+    group_by = request.GET.get("group_by") or None
+    if group_by is not None and group_by not in analytics.GROUPS:
+        return JsonResponse({"error": f"group_by must be one of {', '.join(analytics.GROUPS)}"}, status=400)
+
+    def midnight(day):
+        return datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc)
+
+    return JsonResponse(analytics.summary(
+        midnight(start), midnight(end), group_by=group_by, police_id=request.GET.get("officer") or None,
+    ))
+
+
 
 @login_required
 def callers_list(request):